@@ -1,4 +1,11 @@
 """Python module wrapping the Rust implementation of HyperdriveMath"""
 
+from .buffers import *  # pylint: disable=cyclic-import
 from .hyperdrive_state import *  # pylint: disable=cyclic-import
 from .hyperdrive_utils import *  # pylint: disable=cyclic-import
+from .pool_config_handle import *  # pylint: disable=cyclic-import
+from .pool_evaluator import *  # pylint: disable=cyclic-import
+from .pool_history import *  # pylint: disable=cyclic-import
+from .snapshot_store import *  # pylint: disable=cyclic-import
+from .solver_cache import *  # pylint: disable=cyclic-import
+from .errors import *  # pylint: disable=cyclic-import
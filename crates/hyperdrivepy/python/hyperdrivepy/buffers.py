@@ -0,0 +1,96 @@
+"""Helpers for reading the bytes buffers returned by batch methods with `as_buffer=True`.
+
+A buffer holds one 32-byte little-endian word per value. This is the memory layout of a (rows, 4) uint64 numpy
+array and of Arrow's decimal256 and fixed_size_binary(32) arrays, so the buffer can be wrapped by either one
+without copying it. numpy and pyarrow are not dependencies of hyperdrivepy and are only imported when used.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+WORD_SIZE = 32
+
+
+def buffer_to_ints(buffer: bytes, signed: bool = False) -> list[int]:
+    """Read a batch buffer into python ints.
+
+    Arguments
+    ---------
+    buffer: bytes
+        A buffer of 32-byte little-endian words.
+    signed: bool, optional
+        If True, the words are read as two's complement I256 values. Defaults to False.
+
+    Returns
+    -------
+    list[int]
+        One int per word.
+    """
+    return [
+        int.from_bytes(buffer[offset : offset + WORD_SIZE], "little", signed=signed)
+        for offset in range(0, len(buffer), WORD_SIZE)
+    ]
+
+
+def ints_to_buffer(values: list[int], signed: bool = False) -> bytes:
+    """Pack python ints into a batch buffer, which the batch methods also accept as input.
+
+    Arguments
+    ---------
+    values: list[int]
+        The values to pack.
+    signed: bool, optional
+        If True, the values are packed as two's complement I256 values. Defaults to False.
+
+    Returns
+    -------
+    bytes
+        A buffer with one 32-byte little-endian word per value.
+    """
+    return b"".join(value.to_bytes(WORD_SIZE, "little", signed=signed) for value in values)
+
+
+def buffer_to_numpy(buffer: bytes) -> Any:
+    """View a batch buffer as a read-only numpy array of uint64 limbs without copying it.
+
+    Arguments
+    ---------
+    buffer: bytes
+        A buffer of 32-byte little-endian words.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (rows, 4) uint64 array with the least significant limb first.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    return np.frombuffer(buffer, dtype="<u8").reshape(-1, 4)
+
+
+def buffer_to_arrow(buffer: bytes, validity: bytes | None = None, as_decimal: bool = True) -> Any:
+    """Wrap a batch buffer in an Arrow array without copying it.
+
+    Arguments
+    ---------
+    buffer: bytes
+        A buffer of 32-byte little-endian words.
+    validity: bytes, optional
+        The packed validity bitmap returned alongside the buffer with `with_mask=True`.
+        Failed elements become nulls.
+    as_decimal: bool, optional
+        If True, the array is a decimal256(76, 0) array of the raw integer values. Values that don't fit in
+        76 decimal digits or that are at least 2**255 can't be represented, so use False for arbitrary U256 values.
+        If False, the array is a fixed_size_binary(32) array. Defaults to True.
+
+    Returns
+    -------
+    pyarrow.Array
+        One element per word.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    data_type = pa.decimal256(76, 0) if as_decimal else pa.binary(WORD_SIZE)
+    validity_buffer = None if validity is None else pa.py_buffer(validity)
+    return pa.Array.from_buffers(data_type, len(buffer) // WORD_SIZE, [validity_buffer, pa.py_buffer(buffer)])
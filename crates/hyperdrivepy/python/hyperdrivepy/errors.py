@@ -0,0 +1,19 @@
+"""Typed exceptions raised when the hyperdrive math rejects a trade.
+
+The exceptions mirror the custom errors in IHyperdrive, so a simulated failure can be handled the same way as a
+reverted transaction. Errors without a matching contract error are raised as `HyperdriveError`. Every exception
+subclasses `HyperdriveError`, which subclasses `ValueError`.
+"""
+
+# pylint: disable=no-name-in-module,unused-import
+from .hyperdrivepy import (  # type: ignore
+    DecreasedPresentValueWhenAddingLiquidity,
+    HyperdriveError,
+    InsufficientLiquidity,
+    InvalidApr,
+    InvalidLPSharePrice,
+    InvalidPresentValue,
+    MinimumSharePrice,
+    MinimumTransactionAmount,
+    OutputLimit,
+)
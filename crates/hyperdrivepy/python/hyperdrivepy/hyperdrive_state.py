@@ -3,10 +3,254 @@
 from __future__ import annotations
 
 from . import types
-from .utils import _get_interface
+from .hyperdrive_state_batches import _BatchMethods
+from .hyperdrive_state_liquidity import _LiquidityMethods
+from .hyperdrive_state_math import _PoolMathMethods
+from .hyperdrive_state_screening import _ScreeningMethods
+from .hyperdrive_state_solvers import _SolverMethods
+from .hyperdrive_state_trades import _TradeMethods
+from .pool_config_handle import PoolConfigHandle
+from .utils import _get_interface, rust_module
 
 # We don't control the number of arguments when wrapping rust functions.
-# pylint: disable=too-many-arguments
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+
+
+class HyperdriveState(
+    _PoolMathMethods, _ScreeningMethods, _BatchMethods, _TradeMethods, _LiquidityMethods, _SolverMethods
+):
+    """A Hyperdrive pool snapshot that is built once and reused across calculations.
+
+    The pool config and pool info are converted into the underlying rust state a single time,
+    so repeated calls against the same snapshot do not pay the conversion cost again.
+
+    Every FixedPoint and integer argument can be passed as either a decimal string or a python int.
+    Results are decimal strings unless the state was built with `native_ints=True`, in which case
+    they are python ints.
+
+    The underlying rust state is immutable, and the iterative solvers and batch methods release the GIL
+    while the rust math runs, so a single instance can be shared across a thread pool. Use `with_info`
+    to derive an updated state from a few changed pool info fields.
+
+    States can be pickled, e.g. to send them to process pool workers. They are pickled through `to_bytes`,
+    so unpickling decodes a fixed-width buffer instead of re-extracting the pool config and pool info.
+
+    The methods are grouped by feature into mixins in the `hyperdrive_state_*` modules. Only the methods that
+    predate the state also have a module-level function here that takes the pool config and pool info.
+    """
+
+    # The state exposes one method per wrapped rust function.
+    # pylint: disable=too-many-public-methods
+
+    def __init__(
+        self,
+        pool_config: types.PoolConfigType | PoolConfigHandle,
+        pool_info: types.PoolInfoType,
+        native_ints: bool = False,
+    ) -> None:
+        """Initialize the state from a pool snapshot.
+
+        Arguments
+        ---------
+        pool_config: PoolConfig | PoolConfigHandle
+            Static configuration for the hyperdrive contract.
+            Set at deploy time.
+            Pass a PoolConfigHandle to reuse a config that has already been extracted.
+        pool_info: PoolInfo
+            Current state information of the hyperdrive contract.
+            Includes attributes like reserve levels and share prices.
+        native_ints: bool, optional
+            If True, results are returned as python ints instead of decimal strings.
+            Ints are converted to and from the underlying 256-bit values without decimal formatting.
+            Defaults to False.
+        """
+        self._rust_state = _get_interface(pool_config, pool_info, native_ints)
+
+    @classmethod
+    def _from_rust_state(cls, rust_state) -> HyperdriveState:
+        state = cls.__new__(cls)
+        state._rust_state = rust_state
+        return state
+
+    def to_bytes(self) -> bytes:
+        """Encode the pool config and pool info of the state.
+
+        The encoding is the ABI encoding of the PoolConfig struct followed by that of the PoolInfo struct,
+        with one 32-byte big-endian word per field.
+
+        Returns
+        -------
+        bytes
+            The encoded state.
+        """
+        return self._rust_state.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, native_ints: bool = False) -> HyperdriveState:
+        """Build a state from the output of `to_bytes`.
+
+        Arguments
+        ---------
+        data: bytes
+            The encoded state.
+        native_ints: bool, optional
+            If True, results are returned as python ints instead of decimal strings.
+            Defaults to False.
+
+        Returns
+        -------
+        HyperdriveState
+            The decoded state.
+        """
+        return cls._from_rust_state(rust_module.HyperdriveState.from_bytes(data, native_ints))
+
+    def with_info(self, **fields: str | int) -> HyperdriveState:
+        """Get a new state with some of the pool info fields replaced.
+
+        The pool config and the remaining pool info fields are copied from this state without re-extracting them.
+
+        Arguments
+        ---------
+        **fields: str | int
+            PoolInfo fields to replace, named as in the solidity struct (e.g. `shareReserves=...`).
+
+        Returns
+        -------
+        HyperdriveState
+            The updated state. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(self._rust_state.with_info(**fields))
+
+    def update_info(self, **fields: str | int) -> None:
+        """Replace some of the pool info fields in place.
+
+        Arguments
+        ---------
+        **fields: str | int
+            PoolInfo fields to replace, named as in the solidity struct (e.g. `shareReserves=...`).
+        """
+        self._rust_state = self._rust_state.with_info(**fields)
+
+    def apply_open_long(self, base_amount: str | int, current_time: str | int) -> HyperdriveState:
+        """Get the state after opening a long, updated the way the contract would.
+
+        The apply methods assume the position's checkpoint holds no offsetting positions,
+        and they leave the LP share price and the withdrawal pool unchanged.
+
+        Arguments
+        ---------
+        base_amount: str (FixedPoint)
+            The amount to spend, in base.
+        current_time: str (U256)
+            The current block timestamp, used to compute the position's maturity time.
+
+        Returns
+        -------
+        HyperdriveState
+            The state after the trade. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(self._rust_state.apply_open_long(base_amount, current_time))
+
+    def apply_close_long(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> HyperdriveState:
+        """Get the state after closing a long that has not matured, updated the way the contract would.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount of bonds to close.
+        maturity_time: str (U256)
+            The maturity timestamp of the long.
+        current_time: str (U256)
+            The current block timestamp.
+
+        Returns
+        -------
+        HyperdriveState
+            The state after the trade. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(
+            self._rust_state.apply_close_long(bond_amount, maturity_time, current_time)
+        )
+
+    def apply_open_short(self, bond_amount: str | int, current_time: str | int) -> HyperdriveState:
+        """Get the state after opening a short, updated the way the contract would.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount of bonds to short.
+        current_time: str (U256)
+            The current block timestamp, used to compute the position's maturity time.
+
+        Returns
+        -------
+        HyperdriveState
+            The state after the trade. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(self._rust_state.apply_open_short(bond_amount, current_time))
+
+    def apply_close_short(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> HyperdriveState:
+        """Get the state after closing a short that has not matured, updated the way the contract would.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount of bonds to close.
+        maturity_time: str (U256)
+            The maturity timestamp of the short.
+        current_time: str (U256)
+            The current block timestamp.
+
+        Returns
+        -------
+        HyperdriveState
+            The state after the trade. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(
+            self._rust_state.apply_close_short(bond_amount, maturity_time, current_time)
+        )
+
+    def apply_add_liquidity(
+        self,
+        contribution: str | int,
+        current_time: str | int,
+        *,
+        min_lp_share_price: str | int | None = None,
+        min_apr: str | int | None = None,
+        max_apr: str | int | None = None,
+        as_base: bool = True,
+    ) -> HyperdriveState:
+        """Get the state after adding liquidity, updated the way the contract would.
+
+        Arguments
+        ---------
+        contribution: str (FixedPoint)
+            The amount of base or shares to contribute.
+        current_time: str (U256)
+            The current block timestamp.
+        min_lp_share_price: str (FixedPoint), optional
+            The minimum LP share price the trader will accept. Defaults to 0.
+        min_apr: str (FixedPoint), optional
+            The minimum spot rate the trader will accept. Defaults to 0.
+        max_apr: str (FixedPoint), optional
+            The maximum spot rate the trader will accept. Defaults to the max uint256.
+        as_base: bool, optional
+            True if the contribution is in base, False if it is in shares. Defaults to True.
+
+        Returns
+        -------
+        HyperdriveState
+            The state after the trade. This state is left unchanged.
+        """
+        return HyperdriveState._from_rust_state(
+            self._rust_state.apply_add_liquidity(
+                contribution, current_time, min_lp_share_price, min_apr, max_apr, as_base
+            )
+        )
 
 
 def calculate_max_spot_price(
@@ -29,7 +273,7 @@ def calculate_max_spot_price(
     str (FixedPoint)
         max_spot_price = 1/1 + curve_fee * (1 / (spot_price - 1))
     """
-    return _get_interface(pool_config, pool_info).calculate_max_spot_price()
+    return HyperdriveState(pool_config, pool_info).calculate_max_spot_price()
 
 
 def calculate_spot_price_after_long(
@@ -59,7 +303,7 @@ def calculate_spot_price_after_long(
     str (FixedPoint)
         The spot price after opening the long.
     """
-    return _get_interface(pool_config, pool_info).calculate_spot_price_after_long(base_amount, bond_amount)
+    return HyperdriveState(pool_config, pool_info).calculate_spot_price_after_long(base_amount, bond_amount)
 
 
 def calculate_spot_price_after_short(
@@ -89,7 +333,7 @@ def calculate_spot_price_after_short(
     str (FixedPoint)
         The spot price after opening the long.
     """
-    return _get_interface(pool_config, pool_info).calculate_spot_price_after_short(bond_amount, base_amount)
+    return HyperdriveState(pool_config, pool_info).calculate_spot_price_after_short(bond_amount, base_amount)
 
 
 def calculate_solvency(
@@ -112,7 +356,7 @@ def calculate_solvency(
     str (FixedPoint)
         solvency = share_reserves - long_exposure / vault_share_price - minimum_share_reserves
     """
-    return _get_interface(pool_config, pool_info).calculate_solvency()
+    return HyperdriveState(pool_config, pool_info).calculate_solvency()
 
 
 def calculate_spot_rate_after_long(
@@ -142,7 +386,7 @@ def calculate_spot_rate_after_long(
     str (FixedPoint)
         The spot rate after opening the long.
     """
-    return _get_interface(pool_config, pool_info).calculate_spot_rate_after_long(base_amount, bond_amount)
+    return HyperdriveState(pool_config, pool_info).calculate_spot_rate_after_long(base_amount, bond_amount)
 
 
 def calculate_spot_rate(
@@ -165,7 +409,7 @@ def calculate_spot_rate(
     str (FixedPoint)
         The pool's spot rate.
     """
-    return _get_interface(pool_config, pool_info).calculate_spot_rate()
+    return HyperdriveState(pool_config, pool_info).calculate_spot_rate()
 
 
 def calculate_spot_price(
@@ -188,7 +432,7 @@ def calculate_spot_price(
     str (FixedPoint)
         The pool's spot price.
     """
-    return _get_interface(pool_config, pool_info).calculate_spot_price()
+    return HyperdriveState(pool_config, pool_info).calculate_spot_price()
 
 
 def calculate_open_long(
@@ -214,7 +458,7 @@ def calculate_open_long(
     str (FixedPoint)
         The amount of bonds purchased.
     """
-    return _get_interface(pool_config, pool_info).calculate_open_long(base_amount)
+    return HyperdriveState(pool_config, pool_info).calculate_open_long(base_amount)
 
 
 def calculate_close_long(
@@ -246,7 +490,7 @@ def calculate_close_long(
     str (FixedPoint)
         The amount of shares returned.
     """
-    return _get_interface(pool_config, pool_info).calculate_close_long(bond_amount, maturity_time, current_time)
+    return HyperdriveState(pool_config, pool_info).calculate_close_long(bond_amount, maturity_time, current_time)
 
 
 def calculate_open_short(
@@ -276,11 +520,7 @@ def calculate_open_short(
     str (FixedPoint)
         The amount of base required to short the bonds (aka the "max loss").
     """
-    if open_vault_share_price is None:
-        # the underlying rust code uses current market share price if this is 0
-        # zero value is used because the smart contract will return 0 if the checkpoint hasn't been minted
-        open_vault_share_price = "0"
-    return _get_interface(pool_config, pool_info).calculate_open_short(short_amount, open_vault_share_price)
+    return HyperdriveState(pool_config, pool_info).calculate_open_short(short_amount, open_vault_share_price)
 
 
 def calculate_close_short(
@@ -318,7 +558,7 @@ def calculate_close_short(
     str (FixedPoint)
         The amount of shares the trader will receive for closing the short.
     """
-    return _get_interface(pool_config, pool_info).calculate_close_short(
+    return HyperdriveState(pool_config, pool_info).calculate_close_short(
         bond_amount, open_vault_share_price, close_vault_share_price, maturity_time, current_time
     )
 
@@ -346,7 +586,7 @@ def to_checkpoint(
     str (U256)
         The checkpoint timestamp.
     """
-    return _get_interface(pool_config, pool_info).to_checkpoint(time)
+    return HyperdriveState(pool_config, pool_info).to_checkpoint(time)
 
 
 def calculate_targeted_long(
@@ -387,7 +627,7 @@ def calculate_targeted_long(
     str (FixedPoint)
         The long to hit the target rate.
     """
-    return _get_interface(pool_config, pool_info).calculate_targeted_long_with_budget(
+    return HyperdriveState(pool_config, pool_info).calculate_targeted_long(
         budget,
         target_rate,
         checkpoint_exposure,
@@ -425,7 +665,7 @@ def calculate_max_long(
     str (FixedPoint)
         The maximum long the pool and user's wallet can support.
     """
-    return _get_interface(pool_config, pool_info).calculate_max_long(budget, checkpoint_exposure, maybe_max_iterations)
+    return HyperdriveState(pool_config, pool_info).calculate_max_long(budget, checkpoint_exposure, maybe_max_iterations)
 
 
 def calculate_max_short(
@@ -463,7 +703,7 @@ def calculate_max_short(
     str (FixedPoint)
         The maximum short the pool and user's wallet can handle.
     """
-    return _get_interface(pool_config, pool_info).calculate_max_short(
+    return HyperdriveState(pool_config, pool_info).calculate_max_short(
         budget,
         open_vault_share_price,
         checkpoint_exposure,
@@ -497,7 +737,7 @@ def calculate_bonds_out_given_shares_in_down(
     str (FixedPoint)
         The amount of bonds out.
     """
-    return _get_interface(pool_config, pool_info).calculate_bonds_out_given_shares_in_down(amount_in)
+    return HyperdriveState(pool_config, pool_info).calculate_bonds_out_given_shares_in_down(amount_in)
 
 
 def calculate_shares_in_given_bonds_out_up(
@@ -525,7 +765,7 @@ def calculate_shares_in_given_bonds_out_up(
     str (FixedPoint)
         The amount of shares in to reach the target.
     """
-    return _get_interface(pool_config, pool_info).calculate_shares_in_given_bonds_out_up(amount_in)
+    return HyperdriveState(pool_config, pool_info).calculate_shares_in_given_bonds_out_up(amount_in)
 
 
 def calculate_shares_in_given_bonds_out_down(
@@ -553,7 +793,7 @@ def calculate_shares_in_given_bonds_out_down(
     str (FixedPoint)
         The amount of shares in to reach the target.
     """
-    return _get_interface(pool_config, pool_info).calculate_shares_in_given_bonds_out_down(amount_in)
+    return HyperdriveState(pool_config, pool_info).calculate_shares_in_given_bonds_out_down(amount_in)
 
 
 def calculate_shares_out_given_bonds_in_down(
@@ -581,7 +821,7 @@ def calculate_shares_out_given_bonds_in_down(
     str (FixedPoint)
         The amount of shares out.
     """
-    return _get_interface(pool_config, pool_info).calculate_shares_out_given_bonds_in_down(amount_in)
+    return HyperdriveState(pool_config, pool_info).calculate_shares_out_given_bonds_in_down(amount_in)
 
 
 def calculate_present_value(
@@ -607,7 +847,7 @@ def calculate_present_value(
     str (FixedPoint)
         The present value of all LP capital in the pool.
     """
-    return _get_interface(pool_config, pool_info).calculate_present_value(current_block_timestamp)
+    return HyperdriveState(pool_config, pool_info).calculate_present_value(current_block_timestamp)
 
 
 def calculate_idle_share_reserves_in_base(
@@ -630,4 +870,4 @@ def calculate_idle_share_reserves_in_base(
     str (FixedPoint)
         The idle share reserves in base of the pool.
     """
-    return _get_interface(pool_config, pool_info).calculate_idle_share_reserves_in_base()
+    return HyperdriveState(pool_config, pool_info).calculate_idle_share_reserves_in_base()
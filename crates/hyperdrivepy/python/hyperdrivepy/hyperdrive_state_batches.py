@@ -0,0 +1,160 @@
+"""HyperdriveState methods that run trades over batches of amounts."""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+# We don't control the number of arguments when wrapping rust functions.
+# pylint: disable=too-many-arguments
+
+
+class _BatchMethods:
+    """Exact trade math over batches of amounts."""
+
+    _rust_state: Any
+
+    def calculate_open_long_batch(
+        self, base_amounts: Sequence[str | int], *, with_mask: bool = False, as_buffer: bool = False
+    ) -> list[str | int] | tuple[list[str | int], list[bool]] | bytes | tuple[bytes, bytes]:
+        """Gets the long amounts that will be opened for each of the given base amounts.
+
+        Arguments
+        ---------
+        base_amounts: Sequence[str | int] (FixedPoint)
+            The amounts to spend, in base.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The amount of bonds purchased for each base amount.
+            With `with_mask`, a tuple of the amounts and a list that is False for each failed base amount.
+            With `as_buffer`, a bytes buffer, and with `with_mask` a tuple of the buffer and a packed validity bitmap.
+        """
+        return self._rust_state.calculate_open_long_batch(base_amounts, with_mask, as_buffer)
+
+    def calculate_close_long_batch(
+        self,
+        bond_amounts: Sequence[str | int],
+        maturity_time: str | int,
+        current_time: str | int,
+        *,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> list[str | int] | tuple[list[str | int], list[bool]] | bytes | tuple[bytes, bytes]:
+        """Calculates the amounts of shares that will be returned after fees for closing each of the given longs.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[str | int] (FixedPoint)
+            The amounts of bonds to sell.
+        maturity_time: str | int (FixedPoint)
+            The maturity time of the longs.
+        current_time: str | int (FixedPoint)
+            The current block time.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The amount of shares returned for each bond amount.
+            With `with_mask`, a tuple of the amounts and a list that is False for each failed bond amount.
+            With `as_buffer`, a bytes buffer, and with `with_mask` a tuple of the buffer and a packed validity bitmap.
+        """
+        return self._rust_state.calculate_close_long_batch(
+            bond_amounts, maturity_time, current_time, with_mask, as_buffer
+        )
+
+    def calculate_open_short_batch(
+        self,
+        short_amounts: Sequence[str | int],
+        open_vault_share_price: str | int | None = None,
+        *,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> list[str | int] | tuple[list[str | int], list[bool]] | bytes | tuple[bytes, bytes]:
+        """Gets the amounts of base the trader will need to deposit for each of the given short sizes.
+
+        Arguments
+        ---------
+        short_amounts: Sequence[str | int] (FixedPoint)
+            The amounts of bonds to short.
+        open_vault_share_price: str | int (FixedPoint) | None, optional
+            Optionally provide the open share price for the shorts.
+            If this is not provided or is None, then we will use the pool's current share price.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The amount of base required for each short.
+            With `with_mask`, a tuple of the amounts and a list that is False for each failed short.
+            With `as_buffer`, a bytes buffer, and with `with_mask` a tuple of the buffer and a packed validity bitmap.
+        """
+        if open_vault_share_price is None:
+            open_vault_share_price = "0"
+        return self._rust_state.calculate_open_short_batch(short_amounts, open_vault_share_price, with_mask, as_buffer)
+
+    def calculate_close_short_batch(
+        self,
+        bond_amounts: Sequence[str | int],
+        open_vault_share_price: str | int,
+        close_vault_share_price: str | int,
+        maturity_time: str | int,
+        current_time: str | int,
+        *,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> list[str | int] | tuple[list[str | int], list[bool]] | bytes | tuple[bytes, bytes]:
+        """Gets the amounts of shares the trader will receive from closing each of the given shorts.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[str | int] (FixedPoint)
+            The amounts of bonds provided.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price when the shorts were opened.
+        close_vault_share_price: str | int (FixedPoint)
+            The share price when the shorts were closed.
+        maturity_time: str | int (FixedPoint)
+            The maturity time of the shorts.
+        current_time: str | int (FixedPoint)
+            The current block time.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The amount of shares the trader will receive for each bond amount.
+            With `with_mask`, a tuple of the amounts and a list that is False for each failed bond amount.
+            With `as_buffer`, a bytes buffer, and with `with_mask` a tuple of the buffer and a packed validity bitmap.
+        """
+        return self._rust_state.calculate_close_short_batch(
+            bond_amounts,
+            open_vault_share_price,
+            close_vault_share_price,
+            maturity_time,
+            current_time,
+            with_mask,
+            as_buffer,
+        )
@@ -0,0 +1,243 @@
+"""HyperdriveState methods for LP math."""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+# We don't control the number of arguments when wrapping rust functions.
+# pylint: disable=too-many-arguments
+
+
+class _LiquidityMethods:
+    """LP math for adding liquidity, removing it and redeeming withdrawal shares."""
+
+    _rust_state: Any
+
+    def calculate_add_liquidity(
+        self,
+        contribution: str | int,
+        current_time: str | int,
+        *,
+        min_lp_share_price: str | int | None = None,
+        min_apr: str | int | None = None,
+        max_apr: str | int | None = None,
+        as_base: bool = True,
+    ) -> str | int:
+        """Gets the amount of LP shares the trader will receive after adding liquidity.
+
+        Arguments
+        ---------
+        contribution: str | int (FixedPoint)
+            The amount of base or shares to contribute.
+        current_time: str | int (U256)
+            The current block time.
+        min_lp_share_price: str | int (FixedPoint), optional
+            The minimum LP share price the trader will accept. Defaults to 0.
+        min_apr: str | int (FixedPoint), optional
+            The minimum spot rate the trader will accept. Defaults to 0.
+        max_apr: str | int (FixedPoint), optional
+            The maximum spot rate the trader will accept. Defaults to the max uint256.
+        as_base: bool, optional
+            True if the contribution is in base, False if it is in shares. Defaults to True.
+
+        Returns
+        -------
+        str | int (FixedPoint)
+            The amount of LP shares received.
+        """
+        return self._rust_state.calculate_add_liquidity(
+            contribution, current_time, min_lp_share_price, min_apr, max_apr, as_base
+        )
+
+    def calculate_add_liquidity_batch(
+        self,
+        contributions: Sequence[str | int],
+        current_time: str | int,
+        *,
+        min_lp_share_price: str | int | None = None,
+        min_apr: str | int | None = None,
+        max_apr: str | int | None = None,
+        as_base: bool = True,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> list[str | int] | tuple[list[str | int], list[bool]] | bytes | tuple[bytes, bytes]:
+        """Gets the amounts of LP shares the trader will receive for each of the given contributions.
+
+        Arguments
+        ---------
+        contributions: Sequence[str | int] (FixedPoint)
+            The amounts of base or shares to contribute.
+        current_time: str | int (U256)
+            The current block time.
+        min_lp_share_price: str | int (FixedPoint), optional
+            The minimum LP share price the trader will accept. Defaults to 0.
+        min_apr: str | int (FixedPoint), optional
+            The minimum spot rate the trader will accept. Defaults to 0.
+        max_apr: str | int (FixedPoint), optional
+            The maximum spot rate the trader will accept. Defaults to the max uint256.
+        as_base: bool, optional
+            True if the contributions are in base, False if they are in shares. Defaults to True.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The amount of LP shares received for each contribution.
+            With `with_mask`, a tuple of the amounts and a list that is False for each failed contribution.
+            With `as_buffer`, a bytes buffer, and with `with_mask` a tuple of the buffer and a packed validity bitmap.
+        """
+        return self._rust_state.calculate_add_liquidity_batch(
+            contributions, current_time, min_lp_share_price, min_apr, max_apr, as_base, with_mask, as_buffer
+        )
+
+    def estimate_remove_liquidity(
+        self, lp_shares: str | int, current_time: str | int, maybe_other_withdrawal_shares: str | int | None = None
+    ) -> tuple[str | int, str | int]:
+        """Estimates the base received immediately and the withdrawal shares left over after removing liquidity.
+
+        The estimate follows the contract's steps for distributing excess idle liquidity to the withdrawal pool,
+        but takes the present value to fall one for one with the share reserves instead of solving for it. This is
+        exact when the pool has no net curve exposure, e.g. when no positions are open, and an estimate otherwise.
+
+        PoolInfo doesn't say how much of the LP total supply is withdrawal shares, so withdrawal shares held by
+        others that aren't ready to withdraw yet are passed in. The excess idle is distributed across them as well.
+
+        Arguments
+        ---------
+        lp_shares: str | int (FixedPoint)
+            The amount of LP shares to remove.
+        current_time: str | int (U256)
+            The current block time.
+        maybe_other_withdrawal_shares: str | int (FixedPoint), optional
+            The withdrawal shares held by others that aren't ready to withdraw yet. Defaults to zero.
+
+        Returns
+        -------
+        tuple[str | int, str | int] (FixedPoint, FixedPoint)
+            The base proceeds and the amount of withdrawal shares received.
+        """
+        return self._rust_state.estimate_remove_liquidity(lp_shares, current_time, maybe_other_withdrawal_shares)
+
+    def estimate_remove_liquidity_batch(
+        self,
+        lp_share_amounts: Sequence[str | int],
+        current_time: str | int,
+        maybe_other_withdrawal_shares: str | int | None = None,
+        *,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> (
+        list[tuple[str | int, str | int]]
+        | tuple[list[tuple[str | int, str | int]], list[bool]]
+        | tuple[bytes, bytes]
+        | tuple[tuple[bytes, bytes], bytes]
+    ):
+        """Estimates the base proceeds and withdrawal shares for each of the given LP share amounts.
+
+        Arguments
+        ---------
+        lp_share_amounts: Sequence[str | int] (FixedPoint)
+            The amounts of LP shares to remove.
+        current_time: str | int (U256)
+            The current block time.
+        maybe_other_withdrawal_shares: str | int (FixedPoint), optional
+            The withdrawal shares held by others that aren't ready to withdraw yet. Defaults to zero.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the base proceeds and the withdrawal shares are each returned as a bytes buffer of 32-byte
+            little-endian words, which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`.
+            Defaults to False.
+
+        Returns
+        -------
+        list[tuple[str | int, str | int]] (FixedPoint, FixedPoint)
+            The base proceeds and the amount of withdrawal shares received for each amount.
+            With `with_mask`, a tuple of the results and a list that is False for each failed amount.
+            With `as_buffer`, a tuple of the base proceeds buffer and the withdrawal shares buffer, and with
+            `with_mask` a tuple of those buffers and a packed validity bitmap.
+        """
+        return self._rust_state.estimate_remove_liquidity_batch(
+            lp_share_amounts, current_time, maybe_other_withdrawal_shares, with_mask, as_buffer
+        )
+
+    def estimate_redeem_withdrawal_shares(
+        self,
+        withdrawal_shares: str | int,
+        current_time: str | int,
+        maybe_other_withdrawal_shares: str | int | None = None,
+    ) -> tuple[str | int, str | int]:
+        """Estimates the base received and the number of withdrawal shares redeemed.
+
+        Excess idle liquidity is distributed to the withdrawal pool first, and the shares are then redeemed
+        pro rata with the shares that are ready to withdraw. Like `estimate_remove_liquidity`, this is exact when
+        the pool has no net curve exposure and an estimate otherwise.
+
+        Arguments
+        ---------
+        withdrawal_shares: str | int (FixedPoint)
+            The amount of withdrawal shares to redeem.
+        current_time: str | int (U256)
+            The current block time.
+        maybe_other_withdrawal_shares: str | int (FixedPoint), optional
+            The withdrawal shares held by others that aren't ready to withdraw yet. The excess idle is distributed
+            across them as well, and the given shares are redeemed ahead of them. Defaults to zero.
+
+        Returns
+        -------
+        tuple[str | int, str | int] (FixedPoint, FixedPoint)
+            The base proceeds and the amount of withdrawal shares redeemed.
+        """
+        return self._rust_state.estimate_redeem_withdrawal_shares(
+            withdrawal_shares, current_time, maybe_other_withdrawal_shares
+        )
+
+    def estimate_redeem_withdrawal_shares_batch(
+        self,
+        withdrawal_share_amounts: Sequence[str | int],
+        current_time: str | int,
+        maybe_other_withdrawal_shares: str | int | None = None,
+        *,
+        with_mask: bool = False,
+        as_buffer: bool = False,
+    ) -> (
+        list[tuple[str | int, str | int]]
+        | tuple[list[tuple[str | int, str | int]], list[bool]]
+        | tuple[bytes, bytes]
+        | tuple[tuple[bytes, bytes], bytes]
+    ):
+        """Estimates the base received and withdrawal shares redeemed for each of the given amounts.
+
+        Arguments
+        ---------
+        withdrawal_share_amounts: Sequence[str | int] (FixedPoint)
+            The amounts of withdrawal shares to redeem.
+        current_time: str | int (U256)
+            The current block time.
+        maybe_other_withdrawal_shares: str | int (FixedPoint), optional
+            The withdrawal shares held by others that aren't ready to withdraw yet. Defaults to zero.
+        with_mask: bool, optional
+            If True, failed elements don't raise. Instead they are returned as zero along with a validity mask.
+            Defaults to False.
+        as_buffer: bool, optional
+            If True, the base proceeds and the withdrawal shares redeemed are each returned as a bytes buffer of
+            32-byte little-endian words, which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`.
+            Defaults to False.
+
+        Returns
+        -------
+        list[tuple[str | int, str | int]] (FixedPoint, FixedPoint)
+            The base proceeds and the amount of withdrawal shares redeemed for each amount.
+            With `with_mask`, a tuple of the results and a list that is False for each failed amount.
+            With `as_buffer`, a tuple of the base proceeds buffer and the withdrawal shares buffer, and with
+            `with_mask` a tuple of those buffers and a packed validity bitmap.
+        """
+        return self._rust_state.estimate_redeem_withdrawal_shares_batch(
+            withdrawal_share_amounts, current_time, maybe_other_withdrawal_shares, with_mask, as_buffer
+        )
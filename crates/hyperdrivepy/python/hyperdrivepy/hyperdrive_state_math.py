@@ -0,0 +1,407 @@
+"""HyperdriveState methods that wrap the exact pool math."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class _PoolMathMethods:
+    """Exact pool math against a single trade or solve."""
+
+    # The state exposes one method per wrapped rust function.
+    # pylint: disable=too-many-public-methods
+
+    _rust_state: Any
+
+    def calculate_max_spot_price(self) -> str | int:
+        """Get the pool's max spot price.
+
+        Returns
+        -------
+        str (FixedPoint)
+            max_spot_price = 1/1 + curve_fee * (1 / (spot_price - 1))
+        """
+        return self._rust_state.calculate_max_spot_price()
+
+    def calculate_spot_price_after_long(
+        self, base_amount: str | int, bond_amount: str | int | None = None
+    ) -> str | int:
+        """Get the spot price after opening a long on Hyperdrive, including fees.
+
+        Arguments
+        ---------
+        base_amount: str (FixedPoint)
+            The amount base provided.
+        bond_amount: str (FixedPoint) | None, optional
+            The number of bonds purchased.
+            Defaults to the output of `calculate_open_long(base_amount)`.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The spot price after opening the long.
+        """
+        return self._rust_state.calculate_spot_price_after_long(base_amount, bond_amount)
+
+    def calculate_spot_price_after_short(
+        self, bond_amount: str | int, base_amount: str | int | None = None
+    ) -> str | int:
+        """Get the spot price after opening a short on Hyperdrive, including fees.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount bonds shorted.
+        base_amount: str (FixedPoint) | None, optional
+            The amount of base supplied.
+            Defaults to the output of `calculate_open_short(bond_amount)`.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The spot price after opening the short.
+        """
+        return self._rust_state.calculate_spot_price_after_short(bond_amount, base_amount)
+
+    def calculate_solvency(self) -> str | int:
+        """Get the pool's solvency.
+
+        Returns
+        -------
+        str (FixedPoint)
+            solvency = share_reserves - long_exposure / vault_share_price - minimum_share_reserves
+        """
+        return self._rust_state.calculate_solvency()
+
+    def calculate_spot_rate_after_long(self, base_amount: str | int, bond_amount: str | int | None = None) -> str | int:
+        """Get the spot rate after opening a long on Hyperdrive, including fees.
+
+        Arguments
+        ---------
+        base_amount: str (FixedPoint)
+            The amount base provided.
+        bond_amount: str (FixedPoint) | None, optional
+            The number of bonds purchased.
+            Defaults to the output of `calculate_open_long(base_amount)`.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The spot rate after opening the long.
+        """
+        return self._rust_state.calculate_spot_rate_after_long(base_amount, bond_amount)
+
+    def calculate_spot_rate(self) -> str | int:
+        """Get the spot rate (fixed rate) for the market.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The pool's spot rate.
+        """
+        return self._rust_state.calculate_spot_rate()
+
+    def calculate_spot_price(self) -> str | int:
+        """Get the spot price of the bond.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The pool's spot price.
+        """
+        return self._rust_state.calculate_spot_price()
+
+    def calculate_open_long(self, base_amount: str | int) -> str | int:
+        """Gets the long amount that will be opened for a given base amount.
+
+        Arguments
+        ---------
+        base_amount: str (FixedPoint)
+            The amount to spend, in base.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of bonds purchased.
+        """
+        return self._rust_state.calculate_open_long(base_amount)
+
+    def calculate_close_long(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> str | int:
+        """Calculates the amount of shares that will be returned after fees for closing a long.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount of bonds to sell.
+        maturity_time: str (FixedPoint)
+            The maturity time of the long.
+        current_time: str (FixedPoint)
+            The current block time.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of shares returned.
+        """
+        return self._rust_state.calculate_close_long(bond_amount, maturity_time, current_time)
+
+    def calculate_open_short(
+        self, short_amount: str | int, open_vault_share_price: str | int | None = None
+    ) -> str | int:
+        """Gets the amount of base the trader will need to deposit for a short of a given size.
+
+        Arguments
+        ---------
+        short_amount: str (FixedPoint)
+            The amount to of bonds to short.
+        open_vault_share_price: str (FixedPoint) | None, optional
+            Optionally provide the open share price for the short.
+            If this is not provided or is None, then we will use the pool's current share price.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of base required to short the bonds (aka the "max loss").
+        """
+        if open_vault_share_price is None:
+            # the underlying rust code uses current market share price if this is 0
+            # zero value is used because the smart contract will return 0 if the checkpoint hasn't been minted
+            open_vault_share_price = "0"
+        return self._rust_state.calculate_open_short(short_amount, open_vault_share_price)
+
+    def calculate_close_short(
+        self,
+        bond_amount: str | int,
+        open_vault_share_price: str | int,
+        close_vault_share_price: str | int,
+        maturity_time: str | int,
+        current_time: str | int,
+    ) -> str | int:
+        """Gets the amount of shares the trader will receive from closing a short.
+
+        Arguments
+        ---------
+        bond_amount: str (FixedPoint)
+            The amount to of bonds provided.
+        open_vault_share_price: str (FixedPoint)
+            The share price when the short was opened.
+        close_vault_share_price: str (FixedPoint)
+            The share price when the short was closed.
+        maturity_time: str (FixedPoint)
+            The maturity time of the long.
+        current_time: str (FixedPoint)
+            The current block time.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of shares the trader will receive for closing the short.
+        """
+        return self._rust_state.calculate_close_short(
+            bond_amount, open_vault_share_price, close_vault_share_price, maturity_time, current_time
+        )
+
+    def to_checkpoint(self, time: str | int) -> str | int:
+        """Converts a timestamp to the checkpoint timestamp that it corresponds to.
+
+        Arguments
+        ---------
+        time: str (U256)
+            A string representation of any timestamp (in seconds) before or at the present.
+
+        Returns
+        -------
+        str (U256)
+            The checkpoint timestamp.
+        """
+        return self._rust_state.to_checkpoint(time)
+
+    def calculate_targeted_long(
+        self,
+        budget: str | int,
+        target_rate: str | int,
+        checkpoint_exposure: str | int,
+        maybe_max_iterations: int | None,
+        maybe_allowable_error: str | int | None,
+    ) -> str | int:
+        """Calculate the amount of bonds that can be purchased for the given budget.
+
+        Arguments
+        ---------
+        budget: str (FixedPont)
+            The account budget in base for making a long.
+        target: str (FixedPoint)
+            The target fixed rate.
+        checkpoint_exposure: str (I256)
+            The net exposure for the given checkpoint.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+            Defaults to 7.
+        maybe_allowable_error: str (FixedPoint) | None, Optional
+            The amount of error supported for reaching the target rate.
+            Defaults to 1e-4.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The long to hit the target rate.
+        """
+        return self._rust_state.calculate_targeted_long_with_budget(
+            budget,
+            target_rate,
+            checkpoint_exposure,
+            maybe_max_iterations,
+            maybe_allowable_error,
+        )
+
+    def calculate_max_long(
+        self, budget: str | int, checkpoint_exposure: str | int, maybe_max_iterations: int | None
+    ) -> str | int:
+        """Get the max amount of bonds that can be purchased for the given budget.
+
+        Arguments
+        ---------
+        budget: str (FixedPont)
+            The account budget in base for making a long.
+        checkpoint_exposure: str (I256)
+            The net exposure for the given checkpoint.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The maximum long the pool and user's wallet can support.
+        """
+        return self._rust_state.calculate_max_long(budget, checkpoint_exposure, maybe_max_iterations)
+
+    def calculate_max_short(
+        self,
+        budget: str | int,
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+        maybe_conservative_price: str | int | None,
+        maybe_max_iterations: int | None,
+    ) -> str | int:
+        """Get the max amount of bonds that can be shorted for the given budget.
+
+        Arguments
+        ---------
+        budget: str (FixedPoint)
+            The account budget in base for making a short.
+        open_vault_share_price: str (FixedPoint)
+            The share price of underlying vault.
+        checkpoint_exposure: str (FixedPoint)
+            The net exposure for the given checkpoint.
+        maybe_conservative_price: str (FixedPoint), optional
+            A lower bound on the realized price that the short will pay.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The maximum short the pool and user's wallet can handle.
+        """
+        return self._rust_state.calculate_max_short(
+            budget,
+            open_vault_share_price,
+            checkpoint_exposure,
+            maybe_conservative_price,
+            maybe_max_iterations,
+        )
+
+    def calculate_bonds_out_given_shares_in_down(self, amount_in: str | int) -> str | int:
+        """Calculates the amount of bonds a user will receive from the pool by
+        providing a specified amount of shares. We underestimate the amount of
+        bonds. This uses Yieldspace math, and thus ignores Hyperdrive fees.
+
+        Arguments
+        ---------
+        amount_in: str (FixedPoint)
+            The amount of shares going into the pool.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of bonds out.
+        """
+        return self._rust_state.calculate_bonds_out_given_shares_in_down(amount_in)
+
+    def calculate_shares_in_given_bonds_out_up(self, amount_in: str | int) -> str | int:
+        """Calculates the amount of shares a user must provide the pool to receive
+        a specified amount of bonds. We overestimate the amount of shares in.
+        This uses Yieldspace math, and thus ignores Hyperdrive fees.
+
+        Arguments
+        ---------
+        amount_in: str (FixedPoint)
+            The amount of bonds to target.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of shares in to reach the target.
+        """
+        return self._rust_state.calculate_shares_in_given_bonds_out_up(amount_in)
+
+    def calculate_shares_in_given_bonds_out_down(self, amount_in: str | int) -> str | int:
+        """Calculates the amount of shares a user must provide the pool to receive
+        a specified amount of bonds. We underestimate the amount of shares in.
+        This uses Yieldspace math, and thus ignores Hyperdrive fees.
+
+        Arguments
+        ---------
+        amount_in: str (FixedPoint)
+            The amount of bonds to target.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of shares in to reach the target.
+        """
+        return self._rust_state.calculate_shares_in_given_bonds_out_down(amount_in)
+
+    def calculate_shares_out_given_bonds_in_down(self, amount_in: str | int) -> str | int:
+        """Calculates the amount of shares a user will receive from the pool by
+        providing a specified amount of bonds. We underestimate the amount of
+        shares out. This uses Yieldspace math, and thus ignores Hyperdrive fees.
+
+        Arguments
+        ---------
+        amount_in: str (FixedPoint)
+            The amount of bonds in.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The amount of shares out.
+        """
+        return self._rust_state.calculate_shares_out_given_bonds_in_down(amount_in)
+
+    def calculate_present_value(self, current_block_timestamp: str | int) -> str | int:
+        """Calculates the present value of LPs capital in the pool.
+
+        Arguments
+        ---------
+        current_block_timestamp: str (U256)
+            The current block timestamp, as an epoch time integer.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The present value of all LP capital in the pool.
+        """
+        return self._rust_state.calculate_present_value(current_block_timestamp)
+
+    def calculate_idle_share_reserves_in_base(self) -> str | int:
+        """Calculates the idle share reserves in base of the pool.
+
+        Returns
+        -------
+        str (FixedPoint)
+            The idle share reserves in base of the pool.
+        """
+        return self._rust_state.calculate_idle_share_reserves_in_base()
@@ -0,0 +1,213 @@
+"""HyperdriveState methods that screen trades in f64."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from .hyperdrive_state_batches import _BatchMethods
+
+
+class _ScreeningMethods(_BatchMethods):
+    """Fast f64 screening of trades, with exact confirmation of the survivors."""
+
+    def screen_open_long(self, base_amounts: Sequence[float]) -> list[float]:
+        """Approximates the bonds purchased for each of the given base amounts using float math.
+
+        Screening runs the trade math in double precision against values precomputed once from the state.
+        Results are within a relative 1e-9 of the exact math for trades larger than a millionth of the
+        pool's reserves. Confirm the candidates that pass a screen with `confirm_exact`.
+
+        Arguments
+        ---------
+        base_amounts: Sequence[float]
+            The amounts to spend, in base, scaled by 1e18 like FixedPoint values.
+
+        Returns
+        -------
+        list[float]
+            The approximate amount of bonds purchased for each base amount, scaled by 1e18.
+            Trades that the exact math would reject are NaN.
+        """
+        return self._rust_state.screen_open_long([float(amount) for amount in base_amounts])
+
+    def screen_open_short(
+        self, bond_amounts: Sequence[float], open_vault_share_price: str | int | None = None
+    ) -> list[float]:
+        """Approximates the base deposit for each of the given short sizes using float math.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[float]
+            The amounts of bonds to short, scaled by 1e18.
+        open_vault_share_price: str | int (FixedPoint) | None, optional
+            Optionally provide the open share price for the shorts.
+            If this is not provided or is None, then we will use the pool's current share price.
+
+        Returns
+        -------
+        list[float]
+            The approximate amount of base required for each short, scaled by 1e18.
+            Trades that the exact math would reject are NaN.
+        """
+        if open_vault_share_price is None:
+            open_vault_share_price = "0"
+        return self._rust_state.screen_open_short([float(amount) for amount in bond_amounts], open_vault_share_price)
+
+    def screen_close_long(
+        self, bond_amounts: Sequence[float], maturity_time: str | int, current_time: str | int
+    ) -> list[float]:
+        """Approximates the shares returned after fees for closing each of the given longs using float math.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[float]
+            The amounts of bonds to sell, scaled by 1e18.
+        maturity_time: str | int (FixedPoint)
+            The maturity time of the longs.
+        current_time: str | int (FixedPoint)
+            The current block time.
+
+        Returns
+        -------
+        list[float]
+            The approximate amount of shares returned for each bond amount, scaled by 1e18.
+            Trades that the exact math would reject are NaN.
+        """
+        return self._rust_state.screen_close_long(
+            [float(amount) for amount in bond_amounts], maturity_time, current_time
+        )
+
+    def screen_close_short(
+        self,
+        bond_amounts: Sequence[float],
+        open_vault_share_price: str | int,
+        close_vault_share_price: str | int,
+        maturity_time: str | int,
+        current_time: str | int,
+    ) -> list[float]:
+        """Approximates the shares received from closing each of the given shorts using float math.
+
+        Arguments
+        ---------
+        bond_amounts: Sequence[float]
+            The amounts of bonds provided, scaled by 1e18.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price when the shorts were opened.
+        close_vault_share_price: str | int (FixedPoint)
+            The share price when the shorts were closed.
+        maturity_time: str | int (FixedPoint)
+            The maturity time of the shorts.
+        current_time: str | int (FixedPoint)
+            The current block time.
+
+        Returns
+        -------
+        list[float]
+            The approximate amount of shares received for each bond amount, scaled by 1e18.
+            Trades that the exact math would reject are NaN.
+        """
+        return self._rust_state.screen_close_short(
+            [float(amount) for amount in bond_amounts],
+            open_vault_share_price,
+            close_vault_share_price,
+            maturity_time,
+            current_time,
+        )
+
+    def screen_spot_after_long(self, base_amounts: Sequence[float]) -> tuple[list[float], list[float]]:
+        """Approximates the spot price and spot rate after opening each of the given longs using float math.
+
+        Arguments
+        ---------
+        base_amounts: Sequence[float]
+            The amounts to spend, in base, scaled by 1e18.
+
+        Returns
+        -------
+        tuple[list[float], list[float]]
+            The approximate spot prices and spot rates after each long, scaled by 1e18.
+            Trades that the exact math would reject are NaN.
+        """
+        return self._rust_state.screen_spot_after_long([float(amount) for amount in base_amounts])
+
+    def screen_max_long(self, budgets: Sequence[float], checkpoint_exposure: str | int) -> list[float]:
+        """Approximates the max long for each of the given budgets using float math.
+
+        Arguments
+        ---------
+        budgets: Sequence[float]
+            The traders' budgets, in base, scaled by 1e18.
+        checkpoint_exposure: str | int (FixedPoint)
+            The net exposure for the given checkpoint.
+
+        Returns
+        -------
+        list[float]
+            The approximate max long for each budget, in base, scaled by 1e18.
+        """
+        return self._rust_state.screen_max_long([float(budget) for budget in budgets], checkpoint_exposure)
+
+    def screen_max_short(
+        self,
+        budgets: Sequence[float],
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+    ) -> list[float]:
+        """Approximates the max short for each of the given budgets using float math.
+
+        Arguments
+        ---------
+        budgets: Sequence[float]
+            The traders' budgets, in base, scaled by 1e18.
+        open_vault_share_price: str | int (FixedPoint)
+            The open share price for the shorts.
+            Pass 0 to use the pool's current share price.
+        checkpoint_exposure: str | int (FixedPoint)
+            The net exposure for the given checkpoint.
+
+        Returns
+        -------
+        list[float]
+            The approximate max short for each budget, in bonds, scaled by 1e18.
+        """
+        return self._rust_state.screen_max_short(
+            [float(budget) for budget in budgets], open_vault_share_price, checkpoint_exposure
+        )
+
+    def confirm_exact(
+        self, trade: str, amounts: Sequence[str | int], survivors: Sequence[bool], *args: str | int | None
+    ) -> list[str | int | None]:
+        """Runs the exact math for the candidates that passed a screen.
+
+        Only the surviving amounts are evaluated, in a single batch call.
+
+        Arguments
+        ---------
+        trade: str
+            The screened trade, one of "open_long", "open_short", "close_long" or "close_short".
+        amounts: Sequence[str | int] (FixedPoint)
+            The screened amounts.
+        survivors: Sequence[bool]
+            True for each amount that passed the screen.
+        *args: str | int | None
+            The remaining arguments of the matching `calculate_*_batch` method,
+            e.g. the maturity time and current time for "close_long".
+
+        Returns
+        -------
+        list[str | int | None] (FixedPoint)
+            The exact result for each surviving amount that the exact math accepts, and None otherwise.
+        """
+        candidates = [amount for amount, survived in zip(amounts, survivors) if survived]
+        if trade == "open_long":
+            results, mask = self.calculate_open_long_batch(candidates, *args, with_mask=True)
+        elif trade == "open_short":
+            results, mask = self.calculate_open_short_batch(candidates, *args, with_mask=True)
+        elif trade == "close_long":
+            results, mask = self.calculate_close_long_batch(candidates, *args, with_mask=True)
+        elif trade == "close_short":
+            results, mask = self.calculate_close_short_batch(candidates, *args, with_mask=True)
+        else:
+            raise ValueError(f"Unknown trade: {trade}")
+        confirmed = iter(result if valid else None for result, valid in zip(results, mask))
+        return [next(confirmed) if survived else None for survived in survivors]
@@ -0,0 +1,418 @@
+"""HyperdriveState methods that run the iterative solvers."""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from . import types
+
+# pylint: disable=no-name-in-module
+from .hyperdrivepy import SolverState  # type: ignore
+
+# We don't control the number of arguments when wrapping rust functions.
+# pylint: disable=too-many-arguments
+
+
+class _SolverMethods:
+    """Warm-started, anytime, many-budget and diagnostic variants of the iterative solvers."""
+
+    _rust_state: Any
+
+    def calculate_max_long_many(
+        self,
+        budgets: Sequence[str | int],
+        checkpoint_exposure: str | int,
+        maybe_max_iterations: int | None = None,
+        *,
+        as_buffer: bool = False,
+    ) -> list[str | int] | bytes:
+        """Get the max amount of base that can be spent on a long for each of the given budgets.
+
+        The pool limited max long is solved once and each budget is resolved against it, which is much
+        cheaper than calling `calculate_max_long` once per budget.
+
+        Arguments
+        ---------
+        budgets: Sequence[str | int] (FixedPoint)
+            The account budgets in base for making a long.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The maximum long the pool and each budget can handle.
+            With `as_buffer`, a bytes buffer.
+        """
+        return self._rust_state.calculate_max_long_many(budgets, checkpoint_exposure, maybe_max_iterations, as_buffer)
+
+    def calculate_max_short_many(
+        self,
+        budgets: Sequence[str | int],
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+        maybe_conservative_price: str | int | None = None,
+        maybe_max_iterations: int | None = None,
+        *,
+        as_buffer: bool = False,
+    ) -> list[str | int] | bytes:
+        """Get the max amount of bonds that can be shorted for each of the given budgets.
+
+        Each distinct budget is solved once, so the results equal those of `calculate_max_short`.
+
+        Arguments
+        ---------
+        budgets: Sequence[str | int] (FixedPoint)
+            The account budgets in base for making a short.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price of underlying vault.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        maybe_conservative_price: str | int (FixedPoint), optional
+            A lower bound on the realized price that the short will pay.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+        as_buffer: bool, optional
+            If True, the results are returned as a single bytes buffer of 32-byte little-endian words,
+            which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+        Returns
+        -------
+        list[str | int] (FixedPoint)
+            The maximum short the pool and each budget can handle.
+            With `as_buffer`, a bytes buffer.
+        """
+        return self._rust_state.calculate_max_short_many(
+            budgets,
+            open_vault_share_price,
+            checkpoint_exposure,
+            maybe_conservative_price,
+            maybe_max_iterations,
+            as_buffer,
+        )
+
+    def calculate_max_long_warm(
+        self,
+        budget: str | int,
+        checkpoint_exposure: str | int,
+        current_time: str | int,
+        *,
+        initial_guess: str | int | SolverState | None = None,
+        maybe_max_iterations: int | None = None,
+    ) -> tuple[str | int, SolverState]:
+        """Get the max amount of base that can be spent on a long, warm started from a previous solution.
+
+        The solver brackets the answer around the initial guess and bisects the bracket, so passing the
+        previous block's solution typically needs a handful of iterations. Without an initial guess, the
+        solve starts from `calculate_max_long`. Every result passes the exact open long and solvency checks.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a long.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        current_time: str | int (U256)
+            The current block timestamp, in seconds. Trades are checked as if opened at this time.
+        initial_guess: str | int (FixedPoint) | SolverState, optional
+            A previous max long, or the solver state returned by a previous call. Defaults to a cold start.
+        maybe_max_iterations: int, optional
+            The maximum number of trade sizes to evaluate. Defaults to 128.
+
+        Returns
+        -------
+        tuple[str | int (FixedPoint), SolverState]
+            The max long in base and the solver state to warm start the next call with.
+        """
+        return self._rust_state.calculate_max_long_warm(
+            budget, checkpoint_exposure, current_time, initial_guess, maybe_max_iterations
+        )
+
+    def calculate_max_short_warm(
+        self,
+        budget: str | int,
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+        current_time: str | int,
+        *,
+        initial_guess: str | int | SolverState | None = None,
+        maybe_conservative_price: str | int | None = None,
+        maybe_max_iterations: int | None = None,
+    ) -> tuple[str | int, SolverState]:
+        """Get the max amount of bonds that can be shorted, warm started from a previous solution.
+
+        Without an initial guess, the solve starts from `calculate_max_short`. Every result passes the exact
+        open short and solvency checks.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a short.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price of underlying vault.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        current_time: str | int (U256)
+            The current block timestamp, in seconds. Trades are checked as if opened at this time.
+        initial_guess: str | int (FixedPoint) | SolverState, optional
+            A previous max short, or the solver state returned by a previous call. Defaults to a cold start.
+        maybe_conservative_price: str | int (FixedPoint), optional
+            A lower bound on the realized price that the short will pay.
+            Only used to start a solve without an initial guess.
+        maybe_max_iterations: int, optional
+            The maximum number of trade sizes to evaluate. Defaults to 128.
+
+        Returns
+        -------
+        tuple[str | int (FixedPoint), SolverState]
+            The max short in bonds and the solver state to warm start the next call with.
+        """
+        return self._rust_state.calculate_max_short_warm(
+            budget,
+            open_vault_share_price,
+            checkpoint_exposure,
+            current_time,
+            initial_guess,
+            maybe_conservative_price,
+            maybe_max_iterations,
+        )
+
+    def calculate_max_long_anytime(
+        self,
+        budget: str | int,
+        checkpoint_exposure: str | int,
+        current_time: str | int,
+        *,
+        maybe_time_budget_ns: int | None = None,
+        maybe_max_evaluations: int | None = None,
+        initial_guess: str | int | SolverState | None = None,
+    ) -> tuple[str | int, SolverState]:
+        """Get the max amount of base that can be spent on a long within a time or evaluation budget.
+
+        The solver stops as soon as either budget runs out and returns the largest trade size it has
+        shown to be feasible, so the result never exceeds the true max long. Feasible means that it passes
+        the exact open long and solvency checks. Check `SolverState.converged` to see whether the solve
+        finished. Without an initial guess, the search starts from `calculate_max_long`, which isn't interrupted by
+        the time budget.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a long.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        current_time: str | int (U256)
+            The current block timestamp, in seconds. Trades are checked as if opened at this time.
+        maybe_time_budget_ns: int, optional
+            The wall time the call may take in nanoseconds. Defaults to no time limit.
+        maybe_max_evaluations: int, optional
+            The maximum number of trade sizes to evaluate. Defaults to 128.
+        initial_guess: str | int (FixedPoint) | SolverState, optional
+            A previous max long, or the solver state returned by a previous call. Defaults to a cold start.
+
+        Returns
+        -------
+        tuple[str | int (FixedPoint), SolverState]
+            The max long in base and the solver state to warm start the next call with.
+        """
+        return self._rust_state.calculate_max_long_anytime(
+            budget, checkpoint_exposure, current_time, maybe_time_budget_ns, maybe_max_evaluations, initial_guess
+        )
+
+    def calculate_max_short_anytime(
+        self,
+        budget: str | int,
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+        current_time: str | int,
+        *,
+        maybe_time_budget_ns: int | None = None,
+        maybe_max_evaluations: int | None = None,
+        initial_guess: str | int | SolverState | None = None,
+        maybe_conservative_price: str | int | None = None,
+    ) -> tuple[str | int, SolverState]:
+        """Get the max amount of bonds that can be shorted within a time or evaluation budget.
+
+        The solver stops as soon as either budget runs out and returns the largest trade size it has
+        shown to be feasible, so the result never exceeds the true max short. Feasible means that it passes
+        the exact open short and solvency checks. Check `SolverState.converged` to see whether the solve
+        finished. Without an initial guess, the search starts from `calculate_max_short`, which isn't interrupted by
+        the time budget.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a short.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price of underlying vault.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        current_time: str | int (U256)
+            The current block timestamp, in seconds. Trades are checked as if opened at this time.
+        maybe_time_budget_ns: int, optional
+            The wall time the call may take in nanoseconds. Defaults to no time limit.
+        maybe_max_evaluations: int, optional
+            The maximum number of trade sizes to evaluate. Defaults to 128.
+        initial_guess: str | int (FixedPoint) | SolverState, optional
+            A previous max short, or the solver state returned by a previous call. Defaults to a cold start.
+        maybe_conservative_price: str | int (FixedPoint), optional
+            A lower bound on the realized price that the short will pay.
+            Only used to start a solve without an initial guess.
+
+        Returns
+        -------
+        tuple[str | int (FixedPoint), SolverState]
+            The max short in bonds and the solver state to warm start the next call with.
+        """
+        return self._rust_state.calculate_max_short_anytime(
+            budget,
+            open_vault_share_price,
+            checkpoint_exposure,
+            current_time,
+            maybe_time_budget_ns,
+            maybe_max_evaluations,
+            initial_guess,
+            maybe_conservative_price,
+        )
+
+    def calculate_max_long_with_diagnostics(
+        self,
+        budget: str | int,
+        checkpoint_exposure: str | int,
+        maybe_max_iterations: int | None = None,
+        *,
+        with_trace: bool = False,
+    ) -> types.SolverDiagnostics:
+        """Get the max long along with diagnostics for how the solver converged.
+
+        The solver is rerun with a logarithmic number of iteration limits to find how many iterations it took, so
+        this is slower than a plain solve and is meant for tuning iteration limits. `wall_time_ns` only times the
+        final solve: the call runs O(log k) extra solves for a solve that took k iterations, or O(k^2) iterations
+        with the trace.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a long.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+        with_trace: bool, optional
+            If True, the value after each iteration is recorded. This reruns the solver once per iteration, so it
+            is much slower. Defaults to False.
+
+        Returns
+        -------
+        SolverDiagnostics
+            The max long and the solver's convergence diagnostics.
+        """
+        return types.SolverDiagnostics(
+            *self._rust_state.calculate_max_long_with_diagnostics(
+                budget, checkpoint_exposure, maybe_max_iterations, with_trace
+            )
+        )
+
+    def calculate_max_short_with_diagnostics(
+        self,
+        budget: str | int,
+        open_vault_share_price: str | int,
+        checkpoint_exposure: str | int,
+        maybe_conservative_price: str | int | None = None,
+        maybe_max_iterations: int | None = None,
+        *,
+        with_trace: bool = False,
+    ) -> types.SolverDiagnostics:
+        """Get the max short along with diagnostics for how the solver converged.
+
+        The solver is rerun with a logarithmic number of iteration limits to find how many iterations it took, so
+        this is slower than a plain solve and is meant for tuning iteration limits. `wall_time_ns` only times the
+        final solve: the call runs O(log k) extra solves for a solve that took k iterations, or O(k^2) iterations
+        with the trace.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a short.
+        open_vault_share_price: str | int (FixedPoint)
+            The share price of underlying vault.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        maybe_conservative_price: str | int (FixedPoint), optional
+            A lower bound on the realized price that the short will pay.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+        with_trace: bool, optional
+            If True, the value after each iteration is recorded. This reruns the solver once per iteration, so it
+            is much slower. Defaults to False.
+
+        Returns
+        -------
+        SolverDiagnostics
+            The max short and the solver's convergence diagnostics.
+        """
+        return types.SolverDiagnostics(
+            *self._rust_state.calculate_max_short_with_diagnostics(
+                budget,
+                open_vault_share_price,
+                checkpoint_exposure,
+                maybe_conservative_price,
+                maybe_max_iterations,
+                with_trace,
+            )
+        )
+
+    def calculate_targeted_long_with_budget_with_diagnostics(
+        self,
+        budget: str | int,
+        target_rate: str | int,
+        checkpoint_exposure: str | int,
+        maybe_max_iterations: int | None = None,
+        maybe_allowable_error: str | int | None = None,
+        *,
+        with_trace: bool = False,
+    ) -> types.SolverDiagnostics:
+        """Get the targeted long along with diagnostics for how the solver converged.
+
+        The solver is rerun with a logarithmic number of iteration limits to find how many iterations it took, so
+        this is slower than a plain solve and is meant for tuning iteration limits. `wall_time_ns` only times the
+        final solve: the call runs O(log k) extra solves for a solve that took k iterations, or O(k^2) iterations
+        with the trace.
+
+        Arguments
+        ---------
+        budget: str | int (FixedPoint)
+            The account budget in base for making a long.
+        target_rate: str | int (FixedPoint)
+            The target fixed rate.
+        checkpoint_exposure: str | int (I256)
+            The net exposure for the given checkpoint.
+        maybe_max_iterations: int, optional
+            The number of iterations to use for the Newtonian method.
+        maybe_allowable_error: str | int (FixedPoint), optional
+            The amount of error supported for reaching the target rate.
+        with_trace: bool, optional
+            If True, the value after each iteration is recorded. This reruns the solver once per iteration, so it
+            is much slower. Defaults to False.
+
+        Returns
+        -------
+        SolverDiagnostics
+            The targeted long and the solver's convergence diagnostics. The residual is the distance between
+            the spot rate after the long and the target rate.
+        """
+        return types.SolverDiagnostics(
+            *self._rust_state.calculate_targeted_long_with_budget_with_diagnostics(
+                budget,
+                target_rate,
+                checkpoint_exposure,
+                maybe_max_iterations,
+                maybe_allowable_error,
+                with_trace,
+            )
+        )
@@ -0,0 +1,228 @@
+"""HyperdriveState methods that quote trades."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from . import types
+
+
+class _TradeMethods:
+    """Fee breakdowns, fused trade quotes and price impact curves."""
+
+    _rust_state: Any
+
+    def calculate_fees_open_long(self, base_amount: str | int) -> types.TradeFees:
+        """Gets all of the fees paid when opening a long, in bonds.
+
+        Arguments
+        ---------
+        base_amount: str | int (FixedPoint)
+            The amount to spend, in base.
+
+        Returns
+        -------
+        TradeFees
+            The curve and governance fees in bonds. Open longs have no flat fee.
+        """
+        return types.TradeFees(*self._rust_state.calculate_fees_open_long(base_amount))
+
+    def calculate_fees_close_long(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> types.TradeFees:
+        """Gets all of the fees paid when closing a long, in shares.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to close.
+        maturity_time: str | int (U256)
+            The maturity time of the long.
+        current_time: str | int (U256)
+            The current block time.
+
+        Returns
+        -------
+        TradeFees
+            The curve, flat and governance fees in shares.
+        """
+        return types.TradeFees(*self._rust_state.calculate_fees_close_long(bond_amount, maturity_time, current_time))
+
+    def calculate_fees_open_short(self, bond_amount: str | int, spot_price: str | int | None = None) -> types.TradeFees:
+        """Gets all of the fees paid when opening a short, in base.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to short.
+        spot_price: str | int (FixedPoint) | None, optional
+            The spot price to compute the fees at. Defaults to the pool's current spot price.
+
+        Returns
+        -------
+        TradeFees
+            The curve and governance fees in base. Open shorts have no flat fee.
+        """
+        return types.TradeFees(*self._rust_state.calculate_fees_open_short(bond_amount, spot_price))
+
+    def calculate_fees_close_short(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> types.TradeFees:
+        """Gets all of the fees paid when closing a short, in shares.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to close.
+        maturity_time: str | int (U256)
+            The maturity time of the short.
+        current_time: str | int (U256)
+            The current block time.
+
+        Returns
+        -------
+        TradeFees
+            The curve, flat and governance fees in shares.
+        """
+        return types.TradeFees(*self._rust_state.calculate_fees_close_short(bond_amount, maturity_time, current_time))
+
+    def quote_open_long(self, base_amount: str | int) -> types.TradeQuote:
+        """Quotes opening a long in a single pass over the curve.
+
+        Arguments
+        ---------
+        base_amount: str | int (FixedPoint)
+            The amount to spend, in base.
+
+        Returns
+        -------
+        TradeQuote
+            The bonds received, the fees in bonds, the spot price and rate after the trade,
+            the fixed rate locked in by the trade and its price impact.
+        """
+        return _to_trade_quote(self._rust_state.quote_open_long(base_amount))
+
+    def quote_open_short(
+        self, bond_amount: str | int, open_vault_share_price: str | int | None = None
+    ) -> types.TradeQuote:
+        """Quotes opening a short in a single pass over the curve.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to short.
+        open_vault_share_price: str | int (FixedPoint) | None, optional
+            The vault share price at the start of the checkpoint. Defaults to the pool's vault share price.
+
+        Returns
+        -------
+        TradeQuote
+            The base deposit, the fees in base, the spot price and rate after the trade,
+            the rate implied by the bond sale price and its price impact.
+        """
+        return _to_trade_quote(self._rust_state.quote_open_short(bond_amount, open_vault_share_price))
+
+    def quote_close_long(
+        self, bond_amount: str | int, maturity_time: str | int, current_time: str | int
+    ) -> types.TradeQuote:
+        """Quotes closing a long in a single pass over the curve.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to close.
+        maturity_time: str | int (U256)
+            The maturity time of the long.
+        current_time: str | int (U256)
+            The current block time.
+
+        Returns
+        -------
+        TradeQuote
+            The shares received, the fees in shares, the spot price and rate after the trade,
+            the rate implied by the bond sale price over the time remaining and its price impact.
+        """
+        return _to_trade_quote(self._rust_state.quote_close_long(bond_amount, maturity_time, current_time))
+
+    def quote_close_short(
+        self,
+        bond_amount: str | int,
+        open_vault_share_price: str | int,
+        close_vault_share_price: str | int,
+        maturity_time: str | int,
+        current_time: str | int,
+    ) -> types.TradeQuote:
+        """Quotes closing a short in a single pass over the curve.
+
+        Arguments
+        ---------
+        bond_amount: str | int (FixedPoint)
+            The amount of bonds to close.
+        open_vault_share_price: str | int (FixedPoint)
+            The vault share price at the start of the checkpoint the short was opened in.
+        close_vault_share_price: str | int (FixedPoint)
+            The vault share price when the short is closed.
+        maturity_time: str | int (U256)
+            The maturity time of the short.
+        current_time: str | int (U256)
+            The current block time.
+
+        Returns
+        -------
+        TradeQuote
+            The shares received, the fees in shares, the spot price and rate after the trade,
+            the rate implied by the bond buy back price over the time remaining and its price impact.
+        """
+        return _to_trade_quote(
+            self._rust_state.quote_close_short(
+                bond_amount, open_vault_share_price, close_vault_share_price, maturity_time, current_time
+            )
+        )
+
+    def price_impact_curve(
+        self,
+        side: str,
+        min_size: str | int,
+        max_size: str | int,
+        max_points: int = 64,
+        tolerance: str | int = 0,
+    ) -> tuple[list[str | int], list[str | int], list[str | int]]:
+        """Samples the spot rate after opening a trade over a range of trade sizes.
+
+        Sampling is adaptive: intervals where the rate curve bends the most are split first,
+        so the points are densest where the curve has the most curvature.
+
+        Arguments
+        ---------
+        side: str
+            Either "long", for sizes in base, or "short", for sizes in bonds.
+        min_size: str | int (FixedPoint)
+            The smallest trade size to sample. Raised to the pool's minimum transaction amount.
+        max_size: str | int (FixedPoint)
+            The largest trade size to sample. Capped at the max long or max short.
+        max_points: int, optional
+            The maximum number of points to sample. Defaults to 64.
+        tolerance: str | int (FixedPoint), optional
+            Sampling stops once the spot rate at the midpoint of every interval is within this
+            distance of the straight line between its endpoints. Defaults to 0.
+
+        Returns
+        -------
+        tuple[list[str | int], list[str | int], list[str | int]]
+            The trade sizes in increasing order, the trade outputs (bonds for longs, the base
+            deposit for shorts) and the spot rates after each trade.
+        """
+        return self._rust_state.price_impact_curve(side, min_size, max_size, max_points, tolerance)
+
+
+def _to_trade_quote(values: tuple) -> types.TradeQuote:
+    """Builds a TradeQuote from the flat tuple returned by the rust quote methods."""
+    amount, curve_fee, flat_fee, governance_fee, spot_price_after, spot_rate_after, realized_rate, price_impact = values
+    return types.TradeQuote(
+        amount=amount,
+        fees=types.TradeFees(curve=curve_fee, flat=flat_fee, governance=governance_fee),
+        spot_price_after=spot_price_after,
+        spot_rate_after=spot_rate_after,
+        realized_rate=realized_rate,
+        price_impact=price_impact,
+    )
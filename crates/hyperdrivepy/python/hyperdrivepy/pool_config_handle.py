@@ -0,0 +1,67 @@
+"""Python wrapper for a pool config that is extracted once and reused."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from . import types
+
+# pylint: disable=no-name-in-module
+from . import hyperdrivepy as rust_module  # type: ignore
+
+# The number of pools whose handles are kept by `get_pool_config_handle`.
+MAX_POOL_CONFIG_HANDLES = 256
+
+# The registered handles, keyed on lowercase address and ordered from least to most recently used.
+_POOL_CONFIG_HANDLES: OrderedDict[str, PoolConfigHandle] = OrderedDict()
+
+
+# The handle only carries the extracted config, which is read by the functions it's passed to.
+class PoolConfigHandle:  # pylint: disable=too-few-public-methods
+    """A pool config that is converted into its rust representation a single time.
+
+    The pool config is set at deploy time, so a handle can be passed anywhere a pool config is accepted
+    to skip re-extracting the config fields on every call.
+    """
+
+    def __init__(self, pool_config: types.PoolConfigType) -> None:
+        """Initialize the handle from a pool config.
+
+        Arguments
+        ---------
+        pool_config: PoolConfig
+            Static configuration for the hyperdrive contract.
+            Set at deploy time.
+        """
+        self._rust_handle = rust_module.PoolConfigHandle(pool_config)
+
+
+def get_pool_config_handle(hyperdrive_address: str, pool_config: types.PoolConfigType) -> PoolConfigHandle:
+    """Get the cached pool config handle for a hyperdrive pool, creating it on first use.
+
+    Handles for the `MAX_POOL_CONFIG_HANDLES` most recently used pools are kept.
+
+    Arguments
+    ---------
+    hyperdrive_address: str
+        The address of the hyperdrive contract, used as the cache key. Checksummed and lowercase
+        addresses refer to the same pool.
+    pool_config: PoolConfig
+        Static configuration for the hyperdrive contract.
+        Only read the first time the address is seen.
+
+    Returns
+    -------
+    PoolConfigHandle
+        The handle registered for the address.
+    """
+    key = hyperdrive_address.lower()
+    handle = _POOL_CONFIG_HANDLES.get(key)
+    if handle is None:
+        handle = PoolConfigHandle(pool_config)
+        _POOL_CONFIG_HANDLES[key] = handle
+        if len(_POOL_CONFIG_HANDLES) > MAX_POOL_CONFIG_HANDLES:
+            _POOL_CONFIG_HANDLES.popitem(last=False)
+    else:
+        _POOL_CONFIG_HANDLES.move_to_end(key)
+    return handle
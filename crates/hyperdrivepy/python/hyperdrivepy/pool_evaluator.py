@@ -0,0 +1,64 @@
+"""Python wrapper for evaluating many hyperdrive pools in parallel."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from . import types
+from .hyperdrive_state import HyperdriveState
+from .utils import rust_module
+
+# The wrapper mirrors the options of the rust function.
+# pylint: disable=too-many-arguments
+
+DEFAULT_POOL_METRICS = ("spot_price", "spot_rate", "solvency", "max_long", "max_short")
+
+
+def evaluate_pools(
+    snapshots: Sequence[HyperdriveState | tuple[types.PoolConfigType, types.PoolInfoType]],
+    metrics: Sequence[str] = DEFAULT_POOL_METRICS,
+    *,
+    budget: str | int | None = None,
+    checkpoint_exposure: str | int | None = None,
+    maybe_max_iterations: int | None = None,
+    native_ints: bool = False,
+    as_buffer: bool = False,
+) -> dict[str, list[str | int]] | dict[str, bytes]:
+    """Evaluate a set of metrics for many pools in a single call.
+
+    The pools are evaluated in parallel across a rust thread pool with the GIL released.
+
+    Arguments
+    ---------
+    snapshots: Sequence[HyperdriveState | tuple[PoolConfig, PoolInfo]]
+        The pools to evaluate, either as prebuilt states or as (pool_config, pool_info) pairs.
+    metrics: Sequence[str], optional
+        The metrics to compute for every pool. Supported metrics are "spot_price", "spot_rate",
+        "solvency", "max_spot_price", "idle_share_reserves_in_base", "max_long" and "max_short".
+    budget: str | int (FixedPoint), optional
+        The budget in base used for "max_long" and "max_short". Defaults to an unbounded budget.
+    checkpoint_exposure: str | int (I256), optional
+        The net exposure of the current checkpoint used for "max_long" and "max_short". Defaults to zero.
+    maybe_max_iterations: int, optional
+        The number of iterations to use for the max long and max short solvers.
+    native_ints: bool, optional
+        If True, the results are python ints instead of decimal strings.
+    as_buffer: bool, optional
+        If True, each metric's results are returned as a single bytes buffer of 32-byte little-endian words,
+        which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+    Returns
+    -------
+    dict[str, list[str | int]] | dict[str, bytes]
+        A mapping from each metric name to a list with one value per pool, in the order of `snapshots`.
+        With `as_buffer`, each metric maps to a bytes buffer with one word per pool.
+        Max shorts are computed with the pool's current vault share price as the open share price.
+    """
+    # pylint: disable=protected-access
+    rust_states = [
+        snapshot._rust_state if isinstance(snapshot, HyperdriveState) else HyperdriveState(*snapshot)._rust_state
+        for snapshot in snapshots
+    ]
+    return rust_module.evaluate_pools(
+        rust_states, list(metrics), budget, checkpoint_exposure, maybe_max_iterations, native_ints, as_buffer
+    )
@@ -0,0 +1,82 @@
+"""Python wrapper for evaluating a pool over a columnar history of pool info snapshots."""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+from . import types
+from .pool_config_handle import PoolConfigHandle
+from .utils import rust_module
+
+# The wrapper mirrors the options of the rust function.
+# pylint: disable=too-many-arguments
+
+DEFAULT_HISTORY_METRICS = ("spot_price", "spot_rate", "solvency")
+
+
+def replay_pool_history(
+    pool_config: types.PoolConfigType | PoolConfigHandle,
+    columns: Mapping[str, Any],
+    metrics: Sequence[str] = DEFAULT_HISTORY_METRICS,
+    *,
+    block_timestamps: Any | None = None,
+    budget: str | int | None = None,
+    checkpoint_exposure: str | int | None = None,
+    maybe_max_iterations: int | None = None,
+    native_ints: bool = False,
+    as_buffer: bool = False,
+) -> dict[str, list[str | int]] | dict[str, bytes]:
+    """Evaluate a set of metrics for every row of a pool info history.
+
+    The history is given as one column per PoolInfo field, e.g. one entry per block. The columns are converted
+    once and the rows are evaluated in parallel across a rust thread pool with the GIL released, so no PoolInfo
+    is built in python.
+
+    Arguments
+    ---------
+    pool_config: PoolConfig | PoolConfigHandle
+        Static configuration for the hyperdrive contract.
+        Set at deploy time.
+    columns: Mapping[str, column]
+        A column for every PoolInfo field, named as in the solidity struct (e.g. `shareReserves`).
+        A column can be a sequence of python ints or decimal strings, a numpy integer array, a (rows, 4) numpy
+        uint64 array of little-endian limbs, or an Arrow decimal256 array with a scale of 0 and no nulls, which is
+        read straight from its data buffer. Every column must have the same length.
+    metrics: Sequence[str], optional
+        The metrics to compute for every row. Supported metrics are "spot_price", "spot_rate", "solvency",
+        "max_spot_price", "idle_share_reserves_in_base", "present_value", "max_long" and "max_short".
+        The max long and max short solves don't go through the solver cache, since every row is a different state.
+    block_timestamps: column, optional
+        The block timestamp of every row. Required for "present_value".
+    budget: str | int (FixedPoint), optional
+        The budget in base used for "max_long" and "max_short". Defaults to an unbounded budget.
+    checkpoint_exposure: str | int (I256), optional
+        The net exposure of the current checkpoint used for "max_long" and "max_short". Defaults to zero.
+    maybe_max_iterations: int, optional
+        The number of iterations to use for the max long and max short solvers.
+    native_ints: bool, optional
+        If True, the results are python ints instead of decimal strings.
+    as_buffer: bool, optional
+        If True, each metric's results are returned as a single bytes buffer of 32-byte little-endian words,
+        which numpy and Arrow can view without copying. See `hyperdrivepy.buffers`. Defaults to False.
+
+    Returns
+    -------
+    dict[str, list[str | int]] | dict[str, bytes]
+        A mapping from each metric name to a list with one value per row.
+        With `as_buffer`, each metric maps to a bytes buffer with one word per row.
+        Max shorts are computed with each row's vault share price as the open share price.
+    """
+    if isinstance(pool_config, PoolConfigHandle):
+        pool_config = pool_config._rust_handle  # pylint: disable=protected-access
+    return rust_module.replay_pool_history(
+        pool_config,
+        dict(columns),
+        list(metrics),
+        block_timestamps,
+        budget,
+        checkpoint_exposure,
+        maybe_max_iterations,
+        native_ints,
+        as_buffer,
+    )
@@ -0,0 +1,264 @@
+"""An append-only, memory-mapped archive of pool snapshots indexed by block number."""
+
+from __future__ import annotations
+
+import mmap
+import os
+from typing import Iterator
+
+from . import types
+from .hyperdrive_state import HyperdriveState
+
+WORD_SIZE = 32
+POOL_INFO_FIELDS = (
+    "shareReserves",
+    "shareAdjustment",
+    "zombieBaseProceeds",
+    "zombieShareReserves",
+    "bondReserves",
+    "lpTotalSupply",
+    "vaultSharePrice",
+    "longsOutstanding",
+    "longAverageMaturityTime",
+    "shortsOutstanding",
+    "shortAverageMaturityTime",
+    "withdrawalSharesReadyToWithdraw",
+    "withdrawalSharesProceeds",
+    "lpSharePrice",
+    "longExposure",
+)
+POOL_INFO_SIZE = WORD_SIZE * len(POOL_INFO_FIELDS)
+RECORD_SIZE = WORD_SIZE + POOL_INFO_SIZE
+
+_MAGIC = b"hyperdrivepy snapshots v1".ljust(WORD_SIZE, b"\0")
+
+
+class SnapshotStore:
+    """An append-only file of pool info snapshots for a single pool, read through a memory map.
+
+    The file starts with a header holding the pool config, encoded as in `HyperdriveState.to_bytes`. It is
+    followed by one fixed-width record per snapshot: the block number as a 32-byte big-endian word and the pool
+    info as 15 32-byte words. Records are appended in increasing block order, so the record for a block is found
+    with a binary search over the memory map and no index has to be loaded. Opening a store only maps the file,
+    however many snapshots it holds.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        pool_config: types.PoolConfigType | None = None,
+        native_ints: bool = False,
+        readonly: bool = False,
+    ) -> None:
+        """Open a snapshot store, creating it if the file doesn't exist.
+
+        Arguments
+        ---------
+        path: str | os.PathLike
+            The path of the store file.
+        pool_config: PoolConfig, optional
+            Static configuration for the hyperdrive contract.
+            Required to create a new store, and ignored when opening an existing one.
+        native_ints: bool, optional
+            If True, the states read from the store return python ints instead of decimal strings.
+            Defaults to False.
+        readonly: bool, optional
+            If True, the file is opened without write access and `append` raises. Defaults to False.
+        """
+        self._native_ints = native_ints
+        if os.path.exists(path):
+            self._file = open(path, "rb" if readonly else "r+b")  # pylint: disable=consider-using-with
+            self._config_bytes = self._read_header()
+        else:
+            if pool_config is None or readonly:
+                raise FileNotFoundError(f"No snapshot store at {path}, and a pool config is needed to create one")
+            self._file = open(path, "w+b")  # pylint: disable=consider-using-with
+            empty_info = types.PoolInfo(*["0"] * len(POOL_INFO_FIELDS))
+            self._config_bytes = HyperdriveState(pool_config, empty_info).to_bytes()[:-POOL_INFO_SIZE]
+            self._file.write(_MAGIC + len(self._config_bytes).to_bytes(WORD_SIZE, "big") + self._config_bytes)
+        self._template = HyperdriveState.from_bytes(self._config_bytes + bytes(POOL_INFO_SIZE), native_ints)
+        self._file.seek(0, os.SEEK_END)
+        # A record that was only partially written, e.g. by a crashed writer, is ignored and overwritten.
+        self._num_records = (self._file.tell() - self._header_size) // RECORD_SIZE
+        self._mapping: mmap.mmap | None = None
+        self._last_block_number = (
+            self._block_number_at(self._map(), self._num_records - 1) if self._num_records > 0 else None
+        )
+        self._file.seek(self._header_size + self._num_records * RECORD_SIZE)
+
+    @property
+    def _header_size(self) -> int:
+        return 2 * WORD_SIZE + len(self._config_bytes)
+
+    def _read_header(self) -> bytes:
+        header = self._file.read(2 * WORD_SIZE)
+        if header[:WORD_SIZE] != _MAGIC:
+            raise ValueError(f"{self._file.name} is not a hyperdrivepy snapshot store")
+        config_size = int.from_bytes(header[WORD_SIZE:], "big")
+        return self._file.read(config_size)
+
+    def _map(self) -> mmap.mmap:
+        size = self._header_size + self._num_records * RECORD_SIZE
+        if self._mapping is None or len(self._mapping) < size:
+            # The old mapping isn't closed, since views from `records` and running `scan` generators may still
+            # read from it. It is unmapped once the last of them is released.
+            self._file.flush()
+            self._mapping = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        return self._mapping
+
+    def _record_offset(self, index: int) -> int:
+        return self._header_size + index * RECORD_SIZE
+
+    def _block_number_at(self, mapping: mmap.mmap, index: int) -> int:
+        offset = self._record_offset(index)
+        return int.from_bytes(mapping[offset : offset + WORD_SIZE], "big")
+
+    def _bisect_right(self, block_number: int) -> int:
+        """Return the number of snapshots at or before the block."""
+        mapping = self._map()
+        low, high = 0, self._num_records
+        while low < high:
+            middle = (low + high) // 2
+            if self._block_number_at(mapping, middle) <= block_number:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _state_at_index(self, mapping: mmap.mmap, index: int) -> HyperdriveState:
+        offset = self._record_offset(index) + WORD_SIZE
+        return HyperdriveState.from_bytes(
+            self._config_bytes + mapping[offset : offset + POOL_INFO_SIZE], self._native_ints
+        )
+
+    def __len__(self) -> int:
+        return self._num_records
+
+    def append(self, block_number: int, snapshot: HyperdriveState | types.PoolInfoType | tuple) -> None:
+        """Append the pool info at a block.
+
+        Arguments
+        ---------
+        block_number: int
+            The block of the snapshot. Must be larger than the block of the last snapshot.
+        snapshot: HyperdriveState | PoolInfo | tuple
+            The pool info, as a state for this pool, a PoolInfo dataclass, or the tuple returned by a contract call.
+        """
+        if self._file.mode == "rb":
+            raise ValueError("The snapshot store was opened read only")
+        if self._last_block_number is not None and block_number <= self._last_block_number:
+            raise ValueError(
+                f"Snapshots must be appended in increasing block order, got {block_number} after "
+                f"{self._last_block_number}"
+            )
+        if isinstance(snapshot, HyperdriveState):
+            state_bytes = snapshot.to_bytes()
+            if state_bytes[:-POOL_INFO_SIZE] != self._config_bytes:
+                raise ValueError("The state's pool config doesn't match the snapshot store")
+        elif isinstance(snapshot, tuple):
+            state_bytes = self._template.with_info(**dict(zip(POOL_INFO_FIELDS, snapshot))).to_bytes()
+        else:
+            state_bytes = self._template.with_info(
+                **{name: getattr(snapshot, name) for name in POOL_INFO_FIELDS}
+            ).to_bytes()
+        self._file.write(block_number.to_bytes(WORD_SIZE, "big") + state_bytes[-POOL_INFO_SIZE:])
+        self._num_records += 1
+        self._last_block_number = block_number
+
+    def flush(self) -> None:
+        """Write the appended snapshots to disk."""
+        self._file.flush()
+
+    @property
+    def first_block_number(self) -> int:
+        """The block of the first snapshot."""
+        if self._num_records == 0:
+            raise IndexError("The snapshot store is empty")
+        return self._block_number_at(self._map(), 0)
+
+    @property
+    def last_block_number(self) -> int:
+        """The block of the last snapshot."""
+        if self._last_block_number is None:
+            raise IndexError("The snapshot store is empty")
+        return self._last_block_number
+
+    def state_at(self, block_number: int) -> HyperdriveState:
+        """Get the pool state at a block.
+
+        The state at a block is the latest snapshot at or before it, and is found with a binary search.
+
+        Arguments
+        ---------
+        block_number: int
+            The block to get the state at.
+
+        Returns
+        -------
+        HyperdriveState
+            The state of the pool at the block.
+        """
+        index = self._bisect_right(block_number) - 1
+        if index < 0:
+            raise KeyError(f"No snapshot at or before block {block_number}")
+        return self._state_at_index(self._map(), index)
+
+    def scan(self, start_block: int = 0, end_block: int | None = None) -> Iterator[tuple[int, HyperdriveState]]:
+        """Iterate over the snapshots in a block range.
+
+        Arguments
+        ---------
+        start_block: int, optional
+            The first block of the range. Defaults to 0.
+        end_block: int, optional
+            The block after the last block of the range. Defaults to the end of the store.
+
+        Returns
+        -------
+        Iterator[tuple[int, HyperdriveState]]
+            The block number and state of each snapshot in the range, in block order.
+        """
+        start, end = self._index_range(start_block, end_block)
+        mapping = self._map()
+        for index in range(start, end):
+            yield self._block_number_at(mapping, index), self._state_at_index(mapping, index)
+
+    def records(self, start_block: int = 0, end_block: int | None = None) -> memoryview:
+        """Get a read-only view of the raw records in a block range, without copying them.
+
+        Each record is the block number and the 15 PoolInfo fields, as 32-byte big-endian words.
+        Signed fields are two's complement.
+
+        Arguments
+        ---------
+        start_block: int, optional
+            The first block of the range. Defaults to 0.
+        end_block: int, optional
+            The block after the last block of the range. Defaults to the end of the store.
+
+        Returns
+        -------
+        memoryview
+            The records in the range, `RECORD_SIZE` bytes each. Appending doesn't invalidate the view, but
+            release it before closing the store.
+        """
+        start, end = self._index_range(start_block, end_block)
+        return memoryview(self._map())[self._record_offset(start) : self._record_offset(end)]
+
+    def _index_range(self, start_block: int, end_block: int | None) -> tuple[int, int]:
+        start = self._bisect_right(start_block - 1) if start_block > 0 else 0
+        end = self._num_records if end_block is None else self._bisect_right(end_block - 1)
+        return start, max(start, end)
+
+    def close(self) -> None:
+        """Flush the appended snapshots and close the file."""
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+        self._file.close()
+
+    def __enter__(self) -> SnapshotStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,38 @@
+"""Python wrapper for the opt-in cache of iterative solver results."""
+
+from __future__ import annotations
+
+from .utils import rust_module
+
+
+def set_solver_cache_size(max_size: int) -> None:
+    """Enable the solver cache, or change how many results it holds.
+
+    When enabled, results from `calculate_max_long`, `calculate_max_short`, `calculate_targeted_long`
+    and the max long and max short metrics in `evaluate_pools` are cached in a process wide LRU cache. The cache is
+    keyed on a fingerprint of the pool config and pool info together with the solver arguments, so repeated solves
+    for the same pool and arguments are lookups.
+
+    Arguments
+    ---------
+    max_size: int
+        The maximum number of results to keep. A size of 0 disables the cache and drops every cached result.
+        Shrinking the cache evicts the least recently used results.
+    """
+    rust_module.set_solver_cache_size(max_size)
+
+
+def clear_solver_cache() -> None:
+    """Drop every cached solver result and reset the hit and miss counts."""
+    rust_module.clear_solver_cache()
+
+
+def solver_cache_stats() -> dict[str, int]:
+    """Get the solver cache statistics.
+
+    Returns
+    -------
+    dict[str, int]
+        The cache `hits`, `misses`, current `size` and `max_size`. Everything is 0 while the cache is disabled.
+    """
+    return rust_module.solver_cache_stats()
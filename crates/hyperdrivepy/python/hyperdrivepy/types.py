@@ -62,6 +62,59 @@ class PoolInfo:
     longExposure: str
 
 
+@dataclass
+class TradeFees:
+    """The fees paid on a single trade.
+
+    The units depend on the trade: open long fees are in bonds, open short fees are in base,
+    and close long and close short fees are in shares.
+    """
+
+    curve: str | int
+    flat: str | int
+    governance: str | int
+
+
+@dataclass
+class TradeQuote:
+    """A quote for a single trade.
+
+    The amount is the trade's output for opens and closes of longs and closes of shorts
+    (bonds for an open long, shares for closes) and the trader's deposit in base for an
+    open short. The price impact is the relative change in the spot price caused by the trade.
+    """
+
+    amount: str | int
+    fees: TradeFees
+    spot_price_after: str | int
+    spot_rate_after: str | int
+    realized_rate: str | int
+    price_impact: str | int
+
+
+@dataclass
+class SolverDiagnostics:
+    """Convergence diagnostics for an iterative solve.
+
+    The iterations are the fewest after which the solver returns its final value, or None if it didn't within
+    the 64 iterations that are searched. The residual is the distance from the target rate for targeted longs.
+    For max longs and shorts it is, in base, the smaller of the budget left over and the pool's solvency after
+    the trade, so it is close to zero for whichever constraint limits the trade; infeasible values have a
+    residual of 2**256 - 1. The trace holds the solver's value after each iteration when it was asked for, with
+    None for iterations where the solver returned an error.
+
+    The wall time covers the final solve alone. Finding the iterations takes O(log k) extra solves for a solver
+    that took k iterations, and the trace takes O(k^2) iterations in total, neither of which is included.
+    """
+
+    value: str | int
+    iterations: int | None
+    hit_max_iterations: bool
+    residual: str | int
+    trace: list[str | int | None] | None
+    wall_time_ns: int
+
+
 # TODO: pypechain should either use TypedDicts or generate these interfaces.
 class CheckpointType(Protocol):
     """Checkpoint struct."""
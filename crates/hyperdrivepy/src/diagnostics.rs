@@ -0,0 +1,110 @@
+use std::time::Instant;
+
+use ethers::core::types::U256;
+use eyre::Result;
+use fixed_point::FixedPoint;
+
+// Convergence diagnostics for the iterative solvers in hyperdrive-math.
+//
+// The solvers don't expose their internals, but they are deterministic, so the
+// value after k iterations is the result of solving with a limit of k, and once
+// a solver reaches its final value more iterations return it as well. The
+// number of iterations it took is found with an exponential search over the
+// limit followed by a binary search, which takes O(log k) solves. Recording
+// the value after every iteration takes a solve per iteration and O(k^2)
+// iterations in total, so the trace is only recorded when it is asked for.
+// Only the final solve is timed, so the wall time doesn't include the extra
+// solves. Diagnostics are meant for tuning iteration limits and tolerances,
+// not for the hot path.
+
+// The most iterations that are searched or traced.
+pub const MAX_TRACED_ITERATIONS: usize = 64;
+
+pub struct SolverDiagnostics {
+    pub value: FixedPoint,
+    // The number of iterations after which the solver returned the final value,
+    // or None if it didn't within MAX_TRACED_ITERATIONS.
+    pub iterations: Option<usize>,
+    // True if one more iteration would have changed the result.
+    pub hit_max_iterations: bool,
+    // How far the final value is from satisfying the solver's constraints,
+    // as measured by the caller.
+    pub residual: FixedPoint,
+    // The value after each iteration, if it was asked for. Iterations where
+    // the solver returned an error are None.
+    pub trace: Option<Vec<Option<FixedPoint>>>,
+    // The wall time of the final solve alone.
+    pub wall_time_ns: u64,
+}
+
+// Helper function to find the fewest iterations, up to the limit, after which
+// the solver returns the final value.
+fn find_iterations(
+    value: FixedPoint,
+    limit: usize,
+    solve: &impl Fn(Option<usize>) -> Result<FixedPoint>,
+) -> Option<usize> {
+    let converged = |iterations: usize| solve(Some(iterations)).ok() == Some(value);
+    // The last limit known not to reach the value and the first known to.
+    let mut low = 0;
+    let mut high = 1;
+    while !converged(high) {
+        if high == limit {
+            return None;
+        }
+        low = high;
+        high = (2 * high).min(limit);
+    }
+    while high - low > 1 {
+        let middle = (low + high) / 2;
+        if converged(middle) {
+            high = middle;
+        } else {
+            low = middle;
+        }
+    }
+    Some(high)
+}
+
+pub fn diagnose(
+    maybe_max_iterations: Option<usize>,
+    with_trace: bool,
+    solve: impl Fn(Option<usize>) -> Result<FixedPoint>,
+    residual: impl Fn(FixedPoint) -> FixedPoint,
+) -> Result<SolverDiagnostics> {
+    let start = Instant::now();
+    let value = solve(maybe_max_iterations)?;
+    let wall_time_ns = start.elapsed().as_nanos().min(u64::MAX as u128) as u64;
+
+    let limit = maybe_max_iterations
+        .unwrap_or(MAX_TRACED_ITERATIONS)
+        .clamp(1, MAX_TRACED_ITERATIONS);
+    let iterations = find_iterations(value, limit, &solve);
+    let searched = iterations.unwrap_or(limit);
+    let hit_max_iterations = solve(Some(searched + 1)).ok() != Some(value);
+    let trace = if with_trace {
+        Some(
+            (1..=searched)
+                .map(|iterations| solve(Some(iterations)).ok())
+                .collect(),
+        )
+    } else {
+        None
+    };
+    Ok(SolverDiagnostics {
+        value,
+        iterations,
+        hit_max_iterations,
+        residual: residual(value),
+        trace,
+        wall_time_ns,
+    })
+}
+
+impl SolverDiagnostics {
+    pub fn trace_u256(&self) -> Option<Vec<Option<U256>>> {
+        self.trace
+            .as_ref()
+            .map(|trace| trace.iter().map(|value| value.map(U256::from)).collect())
+    }
+}
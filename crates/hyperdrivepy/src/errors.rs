@@ -0,0 +1,154 @@
+use std::panic::{catch_unwind, AssertUnwindSafe};
+
+use eyre::{eyre, Result};
+use pyo3::create_exception;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::PyType;
+
+// Exceptions raised when the math rejects a trade. They mirror the custom
+// errors in IHyperdrive so that callers can handle a simulated failure the
+// same way as a reverted transaction. Every exception subclasses ValueError,
+// so callers that catch the conversion errors catch these as well. Before
+// these were added, the math results were unwrapped and failures raised a
+// PanicException.
+
+create_exception!(
+    hyperdrivepy,
+    HyperdriveError,
+    PyValueError,
+    "Base class for the errors returned by the hyperdrive math."
+);
+create_exception!(
+    hyperdrivepy,
+    InsufficientLiquidity,
+    HyperdriveError,
+    "The pool doesn't have the liquidity for the trade."
+);
+create_exception!(
+    hyperdrivepy,
+    MinimumTransactionAmount,
+    HyperdriveError,
+    "The trade is smaller than the pool's minimum transaction amount."
+);
+create_exception!(
+    hyperdrivepy,
+    MinimumSharePrice,
+    HyperdriveError,
+    "The vault share price is below the price the trade was opened at."
+);
+create_exception!(
+    hyperdrivepy,
+    InvalidApr,
+    HyperdriveError,
+    "The pool's rate is outside of the given bounds."
+);
+create_exception!(
+    hyperdrivepy,
+    InvalidLPSharePrice,
+    HyperdriveError,
+    "The LP share price is below the given minimum."
+);
+create_exception!(
+    hyperdrivepy,
+    InvalidPresentValue,
+    HyperdriveError,
+    "The pool's present value can't be computed."
+);
+create_exception!(
+    hyperdrivepy,
+    DecreasedPresentValueWhenAddingLiquidity,
+    HyperdriveError,
+    "Adding liquidity would decrease the pool's present value."
+);
+create_exception!(
+    hyperdrivepy,
+    OutputLimit,
+    HyperdriveError,
+    "The trade's output is below the given minimum."
+);
+
+// The math reports these errors by their contract error name, so the name in
+// the message picks the exception. The first name to appear in the message
+// wins, since nested errors add their context after it.
+fn error_type_from_message<'py>(py: Python<'py>, message: &str) -> &'py PyType {
+    let candidates = [
+        (
+            "DecreasedPresentValueWhenAddingLiquidity",
+            py.get_type::<DecreasedPresentValueWhenAddingLiquidity>(),
+        ),
+        (
+            "InsufficientLiquidity",
+            py.get_type::<InsufficientLiquidity>(),
+        ),
+        (
+            "MinimumTransactionAmount",
+            py.get_type::<MinimumTransactionAmount>(),
+        ),
+        ("MinimumSharePrice", py.get_type::<MinimumSharePrice>()),
+        ("InvalidApr", py.get_type::<InvalidApr>()),
+        ("InvalidLPSharePrice", py.get_type::<InvalidLPSharePrice>()),
+        ("InvalidPresentValue", py.get_type::<InvalidPresentValue>()),
+        ("OutputLimit", py.get_type::<OutputLimit>()),
+    ];
+    candidates
+        .into_iter()
+        .filter_map(|(name, error_type)| message.find(name).map(|index| (index, error_type)))
+        .min_by_key(|(index, _)| *index)
+        .map(|(_, error_type)| error_type)
+        .unwrap_or_else(|| py.get_type::<HyperdriveError>())
+}
+
+// Helper function to raise a math error as the matching typed exception.
+pub fn hyperdrive_error(message: String) -> PyErr {
+    Python::with_gil(|py| PyErr::from_type(error_type_from_message(py, &message), message))
+}
+
+// Helper function to run math that panics instead of returning an error, such
+// as the close long and close short calculations, and return the panic as an
+// error.
+pub fn catch_math_panic<T>(calculate: impl FnOnce() -> T) -> Result<T> {
+    // The math only reads the pool state, so nothing is left half updated.
+    catch_unwind(AssertUnwindSafe(calculate)).map_err(|panic| {
+        let message = panic
+            .downcast_ref::<String>()
+            .map(String::as_str)
+            .or_else(|| panic.downcast_ref::<&str>().copied())
+            .unwrap_or("the math panicked");
+        eyre!("{}", message)
+    })
+}
+
+// Helper function to split batch results into values and a validity mask,
+// using the fallback as the value of each failed element.
+pub fn split_mask<T: Clone>(results: Vec<Result<T>>, fallback: T) -> (Vec<T>, Vec<bool>) {
+    results
+        .into_iter()
+        .map(|result| match result {
+            Ok(value) => (value, true),
+            Err(_) => (fallback.clone(), false),
+        })
+        .unzip()
+}
+
+pub fn add_exceptions(py: Python<'_>, m: &PyModule) -> PyResult<()> {
+    m.add("HyperdriveError", py.get_type::<HyperdriveError>())?;
+    m.add(
+        "InsufficientLiquidity",
+        py.get_type::<InsufficientLiquidity>(),
+    )?;
+    m.add(
+        "MinimumTransactionAmount",
+        py.get_type::<MinimumTransactionAmount>(),
+    )?;
+    m.add("MinimumSharePrice", py.get_type::<MinimumSharePrice>())?;
+    m.add("InvalidApr", py.get_type::<InvalidApr>())?;
+    m.add("InvalidLPSharePrice", py.get_type::<InvalidLPSharePrice>())?;
+    m.add("InvalidPresentValue", py.get_type::<InvalidPresentValue>())?;
+    m.add(
+        "DecreasedPresentValueWhenAddingLiquidity",
+        py.get_type::<DecreasedPresentValueWhenAddingLiquidity>(),
+    )?;
+    m.add("OutputLimit", py.get_type::<OutputLimit>())?;
+    Ok(())
+}
@@ -0,0 +1,60 @@
+use ethers::core::types::U256;
+use fixed_point::FixedPoint;
+use hyperdrive_math::State;
+
+// Each breakdown is returned as (curve fee, flat fee, governance fee).
+
+// Open long fees are paid in bonds and have no flat component.
+pub fn calculate_fees_open_long(
+    state: &State,
+    base_amount: FixedPoint,
+) -> (FixedPoint, FixedPoint, FixedPoint) {
+    (
+        state.open_long_curve_fees(base_amount),
+        FixedPoint::from(U256::zero()),
+        state.open_long_governance_fee(base_amount),
+    )
+}
+
+// Close long fees are paid in shares. Governance takes its cut of both the
+// curve and the flat fee.
+pub fn calculate_fees_close_long(
+    state: &State,
+    bond_amount: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> (FixedPoint, FixedPoint, FixedPoint) {
+    let curve_fee = state.close_long_curve_fee(bond_amount, maturity_time, current_time);
+    let flat_fee = state.close_long_flat_fee(bond_amount, maturity_time, current_time);
+    let governance_fee =
+        (curve_fee + flat_fee).mul_down(FixedPoint::from(state.config.fees.governance_lp));
+    (curve_fee, flat_fee, governance_fee)
+}
+
+// Open short fees are paid in base and have no flat component.
+pub fn calculate_fees_open_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    spot_price: FixedPoint,
+) -> (FixedPoint, FixedPoint, FixedPoint) {
+    (
+        state.open_short_curve_fee(bond_amount, spot_price),
+        FixedPoint::from(U256::zero()),
+        state.open_short_governance_fee(bond_amount, spot_price),
+    )
+}
+
+// Close short fees are paid in shares. Governance takes its cut of both the
+// curve and the flat fee.
+pub fn calculate_fees_close_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> (FixedPoint, FixedPoint, FixedPoint) {
+    let curve_fee = state.close_short_curve_fee(bond_amount, maturity_time, current_time);
+    let flat_fee = state.close_short_flat_fee(bond_amount, maturity_time, current_time);
+    let governance_fee =
+        (curve_fee + flat_fee).mul_down(FixedPoint::from(state.config.fees.governance_lp));
+    (curve_fee, flat_fee, governance_fee)
+}
@@ -1,16 +1,208 @@
+use ethers::core::types::U256;
 use pyo3::prelude::*;
+use pyo3::types::{PyList, PyTuple};
 
-use crate::{PyPoolConfig, PyPoolInfo};
+use crate::diagnostics::SolverDiagnostics;
+use crate::price_impact::TradeSide;
+use crate::solver::MaxTradeSolution;
+use crate::solver_state::SolverState;
+use crate::{u256_buffer_to_py, u256_to_py_int, validity_bitmap_to_py, PyPoolConfig, PyPoolInfo};
 use hyperdrive_math::State;
+use hyperdrive_wrappers::wrappers::ihyperdrive::PoolInfo;
 
-#[pyclass(module = "hyperdrivepy", name = "HyperdriveState")]
+// The state is immutable once built, so instances can be shared across threads.
+#[pyclass(module = "hyperdrivepy", name = "HyperdriveState", frozen)]
 pub struct HyperdriveState {
     pub state: State,
+    // If true, results are returned as python ints instead of decimal strings.
+    pub native_ints: bool,
 }
 
 impl HyperdriveState {
     pub(crate) fn new(state: State) -> Self {
-        HyperdriveState { state }
+        HyperdriveState {
+            state,
+            native_ints: false,
+        }
+    }
+
+    pub(crate) fn to_py_output(&self, py: Python<'_>, value: U256) -> PyResult<PyObject> {
+        if self.native_ints {
+            u256_to_py_int(py, value)
+        } else {
+            Ok(value.to_string().into_py(py))
+        }
+    }
+
+    pub(crate) fn to_py_output_tuple(
+        &self,
+        py: Python<'_>,
+        values: Vec<U256>,
+    ) -> PyResult<PyObject> {
+        let items = values
+            .into_iter()
+            .map(|value| self.to_py_output(py, value))
+            .collect::<PyResult<Vec<PyObject>>>()?;
+        Ok(PyTuple::new(py, items).into_py(py))
+    }
+
+    pub(crate) fn to_py_output_list(
+        &self,
+        py: Python<'_>,
+        values: Vec<U256>,
+    ) -> PyResult<PyObject> {
+        let items = values
+            .into_iter()
+            .map(|value| self.to_py_output(py, value))
+            .collect::<PyResult<Vec<PyObject>>>()?;
+        Ok(PyList::new(py, items).into_py(py))
+    }
+
+    // Batches that don't raise on failed elements are returned as (values,
+    // mask), where the mask is false for every failed element.
+    pub(crate) fn to_py_masked(
+        &self,
+        py: Python<'_>,
+        values: PyObject,
+        mask: Vec<bool>,
+    ) -> PyResult<PyObject> {
+        Ok(PyTuple::new(py, [values, PyList::new(py, mask).into_py(py)]).into_py(py))
+    }
+
+    // Batches are returned as a list, or with as_buffer as a single bytes
+    // object of 32-byte little-endian words.
+    pub(crate) fn to_py_batch(
+        &self,
+        py: Python<'_>,
+        values: Vec<U256>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        if as_buffer {
+            u256_buffer_to_py(py, &values)
+        } else {
+            self.to_py_output_list(py, values)
+        }
+    }
+
+    // With as_buffer, the mask of a masked batch is packed into an Arrow
+    // validity bitmap so that the failed elements can be read as nulls.
+    pub(crate) fn to_py_masked_batch(
+        &self,
+        py: Python<'_>,
+        values: Vec<U256>,
+        mask: Vec<bool>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        if as_buffer {
+            let buffer = u256_buffer_to_py(py, &values)?;
+            Ok(PyTuple::new(py, [buffer, validity_bitmap_to_py(py, &mask)]).into_py(py))
+        } else {
+            self.to_py_masked(py, self.to_py_output_list(py, values)?, mask)
+        }
+    }
+
+    // Batches of pairs are returned as a list of tuples, or with as_buffer as
+    // a tuple of two buffers that hold the first and the second elements.
+    pub(crate) fn to_py_pair_batch(
+        &self,
+        py: Python<'_>,
+        values: Vec<(U256, U256)>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        if as_buffer {
+            let (firsts, seconds): (Vec<U256>, Vec<U256>) = values.into_iter().unzip();
+            let buffers = [
+                u256_buffer_to_py(py, &firsts)?,
+                u256_buffer_to_py(py, &seconds)?,
+            ];
+            return Ok(PyTuple::new(py, buffers).into_py(py));
+        }
+        let items = values
+            .into_iter()
+            .map(|(first, second)| self.to_py_output_tuple(py, vec![first, second]))
+            .collect::<PyResult<Vec<PyObject>>>()?;
+        Ok(PyList::new(py, items).into_py(py))
+    }
+
+    pub(crate) fn to_py_masked_pair_batch(
+        &self,
+        py: Python<'_>,
+        values: Vec<(U256, U256)>,
+        mask: Vec<bool>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let values = self.to_py_pair_batch(py, values, as_buffer)?;
+        if as_buffer {
+            Ok(PyTuple::new(py, [values, validity_bitmap_to_py(py, &mask)]).into_py(py))
+        } else {
+            self.to_py_masked(py, values, mask)
+        }
+    }
+
+    // Diagnostics are returned as (value, iterations, hit_max_iterations,
+    // residual, trace, wall_time_ns).
+    pub(crate) fn to_py_diagnostics(
+        &self,
+        py: Python<'_>,
+        diagnostics: &SolverDiagnostics,
+    ) -> PyResult<PyObject> {
+        let trace = match diagnostics.trace_u256() {
+            Some(trace) => PyList::new(
+                py,
+                trace
+                    .into_iter()
+                    .map(|value| match value {
+                        Some(value) => self.to_py_output(py, value),
+                        None => Ok(py.None()),
+                    })
+                    .collect::<PyResult<Vec<PyObject>>>()?,
+            )
+            .into_py(py),
+            None => py.None(),
+        };
+        Ok(PyTuple::new(
+            py,
+            [
+                self.to_py_output(py, U256::from(diagnostics.value))?,
+                diagnostics.iterations.into_py(py),
+                diagnostics.hit_max_iterations.into_py(py),
+                self.to_py_output(py, U256::from(diagnostics.residual))?,
+                trace,
+                diagnostics.wall_time_ns.into_py(py),
+            ],
+        )
+        .into_py(py))
+    }
+
+    // Warm startable solves are returned as (value, solver state).
+    pub(crate) fn to_py_solution(
+        &self,
+        py: Python<'_>,
+        side: TradeSide,
+        solution: MaxTradeSolution,
+    ) -> PyResult<PyObject> {
+        let solver_state = SolverState {
+            side,
+            solution: solution.amount,
+            iterations: solution.iterations,
+            converged: solution.converged,
+        };
+        Ok(PyTuple::new(
+            py,
+            [
+                self.to_py_output(py, U256::from(solution.amount))?,
+                Py::new(py, solver_state)?.into_py(py),
+            ],
+        )
+        .into_py(py))
+    }
+
+    // Build a new state that shares this state's config but uses a different pool info.
+    pub(crate) fn with_pool_info(&self, pool_info: PoolInfo) -> Self {
+        HyperdriveState {
+            state: State::new(self.state.config.clone(), pool_info),
+            native_ints: self.native_ints,
+        }
     }
 
     pub(crate) fn new_from_pool(pool_config: &PyAny, pool_info: &PyAny) -> Self {
@@ -1,9 +1,41 @@
+use std::collections::BTreeMap;
+
 use ethers::core::types::{I256, U256};
 use fixed_point::FixedPoint;
 
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict, PyList, PyTuple};
 
+use crate::diagnostics::diagnose;
+use crate::errors::{catch_math_panic, hyperdrive_error, split_mask};
+use crate::fees::{
+    calculate_fees_close_long, calculate_fees_close_short, calculate_fees_open_long,
+    calculate_fees_open_short,
+};
+use crate::lp::{
+    add_liquidity_limits_from_py, estimate_redeem_withdrawal_shares, estimate_remove_liquidity,
+    other_withdrawal_shares_from_py,
+};
+use crate::price_impact::{calculate_price_impact_curve, TradeSide};
+use crate::quote::{quote_close_long, quote_close_short, quote_open_long, quote_open_short};
+use crate::screening::{
+    i256_to_f64, screen_close_long, screen_close_short, screen_max_long, screen_max_short,
+    screen_open_long, screen_open_short, screen_spot_after_long, u256_to_f64, ScreeningState,
+};
+use crate::serialization::{decode_state, encode_state};
+use crate::solver::{
+    max_long_residual, max_short_residual, solve_max_long, solve_max_short, SolveLimits,
+    DEFAULT_MAX_ITERATIONS,
+};
+use crate::solver_cache::{
+    cached_max_long, cached_max_short, cached_solve, i256_key, optional_key, SolverKind,
+};
+use crate::solver_state::{anytime_limits, warm_start_from_py};
+use crate::trade_simulator::{
+    apply_add_liquidity, apply_close_long, apply_close_short, apply_open_long, apply_open_short,
+};
+use crate::update_pool_info_field;
 pub use crate::utils::*;
 use crate::HyperdriveState;
 pub use crate::PyPoolConfig;
@@ -14,29 +46,173 @@ use hyperdrive_math::YieldSpace;
 #[pymethods]
 impl HyperdriveState {
     #[new]
-    pub fn __init__(pool_config: &PyAny, pool_info: &PyAny) -> PyResult<Self> {
+    #[pyo3(signature = (pool_config, pool_info, native_ints=false))]
+    pub fn __init__(pool_config: &PyAny, pool_info: &PyAny, native_ints: bool) -> PyResult<Self> {
         let rust_pool_config = PyPoolConfig::extract(pool_config)?.pool_config;
         let rust_pool_info = PyPoolInfo::extract(pool_info)?.pool_info;
         let state = State::new(rust_pool_config, rust_pool_info);
-        Ok(HyperdriveState::new(state))
+        Ok(HyperdriveState { state, native_ints })
+    }
+
+    pub fn to_bytes(&self, py: Python<'_>) -> PyObject {
+        PyBytes::new(py, &encode_state(&self.state)).into_py(py)
+    }
+
+    #[staticmethod]
+    #[pyo3(signature = (data, native_ints=false))]
+    pub fn from_bytes(data: &[u8], native_ints: bool) -> PyResult<Self> {
+        let state = decode_state(data)?;
+        Ok(HyperdriveState { state, native_ints })
+    }
+
+    // States are pickled through their binary encoding.
+    pub fn __reduce__(&self, py: Python<'_>) -> PyResult<PyObject> {
+        let from_bytes = py.get_type::<HyperdriveState>().getattr("from_bytes")?;
+        Ok((from_bytes, (self.to_bytes(py), self.native_ints)).into_py(py))
+    }
+
+    #[pyo3(signature = (**fields))]
+    pub fn with_info(&self, fields: Option<&PyDict>) -> PyResult<Self> {
+        let mut pool_info = self.state.info.clone();
+        if let Some(fields) = fields {
+            for (name, value) in fields.iter() {
+                update_pool_info_field(&mut pool_info, name.extract()?, value)?;
+            }
+        }
+        Ok(self.with_pool_info(pool_info))
+    }
+
+    pub fn apply_open_long(&self, base_amount: &PyAny, current_time: &PyAny) -> PyResult<Self> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
+        })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let pool_info =
+            apply_open_long(&self.state, base_amount_fp, current_time_int).map_err(|err| {
+                hyperdrive_error(format!("apply_open_long returned the error: {:?}", err))
+            })?;
+        Ok(self.with_pool_info(pool_info))
+    }
+
+    pub fn apply_close_long(
+        &self,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<Self> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let pool_info = apply_close_long(
+            &self.state,
+            bond_amount_fp,
+            maturity_time_int,
+            current_time_int,
+        )
+        .map_err(|err| {
+            hyperdrive_error(format!("apply_close_long returned the error: {:?}", err))
+        })?;
+        Ok(self.with_pool_info(pool_info))
+    }
+
+    pub fn apply_open_short(&self, bond_amount: &PyAny, current_time: &PyAny) -> PyResult<Self> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let pool_info =
+            apply_open_short(&self.state, bond_amount_fp, current_time_int).map_err(|err| {
+                hyperdrive_error(format!("apply_open_short returned the error: {:?}", err))
+            })?;
+        Ok(self.with_pool_info(pool_info))
+    }
+
+    pub fn apply_close_short(
+        &self,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<Self> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let pool_info = apply_close_short(
+            &self.state,
+            bond_amount_fp,
+            maturity_time_int,
+            current_time_int,
+        )
+        .map_err(|err| {
+            hyperdrive_error(format!("apply_close_short returned the error: {:?}", err))
+        })?;
+        Ok(self.with_pool_info(pool_info))
     }
 
-    pub fn calculate_solvency(&self) -> PyResult<String> {
+    #[pyo3(signature = (contribution, current_time, min_lp_share_price=None, min_apr=None, max_apr=None, as_base=true))]
+    pub fn apply_add_liquidity(
+        &self,
+        contribution: &PyAny,
+        current_time: &PyAny,
+        min_lp_share_price: Option<&PyAny>,
+        min_apr: Option<&PyAny>,
+        max_apr: Option<&PyAny>,
+        as_base: bool,
+    ) -> PyResult<Self> {
+        let contribution_fp = FixedPoint::from(u256_from_py(contribution).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert contribution string to U256")
+        })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let (min_lp_share_price_fp, min_apr_fp, max_apr_fp) =
+            add_liquidity_limits_from_py(min_lp_share_price, min_apr, max_apr)?;
+        let pool_info = apply_add_liquidity(
+            &self.state,
+            contribution_fp,
+            current_time_int,
+            min_lp_share_price_fp,
+            min_apr_fp,
+            max_apr_fp,
+            as_base,
+        )
+        .map_err(|err| {
+            hyperdrive_error(format!("apply_add_liquidity returned the error: {:?}", err))
+        })?;
+        Ok(self.with_pool_info(pool_info))
+    }
+
+    pub fn calculate_solvency(&self, py: Python<'_>) -> PyResult<PyObject> {
         let result_fp = self.state.calculate_solvency();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_spot_price_after_long(
         &self,
-        base_amount: &str,
-        maybe_bond_amount: Option<&str>,
-    ) -> PyResult<String> {
-        let base_amount_fp = FixedPoint::from(U256::from_dec_str(base_amount).map_err(|_| {
+        py: Python<'_>,
+        base_amount: &PyAny,
+        maybe_bond_amount: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
         })?);
         let maybe_bond_amount_fp = if let Some(bond_amount) = maybe_bond_amount {
-            Some(FixedPoint::from(U256::from_dec_str(bond_amount).map_err(
+            Some(FixedPoint::from(u256_from_py(bond_amount).map_err(
                 |_| {
                     PyErr::new::<PyValueError, _>(
                         "Failed to convert maybe_bond_amount string to U256",
@@ -49,21 +225,26 @@ impl HyperdriveState {
         let result_fp = self
             .state
             .calculate_spot_price_after_long(base_amount_fp, maybe_bond_amount_fp)
-            .unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_spot_price_after_long returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_spot_price_after_short(
         &self,
-        bond_amount: &str,
-        maybe_base_amount: Option<&str>,
-    ) -> PyResult<String> {
-        let bond_amount_fp = FixedPoint::from(U256::from_dec_str(bond_amount).map_err(|_| {
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maybe_base_amount: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
         })?);
         let maybe_base_amount_fp = if let Some(base_amount) = maybe_base_amount {
-            Some(FixedPoint::from(U256::from_dec_str(base_amount).map_err(
+            Some(FixedPoint::from(u256_from_py(base_amount).map_err(
                 |_| {
                     PyErr::new::<PyValueError, _>(
                         "Failed to convert maybe_base_amount string to U256",
@@ -76,27 +257,31 @@ impl HyperdriveState {
         let result_fp = self
             .state
             .calculate_spot_price_after_short(bond_amount_fp, maybe_base_amount_fp)
-            .unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_spot_price_after_short returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_spot_price(&self) -> PyResult<String> {
+    pub fn calculate_spot_price(&self, py: Python<'_>) -> PyResult<PyObject> {
         let result_fp = self.state.calculate_spot_price();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_spot_rate_after_long(
         &self,
-        base_amount: &str,
-        maybe_bond_amount: Option<&str>,
-    ) -> PyResult<String> {
-        let base_amount_fp = FixedPoint::from(U256::from_dec_str(base_amount).map_err(|_| {
+        py: Python<'_>,
+        base_amount: &PyAny,
+        maybe_bond_amount: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
         })?);
         let maybe_bond_amount_fp = if let Some(bond_amount) = maybe_bond_amount {
-            Some(FixedPoint::from(U256::from_dec_str(bond_amount).map_err(
+            Some(FixedPoint::from(u256_from_py(bond_amount).map_err(
                 |_| {
                     PyErr::new::<PyValueError, _>(
                         "Failed to convert maybe_bond_amount string to U256",
@@ -109,59 +294,67 @@ impl HyperdriveState {
         let result_fp = self
             .state
             .calculate_spot_rate_after_long(base_amount_fp, maybe_bond_amount_fp)
-            .unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_spot_rate_after_long returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_spot_rate(&self) -> PyResult<String> {
+    pub fn calculate_spot_rate(&self, py: Python<'_>) -> PyResult<PyObject> {
         let result_fp = self.state.calculate_spot_rate();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_open_long(&self, base_amount: &str) -> PyResult<String> {
-        let base_amount_fp = FixedPoint::from(U256::from_dec_str(base_amount).map_err(|_| {
+    pub fn calculate_open_long(&self, py: Python<'_>, base_amount: &PyAny) -> PyResult<PyObject> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
         })?);
-        let result_fp = self.state.calculate_open_long(base_amount_fp).unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        let result_fp = self
+            .state
+            .calculate_open_long(base_amount_fp)
+            .map_err(|err| {
+                hyperdrive_error(format!("calculate_open_long returned the error: {:?}", err))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_close_long(
         &self,
-        bond_amount: &str,
-        maturity_time: &str,
-        current_time: &str,
-    ) -> PyResult<String> {
-        let bond_amount_fp = FixedPoint::from(U256::from_dec_str(bond_amount).map_err(|_| {
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
         })?);
-        let maturity_time = U256::from_dec_str(maturity_time).map_err(|_| {
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
         })?;
-        let current_time = U256::from_dec_str(current_time).map_err(|_| {
+        let current_time = u256_from_py(current_time).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
         })?;
 
         let result_fp =
             self.state
                 .calculate_close_long(bond_amount_fp, maturity_time, current_time);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_open_short(
         &self,
-        short_amount: &str,
-        open_vault_share_price: &str,
-    ) -> PyResult<String> {
-        let short_amount_fp = FixedPoint::from(U256::from_dec_str(short_amount).map_err(|_| {
+        py: Python<'_>,
+        short_amount: &PyAny,
+        open_vault_share_price: &PyAny,
+    ) -> PyResult<PyObject> {
+        let short_amount_fp = FixedPoint::from(u256_from_py(short_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert short_amount string to U256")
         })?);
         let open_vault_share_price_fp =
-            FixedPoint::from(U256::from_dec_str(open_vault_share_price).map_err(|_| {
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
                 PyErr::new::<PyValueError, _>(
                     "Failed to convert open_vault_share_price string to U256",
                 )
@@ -169,38 +362,43 @@ impl HyperdriveState {
         let result_fp = self
             .state
             .calculate_open_short(short_amount_fp, open_vault_share_price_fp)
-            .unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_open_short returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_close_short(
         &self,
-        bond_amount: &str,
-        open_vault_share_price: &str,
-        close_vault_share_price: &str,
-        maturity_time: &str,
-        current_time: &str,
-    ) -> PyResult<String> {
-        let bond_amount_fp = FixedPoint::from(U256::from_dec_str(bond_amount).map_err(|_| {
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        open_vault_share_price: &PyAny,
+        close_vault_share_price: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
         })?);
         let open_vault_share_price_fp =
-            FixedPoint::from(U256::from_dec_str(open_vault_share_price).map_err(|_| {
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
                 PyErr::new::<PyValueError, _>(
                     "Failed to convert open_vault_share_price string to U256",
                 )
             })?);
         let close_vault_share_price_fp =
-            FixedPoint::from(U256::from_dec_str(close_vault_share_price).map_err(|_| {
+            FixedPoint::from(u256_from_py(close_vault_share_price).map_err(|_| {
                 PyErr::new::<PyValueError, _>(
                     "Failed to convert close_vault_share_price string to U256",
                 )
             })?);
-        let maturity_time = U256::from_dec_str(maturity_time).map_err(|_| {
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
         })?;
-        let current_time = U256::from_dec_str(current_time).map_err(|_| {
+        let current_time = u256_from_py(current_time).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
         })?;
         let result_fp = self.state.calculate_close_short(
@@ -210,196 +408,1557 @@ impl HyperdriveState {
             maturity_time,
             current_time,
         );
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
+    }
+
+    #[pyo3(signature = (base_amounts, with_mask=false, as_buffer=false))]
+    pub fn calculate_open_long_batch(
+        &self,
+        py: Python<'_>,
+        base_amounts: &PyAny,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let base_amounts_fp = fixed_point_vec_from_py(base_amounts, "base_amounts")?;
+        let results_fp = py.allow_threads(|| {
+            base_amounts_fp
+                .into_iter()
+                .map(|base_amount_fp| self.state.calculate_open_long(base_amount_fp))
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(results_fp, FixedPoint::from(U256::zero()));
+            let results = results_fp.into_iter().map(U256::from).collect();
+            return self.to_py_masked_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let result_fp = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "calculate_open_long failed for base_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok(U256::from(result_fp))
+            })
+            .collect::<PyResult<Vec<U256>>>()?;
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (short_amounts, open_vault_share_price, with_mask=false, as_buffer=false))]
+    pub fn calculate_open_short_batch(
+        &self,
+        py: Python<'_>,
+        short_amounts: &PyAny,
+        open_vault_share_price: &PyAny,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let short_amounts_fp = fixed_point_vec_from_py(short_amounts, "short_amounts")?;
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let results_fp = py.allow_threads(|| {
+            short_amounts_fp
+                .into_iter()
+                .map(|short_amount_fp| {
+                    self.state
+                        .calculate_open_short(short_amount_fp, open_vault_share_price_fp)
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(results_fp, FixedPoint::from(U256::zero()));
+            let results = results_fp.into_iter().map(U256::from).collect();
+            return self.to_py_masked_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let result_fp = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "calculate_open_short failed for short_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok(U256::from(result_fp))
+            })
+            .collect::<PyResult<Vec<U256>>>()?;
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (bond_amounts, maturity_time, current_time, with_mask=false, as_buffer=false))]
+    pub fn calculate_close_long_batch(
+        &self,
+        py: Python<'_>,
+        bond_amounts: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let bond_amounts_fp = fixed_point_vec_from_py(bond_amounts, "bond_amounts")?;
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        // The close math panics on infeasible trades instead of returning an
+        // error, so each element is run with the panic caught.
+        let results_fp = py.allow_threads(|| {
+            bond_amounts_fp
+                .into_iter()
+                .map(|bond_amount_fp| {
+                    catch_math_panic(|| {
+                        self.state
+                            .calculate_close_long(bond_amount_fp, maturity_time, current_time)
+                    })
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(results_fp, FixedPoint::from(U256::zero()));
+            let results = results_fp.into_iter().map(U256::from).collect();
+            return self.to_py_masked_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let result_fp = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "calculate_close_long failed for bond_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok(U256::from(result_fp))
+            })
+            .collect::<PyResult<Vec<U256>>>()?;
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (bond_amounts, open_vault_share_price, close_vault_share_price, maturity_time, current_time, with_mask=false, as_buffer=false))]
+    pub fn calculate_close_short_batch(
+        &self,
+        py: Python<'_>,
+        bond_amounts: &PyAny,
+        open_vault_share_price: &PyAny,
+        close_vault_share_price: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let bond_amounts_fp = fixed_point_vec_from_py(bond_amounts, "bond_amounts")?;
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let close_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(close_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert close_vault_share_price string to U256",
+                )
+            })?);
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let results_fp = py.allow_threads(|| {
+            bond_amounts_fp
+                .into_iter()
+                .map(|bond_amount_fp| {
+                    catch_math_panic(|| {
+                        self.state.calculate_close_short(
+                            bond_amount_fp,
+                            open_vault_share_price_fp,
+                            close_vault_share_price_fp,
+                            maturity_time,
+                            current_time,
+                        )
+                    })
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(results_fp, FixedPoint::from(U256::zero()));
+            let results = results_fp.into_iter().map(U256::from).collect();
+            return self.to_py_masked_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let result_fp = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "calculate_close_short failed for bond_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok(U256::from(result_fp))
+            })
+            .collect::<PyResult<Vec<U256>>>()?;
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (contribution, current_time, min_lp_share_price=None, min_apr=None, max_apr=None, as_base=true))]
+    pub fn calculate_add_liquidity(
+        &self,
+        py: Python<'_>,
+        contribution: &PyAny,
+        current_time: &PyAny,
+        min_lp_share_price: Option<&PyAny>,
+        min_apr: Option<&PyAny>,
+        max_apr: Option<&PyAny>,
+        as_base: bool,
+    ) -> PyResult<PyObject> {
+        let contribution_fp = FixedPoint::from(u256_from_py(contribution).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert contribution string to U256")
+        })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let (min_lp_share_price_fp, min_apr_fp, max_apr_fp) =
+            add_liquidity_limits_from_py(min_lp_share_price, min_apr, max_apr)?;
+        let result_fp = self
+            .state
+            .calculate_add_liquidity(
+                current_time_int,
+                contribution_fp,
+                min_lp_share_price_fp,
+                min_apr_fp,
+                max_apr_fp,
+                as_base,
+            )
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_add_liquidity returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
+    }
+
+    #[pyo3(signature = (contributions, current_time, min_lp_share_price=None, min_apr=None, max_apr=None, as_base=true, with_mask=false, as_buffer=false))]
+    pub fn calculate_add_liquidity_batch(
+        &self,
+        py: Python<'_>,
+        contributions: &PyAny,
+        current_time: &PyAny,
+        min_lp_share_price: Option<&PyAny>,
+        min_apr: Option<&PyAny>,
+        max_apr: Option<&PyAny>,
+        as_base: bool,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let contributions_fp = fixed_point_vec_from_py(contributions, "contributions")?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let (min_lp_share_price_fp, min_apr_fp, max_apr_fp) =
+            add_liquidity_limits_from_py(min_lp_share_price, min_apr, max_apr)?;
+        let results_fp = py.allow_threads(|| {
+            contributions_fp
+                .into_iter()
+                .map(|contribution_fp| {
+                    self.state.calculate_add_liquidity(
+                        current_time_int,
+                        contribution_fp,
+                        min_lp_share_price_fp,
+                        min_apr_fp,
+                        max_apr_fp,
+                        as_base,
+                    )
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(results_fp, FixedPoint::from(U256::zero()));
+            let results = results_fp.into_iter().map(U256::from).collect();
+            return self.to_py_masked_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let result_fp = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "calculate_add_liquidity failed for contributions[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok(U256::from(result_fp))
+            })
+            .collect::<PyResult<Vec<U256>>>()?;
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (lp_shares, current_time, maybe_other_withdrawal_shares=None))]
+    pub fn estimate_remove_liquidity(
+        &self,
+        py: Python<'_>,
+        lp_shares: &PyAny,
+        current_time: &PyAny,
+        maybe_other_withdrawal_shares: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let lp_shares_fp = FixedPoint::from(u256_from_py(lp_shares).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert lp_shares string to U256")
+        })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let other_withdrawal_shares_fp =
+            other_withdrawal_shares_from_py(maybe_other_withdrawal_shares)?;
+        let (base_proceeds_fp, withdrawal_shares_fp) = estimate_remove_liquidity(
+            &self.state,
+            lp_shares_fp,
+            other_withdrawal_shares_fp,
+            current_time_int,
+        )
+        .map_err(|err| {
+            hyperdrive_error(format!(
+                "estimate_remove_liquidity returned the error: {:?}",
+                err
+            ))
+        })?;
+        return self.to_py_output_tuple(
+            py,
+            vec![
+                U256::from(base_proceeds_fp),
+                U256::from(withdrawal_shares_fp),
+            ],
+        );
+    }
+
+    #[pyo3(signature = (lp_share_amounts, current_time, maybe_other_withdrawal_shares=None, with_mask=false, as_buffer=false))]
+    pub fn estimate_remove_liquidity_batch(
+        &self,
+        py: Python<'_>,
+        lp_share_amounts: &PyAny,
+        current_time: &PyAny,
+        maybe_other_withdrawal_shares: Option<&PyAny>,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let lp_share_amounts_fp = fixed_point_vec_from_py(lp_share_amounts, "lp_share_amounts")?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let other_withdrawal_shares_fp =
+            other_withdrawal_shares_from_py(maybe_other_withdrawal_shares)?;
+        let results_fp = py.allow_threads(|| {
+            lp_share_amounts_fp
+                .into_iter()
+                .map(|lp_shares_fp| {
+                    estimate_remove_liquidity(
+                        &self.state,
+                        lp_shares_fp,
+                        other_withdrawal_shares_fp,
+                        current_time_int,
+                    )
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(
+                results_fp,
+                (
+                    FixedPoint::from(U256::zero()),
+                    FixedPoint::from(U256::zero()),
+                ),
+            );
+            let results = results_fp
+                .into_iter()
+                .map(|(base_proceeds_fp, withdrawal_shares_fp)| {
+                    (
+                        U256::from(base_proceeds_fp),
+                        U256::from(withdrawal_shares_fp),
+                    )
+                })
+                .collect();
+            return self.to_py_masked_pair_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let (base_proceeds_fp, withdrawal_shares_fp) = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "estimate_remove_liquidity failed for lp_share_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok((
+                    U256::from(base_proceeds_fp),
+                    U256::from(withdrawal_shares_fp),
+                ))
+            })
+            .collect::<PyResult<Vec<(U256, U256)>>>()?;
+        self.to_py_pair_batch(py, results, as_buffer)
+    }
+
+    #[pyo3(signature = (withdrawal_shares, current_time, maybe_other_withdrawal_shares=None))]
+    pub fn estimate_redeem_withdrawal_shares(
+        &self,
+        py: Python<'_>,
+        withdrawal_shares: &PyAny,
+        current_time: &PyAny,
+        maybe_other_withdrawal_shares: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let withdrawal_shares_fp =
+            FixedPoint::from(u256_from_py(withdrawal_shares).map_err(|_| {
+                PyErr::new::<PyValueError, _>("Failed to convert withdrawal_shares string to U256")
+            })?);
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let other_withdrawal_shares_fp =
+            other_withdrawal_shares_from_py(maybe_other_withdrawal_shares)?;
+        let (base_proceeds_fp, shares_redeemed_fp) = estimate_redeem_withdrawal_shares(
+            &self.state,
+            withdrawal_shares_fp,
+            other_withdrawal_shares_fp,
+            current_time_int,
+        )
+        .map_err(|err| {
+            hyperdrive_error(format!(
+                "estimate_redeem_withdrawal_shares returned the error: {:?}",
+                err
+            ))
+        })?;
+        return self.to_py_output_tuple(
+            py,
+            vec![U256::from(base_proceeds_fp), U256::from(shares_redeemed_fp)],
+        );
+    }
+
+    #[pyo3(signature = (withdrawal_share_amounts, current_time, maybe_other_withdrawal_shares=None, with_mask=false, as_buffer=false))]
+    pub fn estimate_redeem_withdrawal_shares_batch(
+        &self,
+        py: Python<'_>,
+        withdrawal_share_amounts: &PyAny,
+        current_time: &PyAny,
+        maybe_other_withdrawal_shares: Option<&PyAny>,
+        with_mask: bool,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let withdrawal_share_amounts_fp =
+            fixed_point_vec_from_py(withdrawal_share_amounts, "withdrawal_share_amounts")?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let other_withdrawal_shares_fp =
+            other_withdrawal_shares_from_py(maybe_other_withdrawal_shares)?;
+        let results_fp = py.allow_threads(|| {
+            withdrawal_share_amounts_fp
+                .into_iter()
+                .map(|withdrawal_shares_fp| {
+                    estimate_redeem_withdrawal_shares(
+                        &self.state,
+                        withdrawal_shares_fp,
+                        other_withdrawal_shares_fp,
+                        current_time_int,
+                    )
+                })
+                .collect::<Vec<_>>()
+        });
+        if with_mask {
+            let (results_fp, mask) = split_mask(
+                results_fp,
+                (
+                    FixedPoint::from(U256::zero()),
+                    FixedPoint::from(U256::zero()),
+                ),
+            );
+            let results = results_fp
+                .into_iter()
+                .map(|(base_proceeds_fp, shares_redeemed_fp)| {
+                    (U256::from(base_proceeds_fp), U256::from(shares_redeemed_fp))
+                })
+                .collect();
+            return self.to_py_masked_pair_batch(py, results, mask, as_buffer);
+        }
+        let results = results_fp
+            .into_iter()
+            .enumerate()
+            .map(|(index, result_fp)| {
+                let (base_proceeds_fp, shares_redeemed_fp) = result_fp.map_err(|err| {
+                    hyperdrive_error(format!(
+                        "estimate_redeem_withdrawal_shares failed for withdrawal_share_amounts[{}]: {:?}",
+                        index, err
+                    ))
+                })?;
+                Ok((U256::from(base_proceeds_fp), U256::from(shares_redeemed_fp)))
+            })
+            .collect::<PyResult<Vec<(U256, U256)>>>()?;
+        self.to_py_pair_batch(py, results, as_buffer)
+    }
+
+    pub fn calculate_fees_open_long(
+        &self,
+        py: Python<'_>,
+        base_amount: &PyAny,
+    ) -> PyResult<PyObject> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
+        })?);
+        let (curve_fee, flat_fee, governance_fee) =
+            calculate_fees_open_long(&self.state, base_amount_fp);
+        return self.to_py_output_tuple(
+            py,
+            vec![
+                U256::from(curve_fee),
+                U256::from(flat_fee),
+                U256::from(governance_fee),
+            ],
+        );
+    }
+
+    pub fn calculate_fees_close_long(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let (curve_fee, flat_fee, governance_fee) = calculate_fees_close_long(
+            &self.state,
+            bond_amount_fp,
+            maturity_time_int,
+            current_time_int,
+        );
+        return self.to_py_output_tuple(
+            py,
+            vec![
+                U256::from(curve_fee),
+                U256::from(flat_fee),
+                U256::from(governance_fee),
+            ],
+        );
+    }
+
+    pub fn calculate_fees_open_short(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maybe_spot_price: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let spot_price_fp = if let Some(spot_price) = maybe_spot_price {
+            FixedPoint::from(u256_from_py(spot_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>("Failed to convert maybe_spot_price string to U256")
+            })?)
+        } else {
+            self.state.calculate_spot_price()
+        };
+        let (curve_fee, flat_fee, governance_fee) =
+            calculate_fees_open_short(&self.state, bond_amount_fp, spot_price_fp);
+        return self.to_py_output_tuple(
+            py,
+            vec![
+                U256::from(curve_fee),
+                U256::from(flat_fee),
+                U256::from(governance_fee),
+            ],
+        );
+    }
+
+    pub fn calculate_fees_close_short(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let (curve_fee, flat_fee, governance_fee) = calculate_fees_close_short(
+            &self.state,
+            bond_amount_fp,
+            maturity_time_int,
+            current_time_int,
+        );
+        return self.to_py_output_tuple(
+            py,
+            vec![
+                U256::from(curve_fee),
+                U256::from(flat_fee),
+                U256::from(governance_fee),
+            ],
+        );
+    }
+
+    pub fn quote_open_long(&self, py: Python<'_>, base_amount: &PyAny) -> PyResult<PyObject> {
+        let base_amount_fp = FixedPoint::from(u256_from_py(base_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert base_amount string to U256")
+        })?);
+        let quote = py
+            .allow_threads(|| quote_open_long(&self.state, base_amount_fp))
+            .map_err(|err| {
+                hyperdrive_error(format!("quote_open_long returned the error: {:?}", err))
+            })?;
+        self.to_py_output_tuple(py, quote.to_u256_vec())
+    }
+
+    pub fn quote_open_short(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maybe_open_vault_share_price: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let open_vault_share_price_fp =
+            if let Some(open_vault_share_price) = maybe_open_vault_share_price {
+                FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_open_vault_share_price string to U256",
+                    )
+                })?)
+            } else {
+                FixedPoint::from(self.state.info.vault_share_price)
+            };
+        let quote = py
+            .allow_threads(|| {
+                quote_open_short(&self.state, bond_amount_fp, open_vault_share_price_fp)
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("quote_open_short returned the error: {:?}", err))
+            })?;
+        self.to_py_output_tuple(py, quote.to_u256_vec())
+    }
+
+    pub fn quote_close_long(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let quote = py
+            .allow_threads(|| {
+                quote_close_long(
+                    &self.state,
+                    bond_amount_fp,
+                    maturity_time_int,
+                    current_time_int,
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("quote_close_long returned the error: {:?}", err))
+            })?;
+        self.to_py_output_tuple(py, quote.to_u256_vec())
     }
 
-    pub fn calculate_max_spot_price(&self) -> PyResult<String> {
+    pub fn quote_close_short(
+        &self,
+        py: Python<'_>,
+        bond_amount: &PyAny,
+        open_vault_share_price: &PyAny,
+        close_vault_share_price: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<PyObject> {
+        let bond_amount_fp = FixedPoint::from(u256_from_py(bond_amount).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert bond_amount string to U256")
+        })?);
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let close_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(close_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert close_vault_share_price string to U256",
+                )
+            })?);
+        let maturity_time_int = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let quote = py
+            .allow_threads(|| {
+                quote_close_short(
+                    &self.state,
+                    bond_amount_fp,
+                    open_vault_share_price_fp,
+                    close_vault_share_price_fp,
+                    maturity_time_int,
+                    current_time_int,
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("quote_close_short returned the error: {:?}", err))
+            })?;
+        self.to_py_output_tuple(py, quote.to_u256_vec())
+    }
+
+    pub fn price_impact_curve(
+        &self,
+        py: Python<'_>,
+        side: &str,
+        min_size: &PyAny,
+        max_size: &PyAny,
+        max_points: usize,
+        tolerance: &PyAny,
+    ) -> PyResult<PyObject> {
+        let trade_side = TradeSide::from_name(side)
+            .map_err(|err| PyErr::new::<PyValueError, _>(err.to_string()))?;
+        let min_size_fp = FixedPoint::from(u256_from_py(min_size).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert min_size string to U256")
+        })?);
+        let max_size_fp = FixedPoint::from(u256_from_py(max_size).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert max_size string to U256")
+        })?);
+        let tolerance_fp = FixedPoint::from(u256_from_py(tolerance).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert tolerance string to U256")
+        })?);
+        let (sizes, outputs, spot_rates) = py
+            .allow_threads(|| {
+                calculate_price_impact_curve(
+                    &self.state,
+                    trade_side,
+                    min_size_fp,
+                    max_size_fp,
+                    max_points,
+                    tolerance_fp,
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("price_impact_curve returned the error: {:?}", err))
+            })?;
+        let to_u256 = |values: Vec<FixedPoint>| values.into_iter().map(U256::from).collect();
+        Ok(PyTuple::new(
+            py,
+            [
+                self.to_py_output_list(py, to_u256(sizes))?,
+                self.to_py_output_list(py, to_u256(outputs))?,
+                self.to_py_output_list(py, to_u256(spot_rates))?,
+            ],
+        )
+        .into_py(py))
+    }
+
+    pub fn screen_open_long(&self, py: Python<'_>, base_amounts: Vec<f64>) -> Vec<f64> {
+        py.allow_threads(|| screen_open_long(&ScreeningState::new(&self.state), &base_amounts))
+    }
+
+    pub fn screen_open_short(
+        &self,
+        py: Python<'_>,
+        bond_amounts: Vec<f64>,
+        open_vault_share_price: &PyAny,
+    ) -> PyResult<Vec<f64>> {
+        let open_vault_share_price = u256_from_py(open_vault_share_price).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert open_vault_share_price string to U256")
+        })?;
+        Ok(py.allow_threads(|| {
+            screen_open_short(
+                &ScreeningState::new(&self.state),
+                &bond_amounts,
+                u256_to_f64(open_vault_share_price),
+            )
+        }))
+    }
+
+    pub fn screen_close_long(
+        &self,
+        py: Python<'_>,
+        bond_amounts: Vec<f64>,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<Vec<f64>> {
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        Ok(py.allow_threads(|| {
+            screen_close_long(
+                &ScreeningState::new(&self.state),
+                &bond_amounts,
+                u256_to_f64(maturity_time),
+                u256_to_f64(current_time),
+            )
+        }))
+    }
+
+    pub fn screen_close_short(
+        &self,
+        py: Python<'_>,
+        bond_amounts: Vec<f64>,
+        open_vault_share_price: &PyAny,
+        close_vault_share_price: &PyAny,
+        maturity_time: &PyAny,
+        current_time: &PyAny,
+    ) -> PyResult<Vec<f64>> {
+        let open_vault_share_price = u256_from_py(open_vault_share_price).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert open_vault_share_price string to U256")
+        })?;
+        let close_vault_share_price = u256_from_py(close_vault_share_price).map_err(|_| {
+            PyErr::new::<PyValueError, _>(
+                "Failed to convert close_vault_share_price string to U256",
+            )
+        })?;
+        let maturity_time = u256_from_py(maturity_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert maturity_time string to U256")
+        })?;
+        let current_time = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        Ok(py.allow_threads(|| {
+            screen_close_short(
+                &ScreeningState::new(&self.state),
+                &bond_amounts,
+                u256_to_f64(open_vault_share_price),
+                u256_to_f64(close_vault_share_price),
+                u256_to_f64(maturity_time),
+                u256_to_f64(current_time),
+            )
+        }))
+    }
+
+    pub fn screen_spot_after_long(
+        &self,
+        py: Python<'_>,
+        base_amounts: Vec<f64>,
+    ) -> (Vec<f64>, Vec<f64>) {
+        py.allow_threads(|| {
+            screen_spot_after_long(&ScreeningState::new(&self.state), &base_amounts)
+        })
+    }
+
+    pub fn screen_max_long(
+        &self,
+        py: Python<'_>,
+        budgets: Vec<f64>,
+        checkpoint_exposure: &PyAny,
+    ) -> PyResult<Vec<f64>> {
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        Ok(py.allow_threads(|| {
+            screen_max_long(
+                &ScreeningState::new(&self.state),
+                &budgets,
+                i256_to_f64(checkpoint_exposure_i),
+            )
+        }))
+    }
+
+    pub fn screen_max_short(
+        &self,
+        py: Python<'_>,
+        budgets: Vec<f64>,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+    ) -> PyResult<Vec<f64>> {
+        let open_vault_share_price = u256_from_py(open_vault_share_price).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert open_vault_share_price string to U256")
+        })?;
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        Ok(py.allow_threads(|| {
+            screen_max_short(
+                &ScreeningState::new(&self.state),
+                &budgets,
+                u256_to_f64(open_vault_share_price),
+                i256_to_f64(checkpoint_exposure_i),
+            )
+        }))
+    }
+
+    pub fn calculate_max_spot_price(&self, py: Python<'_>) -> PyResult<PyObject> {
         let result_fp = self.state.calculate_max_spot_price();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_targeted_long_with_budget(
         &self,
-        budget: &str,
-        target_rate: &str,
-        checkpoint_exposure: &str,
+        py: Python<'_>,
+        budget: &PyAny,
+        target_rate: &PyAny,
+        checkpoint_exposure: &PyAny,
         maybe_max_iterations: Option<usize>,
-        maybe_allowable_error: Option<&str>,
-    ) -> PyResult<String> {
-        let budget_fp = FixedPoint::from(U256::from_dec_str(budget).map_err(|_| {
+        maybe_allowable_error: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
         })?);
-        let target_rate_fp = FixedPoint::from(U256::from_dec_str(target_rate).map_err(|_| {
+        let target_rate_fp = FixedPoint::from(u256_from_py(target_rate).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert target_rate string to U256")
         })?);
-        let checkpoint_exposure_i = I256::from_dec_str(checkpoint_exposure).map_err(|_| {
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
         })?;
         let maybe_allowable_error_fp = if let Some(allowable_error) = maybe_allowable_error {
-            Some(FixedPoint::from(
-                U256::from_dec_str(allowable_error).map_err(|_| {
+            Some(FixedPoint::from(u256_from_py(allowable_error).map_err(
+                |_| {
                     PyErr::new::<PyValueError, _>(
                         "Failed to convert maybe_allowable_error string to U256",
                     )
-                })?,
-            ))
+                },
+            )?))
         } else {
             None
         };
-        let result_fp = self
-            .state
-            .calculate_targeted_long_with_budget(
-                budget_fp,
-                target_rate_fp,
-                checkpoint_exposure_i,
-                maybe_max_iterations,
-                maybe_allowable_error_fp,
-            )
+        let mut args = vec![
+            U256::from(budget_fp),
+            U256::from(target_rate_fp),
+            i256_key(checkpoint_exposure_i),
+        ];
+        args.extend(optional_key(maybe_max_iterations));
+        args.extend(optional_key(maybe_allowable_error_fp));
+        let result_fp = py
+            .allow_threads(|| {
+                cached_solve(&self.state, SolverKind::TargetedLong, args, || {
+                    self.state.calculate_targeted_long_with_budget(
+                        budget_fp,
+                        target_rate_fp,
+                        checkpoint_exposure_i,
+                        maybe_max_iterations,
+                        maybe_allowable_error_fp,
+                    )
+                })
+            })
             .map_err(|err| {
-                PyErr::new::<PyValueError, _>(format!(
+                hyperdrive_error(format!(
                     "Calculate_targeted_long_with_budget returned the error: {:?}",
                     err
                 ))
             })?;
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_max_long(
         &self,
-        budget: &str,
-        checkpoint_exposure: &str,
+        py: Python<'_>,
+        budget: &PyAny,
+        checkpoint_exposure: &PyAny,
         maybe_max_iterations: Option<usize>,
-    ) -> PyResult<String> {
-        let budget_fp = FixedPoint::from(U256::from_dec_str(budget).map_err(|_| {
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
         })?);
-        let checkpoint_exposure_i = I256::from_dec_str(checkpoint_exposure).map_err(|_| {
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
         })?;
-        let result_fp =
-            self.state
-                .calculate_max_long(budget_fp, checkpoint_exposure_i, maybe_max_iterations);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        let result_fp = py.allow_threads(|| {
+            cached_max_long(
+                &self.state,
+                budget_fp,
+                checkpoint_exposure_i,
+                maybe_max_iterations,
+            )
+        });
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
     pub fn calculate_max_short(
         &self,
-        budget: &str,
-        open_vault_share_price: &str,
-        checkpoint_exposure: &str,
-        maybe_conservative_price: Option<&str>,
+        py: Python<'_>,
+        budget: &PyAny,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_conservative_price: Option<&PyAny>,
         maybe_max_iterations: Option<usize>,
-    ) -> PyResult<String> {
-        let budget_fp = FixedPoint::from(U256::from_dec_str(budget).map_err(|_| {
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
         })?);
         let open_vault_share_price_fp =
-            FixedPoint::from(U256::from_dec_str(open_vault_share_price).map_err(|_| {
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
                 PyErr::new::<PyValueError, _>(
                     "Failed to convert open_vault_share_price string to U256",
                 )
             })?);
-        let checkpoint_exposure_i = I256::from_dec_str(checkpoint_exposure).map_err(|_| {
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
         })?;
         let maybe_conservative_price_fp = if let Some(conservative_price) = maybe_conservative_price
         {
-            Some(FixedPoint::from(
-                U256::from_dec_str(conservative_price).map_err(|_| {
+            Some(FixedPoint::from(u256_from_py(conservative_price).map_err(
+                |_| {
                     PyErr::new::<PyValueError, _>(
                         "Failed to convert maybe_conservative_price string to U256",
                     )
-                })?,
-            ))
+                },
+            )?))
         } else {
             None
         };
-        let result_fp = self.state.calculate_max_short(
-            budget_fp,
-            open_vault_share_price_fp,
-            checkpoint_exposure_i,
-            maybe_conservative_price_fp,
-            maybe_max_iterations,
-        );
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        let result_fp = py.allow_threads(|| {
+            cached_max_short(
+                &self.state,
+                budget_fp,
+                open_vault_share_price_fp,
+                checkpoint_exposure_i,
+                maybe_conservative_price_fp,
+                maybe_max_iterations,
+            )
+        });
+        return self.to_py_output(py, U256::from(result_fp));
+    }
+
+    #[pyo3(signature = (budgets, checkpoint_exposure, maybe_max_iterations=None, as_buffer=false))]
+    pub fn calculate_max_long_many(
+        &self,
+        py: Python<'_>,
+        budgets: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_max_iterations: Option<usize>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let budgets_fp = fixed_point_vec_from_py(budgets, "budgets")?;
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        // The max long is the smaller of the budget and the pool limited max
+        // long, so the pool limited max long only needs to be solved once.
+        // Longs buy bonds below face value, so a long can never spend more base
+        // than the pool's bond reserves. The reserves are used as the budget of
+        // the pool limited solve, which keeps the solver's budget arithmetic
+        // far from overflowing.
+        let pool_max_long_fp = py.allow_threads(|| {
+            cached_max_long(
+                &self.state,
+                FixedPoint::from(self.state.info.bond_reserves),
+                checkpoint_exposure_i,
+                maybe_max_iterations,
+            )
+        });
+        let results = budgets_fp
+            .into_iter()
+            .map(|budget_fp| U256::from(budget_fp.min(pool_max_long_fp)))
+            .collect();
+        return self.to_py_batch(py, results, as_buffer);
+    }
+
+    #[pyo3(signature = (budgets, open_vault_share_price, checkpoint_exposure, maybe_conservative_price=None, maybe_max_iterations=None, as_buffer=false))]
+    pub fn calculate_max_short_many(
+        &self,
+        py: Python<'_>,
+        budgets: &PyAny,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_conservative_price: Option<&PyAny>,
+        maybe_max_iterations: Option<usize>,
+        as_buffer: bool,
+    ) -> PyResult<PyObject> {
+        let budgets_fp = fixed_point_vec_from_py(budgets, "budgets")?;
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let maybe_conservative_price_fp = match maybe_conservative_price {
+            Some(conservative_price) => Some(FixedPoint::from(
+                u256_from_py(conservative_price).map_err(|_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_conservative_price string to U256",
+                    )
+                })?,
+            )),
+            None => None,
+        };
+        // Seeding the solver would change its answer, so every distinct budget
+        // gets its own solve. Repeated budgets share one.
+        let results_fp = py.allow_threads(|| {
+            let mut solved = BTreeMap::new();
+            budgets_fp
+                .into_iter()
+                .map(|budget_fp| {
+                    *solved.entry(budget_fp).or_insert_with(|| {
+                        cached_max_short(
+                            &self.state,
+                            budget_fp,
+                            open_vault_share_price_fp,
+                            checkpoint_exposure_i,
+                            maybe_conservative_price_fp,
+                            maybe_max_iterations,
+                        )
+                    })
+                })
+                .collect::<Vec<_>>()
+        });
+        let results = results_fp.into_iter().map(U256::from).collect();
+        return self.to_py_batch(py, results, as_buffer);
     }
 
-    pub fn calculate_present_value(&self, current_block_timestamp: &str) -> PyResult<String> {
-        let current_block_timestamp_int =
-            U256::from_dec_str(current_block_timestamp).map_err(|_| {
+    pub fn calculate_max_long_warm(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        checkpoint_exposure: &PyAny,
+        current_time: &PyAny,
+        initial_guess: Option<&PyAny>,
+        maybe_max_iterations: Option<usize>,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let guess = warm_start_from_py(initial_guess, TradeSide::Long)?;
+        let solution = py.allow_threads(|| {
+            solve_max_long(
+                &self.state,
+                budget_fp,
+                checkpoint_exposure_i,
+                current_time_int,
+                guess,
+                SolveLimits::iterations(maybe_max_iterations.unwrap_or(DEFAULT_MAX_ITERATIONS)),
+            )
+        });
+        self.to_py_solution(py, TradeSide::Long, solution)
+    }
+
+    pub fn calculate_max_short_warm(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+        current_time: &PyAny,
+        initial_guess: Option<&PyAny>,
+        maybe_conservative_price: Option<&PyAny>,
+        maybe_max_iterations: Option<usize>,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
                 PyErr::new::<PyValueError, _>(
-                    "Failed to convert current_block_timestamp string to U256",
+                    "Failed to convert open_vault_share_price string to U256",
                 )
+            })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let guess = warm_start_from_py(initial_guess, TradeSide::Short)?;
+        let conservative_price = match maybe_conservative_price {
+            Some(conservative_price) => Some(FixedPoint::from(
+                u256_from_py(conservative_price).map_err(|_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_conservative_price string to U256",
+                    )
+                })?,
+            )),
+            None => None,
+        };
+        let solution = py.allow_threads(|| {
+            solve_max_short(
+                &self.state,
+                budget_fp,
+                open_vault_share_price_fp,
+                checkpoint_exposure_i,
+                current_time_int,
+                guess,
+                conservative_price,
+                SolveLimits::iterations(maybe_max_iterations.unwrap_or(DEFAULT_MAX_ITERATIONS)),
+            )
+        });
+        self.to_py_solution(py, TradeSide::Short, solution)
+    }
+
+    pub fn calculate_max_long_anytime(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        checkpoint_exposure: &PyAny,
+        current_time: &PyAny,
+        maybe_time_budget_ns: Option<u64>,
+        maybe_max_evaluations: Option<usize>,
+        initial_guess: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        // The clock starts before the arguments are converted so that the time
+        // budget covers the whole call.
+        let limits = anytime_limits(maybe_time_budget_ns, maybe_max_evaluations);
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let guess = warm_start_from_py(initial_guess, TradeSide::Long)?;
+        let solution = py.allow_threads(|| {
+            solve_max_long(
+                &self.state,
+                budget_fp,
+                checkpoint_exposure_i,
+                current_time_int,
+                guess,
+                limits,
+            )
+        });
+        self.to_py_solution(py, TradeSide::Long, solution)
+    }
+
+    pub fn calculate_max_short_anytime(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+        current_time: &PyAny,
+        maybe_time_budget_ns: Option<u64>,
+        maybe_max_evaluations: Option<usize>,
+        initial_guess: Option<&PyAny>,
+        maybe_conservative_price: Option<&PyAny>,
+    ) -> PyResult<PyObject> {
+        let limits = anytime_limits(maybe_time_budget_ns, maybe_max_evaluations);
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let current_time_int = u256_from_py(current_time).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert current_time string to U256")
+        })?;
+        let guess = warm_start_from_py(initial_guess, TradeSide::Short)?;
+        let conservative_price = match maybe_conservative_price {
+            Some(conservative_price) => Some(FixedPoint::from(
+                u256_from_py(conservative_price).map_err(|_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_conservative_price string to U256",
+                    )
+                })?,
+            )),
+            None => None,
+        };
+        let solution = py.allow_threads(|| {
+            solve_max_short(
+                &self.state,
+                budget_fp,
+                open_vault_share_price_fp,
+                checkpoint_exposure_i,
+                current_time_int,
+                guess,
+                conservative_price,
+                limits,
+            )
+        });
+        self.to_py_solution(py, TradeSide::Short, solution)
+    }
+
+    pub fn calculate_max_long_with_diagnostics(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_max_iterations: Option<usize>,
+        with_trace: bool,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let diagnostics = py
+            .allow_threads(|| {
+                diagnose(
+                    maybe_max_iterations,
+                    with_trace,
+                    |max_iterations| {
+                        Ok(self.state.calculate_max_long(
+                            budget_fp,
+                            checkpoint_exposure_i,
+                            max_iterations,
+                        ))
+                    },
+                    |value| max_long_residual(&self.state, budget_fp, checkpoint_exposure_i, value),
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("calculate_max_long returned the error: {:?}", err))
             })?;
-        let result_fp = self
-            .state
-            .calculate_present_value(current_block_timestamp_int);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        self.to_py_diagnostics(py, &diagnostics)
     }
 
-    pub fn calculate_idle_share_reserves_in_base(&self) -> PyResult<String> {
+    pub fn calculate_max_short_with_diagnostics(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        open_vault_share_price: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_conservative_price: Option<&PyAny>,
+        maybe_max_iterations: Option<usize>,
+        with_trace: bool,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let open_vault_share_price_fp =
+            FixedPoint::from(u256_from_py(open_vault_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert open_vault_share_price string to U256",
+                )
+            })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let maybe_conservative_price_fp = if let Some(conservative_price) = maybe_conservative_price
+        {
+            Some(FixedPoint::from(u256_from_py(conservative_price).map_err(
+                |_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_conservative_price string to U256",
+                    )
+                },
+            )?))
+        } else {
+            None
+        };
+        let diagnostics = py
+            .allow_threads(|| {
+                diagnose(
+                    maybe_max_iterations,
+                    with_trace,
+                    |max_iterations| {
+                        Ok(self.state.calculate_max_short(
+                            budget_fp,
+                            open_vault_share_price_fp,
+                            checkpoint_exposure_i,
+                            maybe_conservative_price_fp,
+                            max_iterations,
+                        ))
+                    },
+                    |value| {
+                        max_short_residual(
+                            &self.state,
+                            budget_fp,
+                            open_vault_share_price_fp,
+                            checkpoint_exposure_i,
+                            value,
+                        )
+                    },
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!("calculate_max_short returned the error: {:?}", err))
+            })?;
+        self.to_py_diagnostics(py, &diagnostics)
+    }
+
+    pub fn calculate_targeted_long_with_budget_with_diagnostics(
+        &self,
+        py: Python<'_>,
+        budget: &PyAny,
+        target_rate: &PyAny,
+        checkpoint_exposure: &PyAny,
+        maybe_max_iterations: Option<usize>,
+        maybe_allowable_error: Option<&PyAny>,
+        with_trace: bool,
+    ) -> PyResult<PyObject> {
+        let budget_fp = FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?);
+        let target_rate_fp = FixedPoint::from(u256_from_py(target_rate).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert target_rate string to U256")
+        })?);
+        let checkpoint_exposure_i = i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?;
+        let maybe_allowable_error_fp = if let Some(allowable_error) = maybe_allowable_error {
+            Some(FixedPoint::from(u256_from_py(allowable_error).map_err(
+                |_| {
+                    PyErr::new::<PyValueError, _>(
+                        "Failed to convert maybe_allowable_error string to U256",
+                    )
+                },
+            )?))
+        } else {
+            None
+        };
+        // The residual is how far the spot rate after the long is from the target,
+        // which is the error the solver works to reduce.
+        let diagnostics = py
+            .allow_threads(|| {
+                diagnose(
+                    maybe_max_iterations,
+                    with_trace,
+                    |max_iterations| {
+                        self.state.calculate_targeted_long_with_budget(
+                            budget_fp,
+                            target_rate_fp,
+                            checkpoint_exposure_i,
+                            max_iterations,
+                            maybe_allowable_error_fp,
+                        )
+                    },
+                    |value| match self.state.calculate_spot_rate_after_long(value, None) {
+                        Ok(rate) if rate >= target_rate_fp => rate - target_rate_fp,
+                        Ok(rate) => target_rate_fp - rate,
+                        Err(_) => FixedPoint::from(U256::MAX),
+                    },
+                )
+            })
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_targeted_long_with_budget returned the error: {:?}",
+                    err
+                ))
+            })?;
+        self.to_py_diagnostics(py, &diagnostics)
+    }
+
+    pub fn calculate_present_value(
+        &self,
+        py: Python<'_>,
+        current_block_timestamp: &PyAny,
+    ) -> PyResult<PyObject> {
+        let current_block_timestamp_int = u256_from_py(current_block_timestamp).map_err(|_| {
+            PyErr::new::<PyValueError, _>(
+                "Failed to convert current_block_timestamp string to U256",
+            )
+        })?;
+        let result_fp = py.allow_threads(|| {
+            self.state
+                .calculate_present_value(current_block_timestamp_int)
+        });
+        return self.to_py_output(py, U256::from(result_fp));
+    }
+
+    pub fn calculate_idle_share_reserves_in_base(&self, py: Python<'_>) -> PyResult<PyObject> {
         let result_fp = self.state.calculate_idle_share_reserves_in_base();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_bonds_out_given_shares_in_down(&self, amount_in: &str) -> PyResult<String> {
-        let amount_in_fp = FixedPoint::from(U256::from_dec_str(amount_in).map_err(|_| {
+    pub fn calculate_bonds_out_given_shares_in_down(
+        &self,
+        py: Python<'_>,
+        amount_in: &PyAny,
+    ) -> PyResult<PyObject> {
+        let amount_in_fp = FixedPoint::from(u256_from_py(amount_in).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert amount_in string to U256")
         })?);
         let result_fp = self
             .state
             .calculate_bonds_out_given_shares_in_down(amount_in_fp);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_shares_in_given_bonds_out_up(&self, amount_in: &str) -> PyResult<String> {
-        let amount_in_fp = FixedPoint::from(U256::from_dec_str(amount_in).map_err(|_| {
+    pub fn calculate_shares_in_given_bonds_out_up(
+        &self,
+        py: Python<'_>,
+        amount_in: &PyAny,
+    ) -> PyResult<PyObject> {
+        let amount_in_fp = FixedPoint::from(u256_from_py(amount_in).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert amount_in string to U256")
         })?);
-        // We unwrap the error here to throw panic error if this fails
         let result_fp = self
             .state
             .calculate_shares_in_given_bonds_out_up_safe(amount_in_fp)
-            .unwrap();
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+            .map_err(|err| {
+                hyperdrive_error(format!(
+                    "calculate_shares_in_given_bonds_out_up_safe returned the error: {:?}",
+                    err
+                ))
+            })?;
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_shares_in_given_bonds_out_down(&self, amount_in: &str) -> PyResult<String> {
-        let amount_in_fp = FixedPoint::from(U256::from_dec_str(amount_in).map_err(|_| {
+    pub fn calculate_shares_in_given_bonds_out_down(
+        &self,
+        py: Python<'_>,
+        amount_in: &PyAny,
+    ) -> PyResult<PyObject> {
+        let amount_in_fp = FixedPoint::from(u256_from_py(amount_in).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert amount_in string to U256")
         })?);
         let result_fp = self
             .state
             .calculate_shares_in_given_bonds_out_down(amount_in_fp);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn calculate_shares_out_given_bonds_in_down(&self, amount_in: &str) -> PyResult<String> {
-        let amount_in_fp = FixedPoint::from(U256::from_dec_str(amount_in).map_err(|_| {
+    pub fn calculate_shares_out_given_bonds_in_down(
+        &self,
+        py: Python<'_>,
+        amount_in: &PyAny,
+    ) -> PyResult<PyObject> {
+        let amount_in_fp = FixedPoint::from(u256_from_py(amount_in).map_err(|_| {
             PyErr::new::<PyValueError, _>("Failed to convert amount_in string to U256")
         })?);
         let result_fp = self
             .state
             .calculate_shares_out_given_bonds_in_down(amount_in_fp);
-        let result = U256::from(result_fp).to_string();
-        return Ok(result);
+        return self.to_py_output(py, U256::from(result_fp));
     }
 
-    pub fn to_checkpoint(&self, time: &str) -> PyResult<String> {
-        let time_int = U256::from_dec_str(time)
+    pub fn to_checkpoint(&self, py: Python<'_>, time: &PyAny) -> PyResult<PyObject> {
+        let time_int = u256_from_py(time)
             .map_err(|_| PyErr::new::<PyValueError, _>("Failed to convert time string to U256"))?;
         let result_int = self.state.to_checkpoint(time_int);
-        let result = result_int.to_string();
-        return Ok(result);
+        return self.to_py_output(py, result_int);
     }
 }
@@ -1,28 +1,57 @@
+mod diagnostics;
+mod errors;
+mod fees;
 mod hyperdrive_state;
 mod hyperdrive_state_methods;
 mod hyperdrive_utils;
+mod lp;
 mod pool_config;
+mod pool_config_handle;
+mod pool_evaluator;
+mod pool_history;
 mod pool_info;
+mod price_impact;
+mod quote;
+mod screening;
+mod serialization;
+mod solver;
+mod solver_cache;
+mod solver_state;
+mod trade_simulator;
 mod utils;
 
 use pyo3::prelude::*;
 
+pub use errors::add_exceptions;
 use hyperdrive_state::HyperdriveState;
 pub use hyperdrive_state_methods::*;
 pub use hyperdrive_utils::{
     calculate_effective_share_reserves, calculate_initial_bond_reserves, calculate_time_stretch,
 };
 pub use pool_config::PyPoolConfig;
-pub use pool_info::PyPoolInfo;
+pub use pool_config_handle::PoolConfigHandle;
+pub use pool_evaluator::evaluate_pools;
+pub use pool_history::replay_pool_history;
+pub use pool_info::{update_pool_info_field, PyPoolInfo};
+pub use solver_cache::{clear_solver_cache, set_solver_cache_size, solver_cache_stats};
+pub use solver_state::SolverState;
 
 /// Get the share reserves after subtracting the adjustment used for
 /// A pyO3 wrapper for the hyperdrive_math crate.
 #[pymodule]
 #[pyo3(name = "hyperdrivepy")]
-fn hyperdrivepy(_py: Python<'_>, m: &PyModule) -> PyResult<()> {
+fn hyperdrivepy(py: Python<'_>, m: &PyModule) -> PyResult<()> {
     m.add_class::<HyperdriveState>()?;
+    m.add_class::<PoolConfigHandle>()?;
+    m.add_class::<SolverState>()?;
     m.add_function(wrap_pyfunction!(calculate_initial_bond_reserves, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_effective_share_reserves, m)?)?;
     m.add_function(wrap_pyfunction!(calculate_time_stretch, m)?)?;
+    m.add_function(wrap_pyfunction!(evaluate_pools, m)?)?;
+    m.add_function(wrap_pyfunction!(replay_pool_history, m)?)?;
+    m.add_function(wrap_pyfunction!(set_solver_cache_size, m)?)?;
+    m.add_function(wrap_pyfunction!(clear_solver_cache, m)?)?;
+    m.add_function(wrap_pyfunction!(solver_cache_stats, m)?)?;
+    add_exceptions(py, m)?;
     Ok(())
 }
@@ -0,0 +1,215 @@
+use ethers::core::types::U256;
+use eyre::{eyre, Result};
+use fixed_point::FixedPoint;
+use hyperdrive_math::State;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use crate::u256_from_py;
+
+// Helper function to convert the optional add liquidity slippage guards.
+// Missing guards default to accepting any LP share price and any spot rate.
+pub fn add_liquidity_limits_from_py(
+    min_lp_share_price: Option<&PyAny>,
+    min_apr: Option<&PyAny>,
+    max_apr: Option<&PyAny>,
+) -> PyResult<(FixedPoint, FixedPoint, FixedPoint)> {
+    let min_lp_share_price_fp = match min_lp_share_price {
+        Some(min_lp_share_price) => {
+            FixedPoint::from(u256_from_py(min_lp_share_price).map_err(|_| {
+                PyErr::new::<PyValueError, _>("Failed to convert min_lp_share_price string to U256")
+            })?)
+        }
+        None => FixedPoint::from(U256::zero()),
+    };
+    let min_apr_fp = match min_apr {
+        Some(min_apr) => FixedPoint::from(u256_from_py(min_apr).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert min_apr string to U256")
+        })?),
+        None => FixedPoint::from(U256::zero()),
+    };
+    let max_apr_fp = match max_apr {
+        Some(max_apr) => FixedPoint::from(u256_from_py(max_apr).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert max_apr string to U256")
+        })?),
+        None => FixedPoint::from(U256::MAX),
+    };
+    Ok((min_lp_share_price_fp, min_apr_fp, max_apr_fp))
+}
+
+// Helper function to convert the optional withdrawal shares held by others.
+// They default to none, i.e. to no other withdrawal shares waiting to be
+// redeemed.
+pub fn other_withdrawal_shares_from_py(
+    maybe_other_withdrawal_shares: Option<&PyAny>,
+) -> PyResult<FixedPoint> {
+    match maybe_other_withdrawal_shares {
+        Some(other_withdrawal_shares) => Ok(FixedPoint::from(
+            u256_from_py(other_withdrawal_shares).map_err(|_| {
+                PyErr::new::<PyValueError, _>(
+                    "Failed to convert maybe_other_withdrawal_shares string to U256",
+                )
+            })?,
+        )),
+        None => Ok(FixedPoint::from(U256::zero())),
+    }
+}
+
+// The pool's idle liquidity in shares: the share reserves that aren't backing
+// long exposure or the minimum share reserves.
+fn idle_share_reserves(state: &State) -> FixedPoint {
+    let share_reserves = FixedPoint::from(state.info.share_reserves);
+    let long_exposure = FixedPoint::from(state.info.long_exposure)
+        .div_up(FixedPoint::from(state.info.vault_share_price));
+    let minimum_share_reserves = FixedPoint::from(state.config.minimum_share_reserves);
+    if share_reserves > long_exposure + minimum_share_reserves {
+        share_reserves - long_exposure - minimum_share_reserves
+    } else {
+        FixedPoint::from(U256::zero())
+    }
+}
+
+// Estimates the withdrawal shares redeemed and the share proceeds paid to the
+// withdrawal pool when the contract distributes excess idle, following the
+// steps of its _distributeExcessIdle:
+//
+// 1. The share reserves can be debited by at most the idle liquidity, dz_max.
+// 2. Debiting dz_max redeems dw = l - l * PV(dz_max) / PV(0) withdrawal shares,
+//    which holds the LP share price PV / l constant. If dw <= w, the
+//    withdrawal pool gets dz_max for dw shares.
+// 3. Otherwise all w shares are redeemed for w * PV(0) / l shares, unless that
+//    isn't less than dz_max, in which case nothing is distributed.
+//
+// The contract solves for the present value after the debit with Newton's
+// method. Here it is taken to be PV(0) - dz, and dz_max to be the idle. Both
+// are exact when the pool has no net curve exposure, e.g. when no positions
+// are open, so the results match the contract in that case and are estimates
+// otherwise. The rounding follows the contract.
+fn estimate_distribute_excess_idle(
+    state: &State,
+    withdrawal_shares: FixedPoint,
+    current_time: U256,
+) -> (FixedPoint, FixedPoint) {
+    let zero = FixedPoint::from(U256::zero());
+    let lp_total_supply = FixedPoint::from(state.info.lp_total_supply);
+    let max_share_reserves_delta = idle_share_reserves(state);
+    let present_value = state.calculate_present_value(current_time);
+    if withdrawal_shares == zero || max_share_reserves_delta == zero || present_value == zero {
+        return (zero, zero);
+    }
+    let ending_present_value = if present_value > max_share_reserves_delta {
+        present_value - max_share_reserves_delta
+    } else {
+        zero
+    };
+    let withdrawal_shares_redeemed =
+        lp_total_supply - lp_total_supply.mul_div_down(ending_present_value, present_value);
+    if withdrawal_shares_redeemed == zero {
+        return (zero, zero);
+    }
+    if withdrawal_shares_redeemed <= withdrawal_shares {
+        return (withdrawal_shares_redeemed, max_share_reserves_delta);
+    }
+    let share_proceeds = withdrawal_shares.mul_div_down(present_value, lp_total_supply);
+    if share_proceeds == zero || share_proceeds >= max_share_reserves_delta {
+        return (zero, zero);
+    }
+    (withdrawal_shares, share_proceeds)
+}
+
+// Estimates redeeming withdrawal shares after excess idle is distributed. The
+// shares are redeemed from the withdrawal pool pro rata with the shares that
+// are already ready to withdraw, and the share proceeds are paid out in base.
+//
+// PoolInfo doesn't split the LP total supply into active LP shares and
+// withdrawal shares, so the withdrawal shares held by others that aren't ready
+// to withdraw yet are passed in. The excess idle is distributed across all of
+// the outstanding withdrawal shares, and the given shares are redeemed ahead
+// of the others.
+fn estimate_redeem(
+    state: &State,
+    withdrawal_shares: FixedPoint,
+    other_withdrawal_shares: FixedPoint,
+    current_time: U256,
+) -> (FixedPoint, FixedPoint) {
+    let zero = FixedPoint::from(U256::zero());
+    let (distributed_shares, distributed_proceeds) = estimate_distribute_excess_idle(
+        state,
+        withdrawal_shares + other_withdrawal_shares,
+        current_time,
+    );
+    let ready_to_withdraw =
+        FixedPoint::from(state.info.withdrawal_shares_ready_to_withdraw) + distributed_shares;
+    let withdrawal_shares_proceeds =
+        FixedPoint::from(state.info.withdrawal_shares_proceeds) + distributed_proceeds;
+    let shares_redeemed = withdrawal_shares.min(ready_to_withdraw);
+    if shares_redeemed == zero {
+        return (zero, zero);
+    }
+    let share_proceeds =
+        shares_redeemed.mul_div_down(withdrawal_shares_proceeds, ready_to_withdraw);
+    (
+        share_proceeds.mul_down(FixedPoint::from(state.info.vault_share_price)),
+        shares_redeemed,
+    )
+}
+
+// The LP total supply counts the withdrawal shares that aren't ready to
+// withdraw yet, so it has to cover the given shares and the other ones.
+fn check_lp_total_supply(
+    state: &State,
+    name: &str,
+    shares: FixedPoint,
+    other_withdrawal_shares: FixedPoint,
+) -> Result<()> {
+    let lp_total_supply = state.info.lp_total_supply;
+    match U256::from(shares).checked_add(U256::from(other_withdrawal_shares)) {
+        Some(total) if total <= lp_total_supply => Ok(()),
+        _ => Err(eyre!(
+            "{} {} plus the other withdrawal shares {} exceeds the LP total supply {}",
+            name,
+            U256::from(shares),
+            U256::from(other_withdrawal_shares),
+            lp_total_supply
+        )),
+    }
+}
+
+// Estimates the base an LP receives immediately and the withdrawal shares they
+// are left with when removing liquidity. The contract converts the LP shares
+// into withdrawal shares and redeems as many as it can once excess idle has
+// been distributed.
+pub fn estimate_remove_liquidity(
+    state: &State,
+    lp_shares: FixedPoint,
+    other_withdrawal_shares: FixedPoint,
+    current_time: U256,
+) -> Result<(FixedPoint, FixedPoint)> {
+    check_lp_total_supply(state, "lp_shares", lp_shares, other_withdrawal_shares)?;
+    let (base_proceeds, shares_redeemed) =
+        estimate_redeem(state, lp_shares, other_withdrawal_shares, current_time);
+    Ok((base_proceeds, lp_shares - shares_redeemed))
+}
+
+// Estimates the base received and the withdrawal shares redeemed when
+// redeeming withdrawal shares.
+pub fn estimate_redeem_withdrawal_shares(
+    state: &State,
+    withdrawal_shares: FixedPoint,
+    other_withdrawal_shares: FixedPoint,
+    current_time: U256,
+) -> Result<(FixedPoint, FixedPoint)> {
+    check_lp_total_supply(
+        state,
+        "withdrawal_shares",
+        withdrawal_shares,
+        other_withdrawal_shares,
+    )?;
+    Ok(estimate_redeem(
+        state,
+        withdrawal_shares,
+        other_withdrawal_shares,
+        current_time,
+    ))
+}
@@ -1,6 +1,6 @@
 use crate::{
     extract_address_from_attr, extract_bytes32_from_attr, extract_fees_from_attr,
-    extract_u256_from_attr,
+    extract_u256_from_attr, PoolConfigHandle,
 };
 use hyperdrive_wrappers::wrappers::ihyperdrive::PoolConfig;
 use pyo3::prelude::*;
@@ -17,20 +17,23 @@ impl PyPoolConfig {
 
 impl FromPyObject<'_> for PyPoolConfig {
     fn extract(ob: &PyAny) -> PyResult<Self> {
-        let base_token = extract_address_from_attr(ob, "baseToken")?;
-        let vault_shares_token= extract_address_from_attr(ob, "vaultSharesToken")?;
-        let linker_factory = extract_address_from_attr(ob, "linkerFactory")?;
-        let linker_code_hash = extract_bytes32_from_attr(ob, "linkerCodeHash")?;
-        let initial_vault_share_price = extract_u256_from_attr(ob, "initialVaultSharePrice")?;
-        let minimum_share_reserves = extract_u256_from_attr(ob, "minimumShareReserves")?;
-        let minimum_transaction_amount = extract_u256_from_attr(ob, "minimumTransactionAmount")?;
-        let position_duration = extract_u256_from_attr(ob, "positionDuration")?;
-        let checkpoint_duration = extract_u256_from_attr(ob, "checkpointDuration")?;
-        let time_stretch = extract_u256_from_attr(ob, "timeStretch")?;
-        let governance = extract_address_from_attr(ob, "governance")?;
-        let fee_collector = extract_address_from_attr(ob, "feeCollector")?;
-        let sweep_collector = extract_address_from_attr(ob, "sweepCollector")?;
-        let fees = extract_fees_from_attr(ob, "fees")?;
+        if let Ok(handle) = ob.extract::<PyRef<PoolConfigHandle>>() {
+            return Ok(PyPoolConfig::new(handle.pool_config.clone()));
+        }
+        let base_token = extract_address_from_attr(ob, "baseToken", 0)?;
+        let vault_shares_token = extract_address_from_attr(ob, "vaultSharesToken", 1)?;
+        let linker_factory = extract_address_from_attr(ob, "linkerFactory", 2)?;
+        let linker_code_hash = extract_bytes32_from_attr(ob, "linkerCodeHash", 3)?;
+        let initial_vault_share_price = extract_u256_from_attr(ob, "initialVaultSharePrice", 4)?;
+        let minimum_share_reserves = extract_u256_from_attr(ob, "minimumShareReserves", 5)?;
+        let minimum_transaction_amount = extract_u256_from_attr(ob, "minimumTransactionAmount", 6)?;
+        let position_duration = extract_u256_from_attr(ob, "positionDuration", 7)?;
+        let checkpoint_duration = extract_u256_from_attr(ob, "checkpointDuration", 8)?;
+        let time_stretch = extract_u256_from_attr(ob, "timeStretch", 9)?;
+        let governance = extract_address_from_attr(ob, "governance", 10)?;
+        let fee_collector = extract_address_from_attr(ob, "feeCollector", 11)?;
+        let sweep_collector = extract_address_from_attr(ob, "sweepCollector", 12)?;
+        let fees = extract_fees_from_attr(ob, "fees", 13)?;
 
         let pool_config = PoolConfig {
             base_token,
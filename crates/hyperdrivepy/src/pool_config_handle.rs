@@ -0,0 +1,20 @@
+use hyperdrive_wrappers::wrappers::ihyperdrive::PoolConfig;
+use pyo3::prelude::*;
+
+use crate::PyPoolConfig;
+
+// A pool config that has been extracted once and can be reused across states.
+// The config is set at deploy time, so it never needs to be re-parsed for a given pool.
+#[pyclass(module = "hyperdrivepy", name = "PoolConfigHandle", frozen)]
+pub struct PoolConfigHandle {
+    pub pool_config: PoolConfig,
+}
+
+#[pymethods]
+impl PoolConfigHandle {
+    #[new]
+    pub fn __init__(pool_config: &PyAny) -> PyResult<Self> {
+        let pool_config = PyPoolConfig::extract(pool_config)?.pool_config;
+        Ok(PoolConfigHandle { pool_config })
+    }
+}
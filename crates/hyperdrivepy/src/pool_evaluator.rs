@@ -0,0 +1,184 @@
+use ethers::core::types::{I256, U256};
+use fixed_point::FixedPoint;
+use rayon::prelude::*;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+
+use crate::solver_cache::{cached_max_long, cached_max_short};
+use crate::{i256_from_py, u256_buffer_to_py, u256_from_py, u256_to_py_int, HyperdriveState};
+use hyperdrive_math::State;
+
+// The per-pool quantities that can be requested from evaluate_pools.
+#[derive(Clone, Copy)]
+pub(crate) enum PoolMetric {
+    SpotPrice,
+    SpotRate,
+    Solvency,
+    MaxSpotPrice,
+    IdleShareReservesInBase,
+    MaxLong,
+    MaxShort,
+}
+
+impl PoolMetric {
+    pub(crate) fn from_name(name: &str) -> PyResult<Self> {
+        match name {
+            "spot_price" => Ok(PoolMetric::SpotPrice),
+            "spot_rate" => Ok(PoolMetric::SpotRate),
+            "solvency" => Ok(PoolMetric::Solvency),
+            "max_spot_price" => Ok(PoolMetric::MaxSpotPrice),
+            "idle_share_reserves_in_base" => Ok(PoolMetric::IdleShareReservesInBase),
+            "max_long" => Ok(PoolMetric::MaxLong),
+            "max_short" => Ok(PoolMetric::MaxShort),
+            _ => Err(PyErr::new::<PyValueError, _>(format!(
+                "Unknown pool metric: {}",
+                name
+            ))),
+        }
+    }
+}
+
+// Arguments shared by the iterative solvers for every pool. Solves go through
+// the solver cache unless use_cache is false.
+pub(crate) struct SolverArgs {
+    budget: FixedPoint,
+    checkpoint_exposure: I256,
+    maybe_max_iterations: Option<usize>,
+    pub(crate) use_cache: bool,
+}
+
+pub(crate) fn evaluate_metric(state: &State, metric: PoolMetric, args: &SolverArgs) -> U256 {
+    let result_fp = match metric {
+        PoolMetric::SpotPrice => state.calculate_spot_price(),
+        PoolMetric::SpotRate => state.calculate_spot_rate(),
+        PoolMetric::Solvency => state.calculate_solvency(),
+        PoolMetric::MaxSpotPrice => state.calculate_max_spot_price(),
+        PoolMetric::IdleShareReservesInBase => state.calculate_idle_share_reserves_in_base(),
+        PoolMetric::MaxLong if args.use_cache => cached_max_long(
+            state,
+            args.budget,
+            args.checkpoint_exposure,
+            args.maybe_max_iterations,
+        ),
+        PoolMetric::MaxLong => state.calculate_max_long(
+            args.budget,
+            args.checkpoint_exposure,
+            args.maybe_max_iterations,
+        ),
+        // Shorts are evaluated as if they were opened at the pool's current vault share price.
+        PoolMetric::MaxShort if args.use_cache => cached_max_short(
+            state,
+            args.budget,
+            FixedPoint::from(state.info.vault_share_price),
+            args.checkpoint_exposure,
+            None,
+            args.maybe_max_iterations,
+        ),
+        PoolMetric::MaxShort => state.calculate_max_short(
+            args.budget,
+            FixedPoint::from(state.info.vault_share_price),
+            args.checkpoint_exposure,
+            None,
+            args.maybe_max_iterations,
+        ),
+    };
+    U256::from(result_fp)
+}
+
+pub(crate) fn solver_args_from_py(
+    budget: Option<&PyAny>,
+    checkpoint_exposure: Option<&PyAny>,
+    maybe_max_iterations: Option<usize>,
+) -> PyResult<SolverArgs> {
+    let budget_fp = match budget {
+        Some(budget) => FixedPoint::from(u256_from_py(budget).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert budget string to U256")
+        })?),
+        None => FixedPoint::from(U256::MAX),
+    };
+    let checkpoint_exposure_i = match checkpoint_exposure {
+        Some(checkpoint_exposure) => i256_from_py(checkpoint_exposure).map_err(|_| {
+            PyErr::new::<PyValueError, _>("Failed to convert checkpoint_exposure string to I256")
+        })?,
+        None => I256::zero(),
+    };
+    Ok(SolverArgs {
+        budget: budget_fp,
+        checkpoint_exposure: checkpoint_exposure_i,
+        maybe_max_iterations,
+        use_cache: true,
+    })
+}
+
+// Helper function to transpose per-row results into a dict with one list per
+// metric, or with as_buffer one bytes buffer of 32-byte words per metric.
+pub(crate) fn metric_columns_to_py(
+    py: Python<'_>,
+    metrics: &[String],
+    rows: &[Vec<U256>],
+    native_ints: bool,
+    as_buffer: bool,
+) -> PyResult<PyObject> {
+    let result = PyDict::new(py);
+    for (column, name) in metrics.iter().enumerate() {
+        if as_buffer {
+            let values: Vec<U256> = rows.iter().map(|row| row[column]).collect();
+            result.set_item(name, u256_buffer_to_py(py, &values)?)?;
+            continue;
+        }
+        let values = rows
+            .iter()
+            .map(|row| {
+                if native_ints {
+                    u256_to_py_int(py, row[column])
+                } else {
+                    Ok(row[column].to_string().into_py(py))
+                }
+            })
+            .collect::<PyResult<Vec<PyObject>>>()?;
+        result.set_item(name, PyList::new(py, values))?;
+    }
+    Ok(result.into_py(py))
+}
+
+/// Evaluate a set of metrics for many pools in parallel.
+///
+/// The pools are fanned out across a rayon thread pool with the GIL released,
+/// and the results are returned as a dict mapping each metric name to a list
+/// with one entry per pool, in the order the pools were given. With as_buffer,
+/// each metric maps to a bytes buffer of 32-byte little-endian words instead.
+#[pyfunction]
+#[pyo3(signature = (states, metrics, budget=None, checkpoint_exposure=None, maybe_max_iterations=None, native_ints=false, as_buffer=false))]
+pub fn evaluate_pools(
+    py: Python<'_>,
+    states: Vec<PyRef<HyperdriveState>>,
+    metrics: Vec<String>,
+    budget: Option<&PyAny>,
+    checkpoint_exposure: Option<&PyAny>,
+    maybe_max_iterations: Option<usize>,
+    native_ints: bool,
+    as_buffer: bool,
+) -> PyResult<PyObject> {
+    let pool_metrics = metrics
+        .iter()
+        .map(|name| PoolMetric::from_name(name))
+        .collect::<PyResult<Vec<PoolMetric>>>()?;
+    let args = solver_args_from_py(budget, checkpoint_exposure, maybe_max_iterations)?;
+
+    let rust_states: Vec<&State> = states.iter().map(|state| &state.state).collect();
+    let rows: Vec<Vec<U256>> = py.allow_threads(|| {
+        rust_states
+            .par_iter()
+            .map(|state| {
+                pool_metrics
+                    .iter()
+                    .map(|metric| evaluate_metric(state, *metric, &args))
+                    .collect()
+            })
+            .collect()
+    });
+
+    metric_columns_to_py(py, &metrics, &rows, native_ints, as_buffer)
+}
@@ -0,0 +1,283 @@
+use ethers::core::types::{I256, U256};
+use rayon::prelude::*;
+
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyDict, PyLong, PyString};
+
+use crate::pool_evaluator::{
+    evaluate_metric, metric_columns_to_py, solver_args_from_py, PoolMetric, SolverArgs,
+};
+use crate::{i256_from_py, u256_from_py, u256_vec_from_buffer, PyPoolConfig};
+use hyperdrive_math::State;
+use hyperdrive_wrappers::wrappers::ihyperdrive::PoolInfo;
+
+// The PoolInfo fields, named as in the solidity struct and in field order.
+const POOL_INFO_FIELDS: [&str; 15] = [
+    "shareReserves",
+    "shareAdjustment",
+    "zombieBaseProceeds",
+    "zombieShareReserves",
+    "bondReserves",
+    "lpTotalSupply",
+    "vaultSharePrice",
+    "longsOutstanding",
+    "longAverageMaturityTime",
+    "shortsOutstanding",
+    "shortAverageMaturityTime",
+    "withdrawalSharesReadyToWithdraw",
+    "withdrawalSharesProceeds",
+    "lpSharePrice",
+    "longExposure",
+];
+
+// The per-row quantities that can be requested from replay_pool_history. The
+// present value also depends on the block timestamp of each row.
+#[derive(Clone, Copy)]
+enum HistoryMetric {
+    Pool(PoolMetric),
+    PresentValue,
+}
+
+impl HistoryMetric {
+    fn from_name(name: &str) -> PyResult<Self> {
+        match name {
+            "present_value" => Ok(HistoryMetric::PresentValue),
+            _ => Ok(HistoryMetric::Pool(PoolMetric::from_name(name)?)),
+        }
+    }
+}
+
+// Helper function to convert a single column value into its raw 256-bit
+// representation. Signed values are stored as two's complement.
+//
+// Python ints and decimal strings are converted directly, a row of four
+// little-endian u64 limbs (a row of a (rows, 4) uint64 array) is used as is,
+// numpy integers are converted through __index__ and anything else, such as
+// integral decimal.Decimal values, through its string form.
+fn column_value_from_py(ob: &PyAny, signed: bool) -> PyResult<U256> {
+    if ob.downcast::<PyLong>().is_ok() || ob.downcast::<PyString>().is_ok() {
+        return if signed {
+            Ok(i256_from_py(ob)?.into_raw())
+        } else {
+            u256_from_py(ob)
+        };
+    }
+    if let Ok(limbs) = ob.extract::<[u64; 4]>() {
+        return Ok(U256(limbs));
+    }
+    match ob.call_method0("__index__") {
+        Ok(value) => column_value_from_py(value, signed),
+        Err(_) => column_value_from_py(ob.str()?.as_ref(), signed),
+    }
+}
+
+// Helper function to read an Arrow decimal256 array, or a chunked array of
+// them, straight from its data buffer. The buffer holds one 32-byte
+// little-endian two's complement word per value, which is the layout
+// fixed_point_vec_from_py reads, so no value goes through python. Returns None
+// for anything that isn't a decimal256 array.
+fn arrow_decimal256_column_from_py(column: &PyAny, name: &str) -> PyResult<Option<Vec<U256>>> {
+    if !column.hasattr("type")? || !column.hasattr("null_count")? {
+        return Ok(None);
+    }
+    let data_type = column.getattr("type")?;
+    if !data_type.str()?.to_str()?.starts_with("decimal256") {
+        return Ok(None);
+    }
+    if data_type.getattr("scale")?.extract::<i64>()? != 0 {
+        return Err(PyErr::new::<PyValueError, _>(format!(
+            "Failed to convert {}: decimal256 columns must have a scale of 0",
+            name
+        )));
+    }
+    if column.getattr("null_count")?.extract::<usize>()? > 0 {
+        return Err(PyErr::new::<PyValueError, _>(format!(
+            "Failed to convert {}: the column has nulls",
+            name
+        )));
+    }
+    let column = if column.hasattr("combine_chunks")? {
+        column.call_method0("combine_chunks")?
+    } else {
+        column
+    };
+    let offset: usize = column.getattr("offset")?.extract()?;
+    let length = column.len()?;
+    let buffers: Vec<&PyAny> = column.call_method0("buffers")?.extract()?;
+    let data: &PyBytes = buffers[1].call_method0("to_pybytes")?.downcast()?;
+    let words = data
+        .as_bytes()
+        .get(offset * 32..(offset + length) * 32)
+        .ok_or_else(|| {
+            PyErr::new::<PyValueError, _>(format!(
+                "Failed to convert {}: the data buffer is too short",
+                name
+            ))
+        })?;
+    u256_vec_from_buffer(words, name).map(Some)
+}
+
+// Helper function to convert a column into a list of values. Arrow decimal256
+// arrays are read from their data buffer, other Arrow arrays are converted with
+// to_pylist and numpy arrays with tolist, which is much faster than reading
+// their elements one by one.
+fn column_from_py(column: &PyAny, name: &str, signed: bool) -> PyResult<Vec<U256>> {
+    if let Some(values) = arrow_decimal256_column_from_py(column, name)? {
+        return Ok(values);
+    }
+    let column = if column.hasattr("to_pylist")? {
+        column.call_method0("to_pylist")?
+    } else if column.hasattr("tolist")? {
+        column.call_method0("tolist")?
+    } else {
+        column
+    };
+    let items: Vec<&PyAny> = column.extract()?;
+    items
+        .into_iter()
+        .enumerate()
+        .map(|(index, item)| {
+            column_value_from_py(item, signed).map_err(|_| {
+                PyErr::new::<PyValueError, _>(format!(
+                    "Failed to convert {}[{}] to {}",
+                    name,
+                    index,
+                    if signed { "I256" } else { "U256" }
+                ))
+            })
+        })
+        .collect()
+}
+
+// Helper function to read the PoolInfo columns and transpose them into one
+// PoolInfo per row.
+fn pool_infos_from_columns(columns: &PyDict) -> PyResult<Vec<PoolInfo>> {
+    for name in columns.keys() {
+        let name: &str = name.extract()?;
+        if !POOL_INFO_FIELDS.contains(&name) {
+            return Err(PyErr::new::<PyValueError, _>(format!(
+                "Unknown PoolInfo field: {}",
+                name
+            )));
+        }
+    }
+    let mut values: Vec<Vec<U256>> = Vec::with_capacity(POOL_INFO_FIELDS.len());
+    for name in POOL_INFO_FIELDS {
+        let column = columns.get_item(name).ok_or_else(|| {
+            PyErr::new::<PyValueError, _>(format!("Missing PoolInfo column: {}", name))
+        })?;
+        values.push(column_from_py(column, name, name == "shareAdjustment")?);
+    }
+    let num_rows = values[0].len();
+    for (name, column) in POOL_INFO_FIELDS.iter().zip(values.iter()) {
+        if column.len() != num_rows {
+            return Err(PyErr::new::<PyValueError, _>(format!(
+                "PoolInfo column {} has {} rows, expected {}",
+                name,
+                column.len(),
+                num_rows
+            )));
+        }
+    }
+    Ok((0..num_rows)
+        .map(|row| PoolInfo {
+            share_reserves: values[0][row],
+            share_adjustment: I256::from_raw(values[1][row]),
+            zombie_base_proceeds: values[2][row],
+            zombie_share_reserves: values[3][row],
+            bond_reserves: values[4][row],
+            lp_total_supply: values[5][row],
+            vault_share_price: values[6][row],
+            longs_outstanding: values[7][row],
+            long_average_maturity_time: values[8][row],
+            shorts_outstanding: values[9][row],
+            short_average_maturity_time: values[10][row],
+            withdrawal_shares_ready_to_withdraw: values[11][row],
+            withdrawal_shares_proceeds: values[12][row],
+            lp_share_price: values[13][row],
+            long_exposure: values[14][row],
+        })
+        .collect())
+}
+
+/// Evaluate a set of metrics for every row of a columnar PoolInfo history.
+///
+/// The columns are converted once, then the rows are fanned out across a
+/// rayon thread pool with the GIL released. The results are returned as a
+/// dict mapping each metric name to a list with one entry per row, or with
+/// as_buffer to a bytes buffer of 32-byte little-endian words.
+#[pyfunction]
+#[pyo3(signature = (pool_config, columns, metrics, block_timestamps=None, budget=None, checkpoint_exposure=None, maybe_max_iterations=None, native_ints=false, as_buffer=false))]
+pub fn replay_pool_history(
+    py: Python<'_>,
+    pool_config: &PyAny,
+    columns: &PyDict,
+    metrics: Vec<String>,
+    block_timestamps: Option<&PyAny>,
+    budget: Option<&PyAny>,
+    checkpoint_exposure: Option<&PyAny>,
+    maybe_max_iterations: Option<usize>,
+    native_ints: bool,
+    as_buffer: bool,
+) -> PyResult<PyObject> {
+    let history_metrics = metrics
+        .iter()
+        .map(|name| HistoryMetric::from_name(name))
+        .collect::<PyResult<Vec<HistoryMetric>>>()?;
+    // Every row is a different state, so replayed solves would only fill the
+    // solver cache with entries that are never hit and evict the ones that are.
+    let args = SolverArgs {
+        use_cache: false,
+        ..solver_args_from_py(budget, checkpoint_exposure, maybe_max_iterations)?
+    };
+    let rust_pool_config = PyPoolConfig::extract(pool_config)?.pool_config;
+    let pool_infos = pool_infos_from_columns(columns)?;
+    let timestamps = match block_timestamps {
+        Some(block_timestamps) => {
+            let timestamps = column_from_py(block_timestamps, "block_timestamps", false)?;
+            if timestamps.len() != pool_infos.len() {
+                return Err(PyErr::new::<PyValueError, _>(format!(
+                    "block_timestamps has {} rows, expected {}",
+                    timestamps.len(),
+                    pool_infos.len()
+                )));
+            }
+            Some(timestamps)
+        }
+        None => None,
+    };
+    if timestamps.is_none()
+        && history_metrics
+            .iter()
+            .any(|metric| matches!(metric, HistoryMetric::PresentValue))
+    {
+        return Err(PyErr::new::<PyValueError, _>(
+            "The present_value metric requires block_timestamps",
+        ));
+    }
+    // The timestamps are only read by the present value, so they can be zero
+    // when it wasn't requested.
+    let timestamps = timestamps.unwrap_or_else(|| vec![U256::zero(); pool_infos.len()]);
+
+    let rows: Vec<Vec<U256>> = py.allow_threads(|| {
+        pool_infos
+            .into_par_iter()
+            .zip(timestamps.into_par_iter())
+            .map(|(pool_info, timestamp)| {
+                let state = State::new(rust_pool_config.clone(), pool_info);
+                history_metrics
+                    .iter()
+                    .map(|metric| match metric {
+                        HistoryMetric::Pool(metric) => evaluate_metric(&state, *metric, &args),
+                        HistoryMetric::PresentValue => {
+                            U256::from(state.calculate_present_value(timestamp))
+                        }
+                    })
+                    .collect()
+            })
+            .collect()
+    });
+
+    metric_columns_to_py(py, &metrics, &rows, native_ints, as_buffer)
+}
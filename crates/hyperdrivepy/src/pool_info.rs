@@ -1,5 +1,6 @@
-use crate::{extract_i256_from_attr, extract_u256_from_attr};
+use crate::{extract_i256_from_attr, extract_u256_from_attr, i256_from_py, u256_from_py};
 use hyperdrive_wrappers::wrappers::ihyperdrive::PoolInfo;
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
 pub struct PyPoolInfo {
@@ -14,22 +15,24 @@ impl PyPoolInfo {
 
 impl FromPyObject<'_> for PyPoolInfo {
     fn extract(ob: &PyAny) -> PyResult<Self> {
-        let share_reserves = extract_u256_from_attr(ob, "shareReserves")?;
-        let share_adjustment = extract_i256_from_attr(ob, "shareAdjustment")?;
-        let zombie_base_proceeds = extract_u256_from_attr(ob, "zombieBaseProceeds")?;
-        let zombie_share_reserves = extract_u256_from_attr(ob, "zombieShareReserves")?;
-        let bond_reserves = extract_u256_from_attr(ob, "bondReserves")?;
-        let lp_total_supply = extract_u256_from_attr(ob, "lpTotalSupply")?;
-        let vault_share_price = extract_u256_from_attr(ob, "vaultSharePrice")?;
-        let longs_outstanding = extract_u256_from_attr(ob, "longsOutstanding")?;
-        let long_average_maturity_time = extract_u256_from_attr(ob, "longAverageMaturityTime")?;
-        let shorts_outstanding = extract_u256_from_attr(ob, "shortsOutstanding")?;
-        let short_average_maturity_time = extract_u256_from_attr(ob, "shortAverageMaturityTime")?;
+        let share_reserves = extract_u256_from_attr(ob, "shareReserves", 0)?;
+        let share_adjustment = extract_i256_from_attr(ob, "shareAdjustment", 1)?;
+        let zombie_base_proceeds = extract_u256_from_attr(ob, "zombieBaseProceeds", 2)?;
+        let zombie_share_reserves = extract_u256_from_attr(ob, "zombieShareReserves", 3)?;
+        let bond_reserves = extract_u256_from_attr(ob, "bondReserves", 4)?;
+        let lp_total_supply = extract_u256_from_attr(ob, "lpTotalSupply", 5)?;
+        let vault_share_price = extract_u256_from_attr(ob, "vaultSharePrice", 6)?;
+        let longs_outstanding = extract_u256_from_attr(ob, "longsOutstanding", 7)?;
+        let long_average_maturity_time = extract_u256_from_attr(ob, "longAverageMaturityTime", 8)?;
+        let shorts_outstanding = extract_u256_from_attr(ob, "shortsOutstanding", 9)?;
+        let short_average_maturity_time =
+            extract_u256_from_attr(ob, "shortAverageMaturityTime", 10)?;
         let withdrawal_shares_ready_to_withdraw =
-            extract_u256_from_attr(ob, "withdrawalSharesReadyToWithdraw")?;
-        let withdrawal_shares_proceeds = extract_u256_from_attr(ob, "withdrawalSharesProceeds")?;
-        let lp_share_price = extract_u256_from_attr(ob, "lpSharePrice")?;
-        let long_exposure = extract_u256_from_attr(ob, "longExposure")?;
+            extract_u256_from_attr(ob, "withdrawalSharesReadyToWithdraw", 11)?;
+        let withdrawal_shares_proceeds =
+            extract_u256_from_attr(ob, "withdrawalSharesProceeds", 12)?;
+        let lp_share_price = extract_u256_from_attr(ob, "lpSharePrice", 13)?;
+        let long_exposure = extract_u256_from_attr(ob, "longExposure", 14)?;
 
         let pool_info = PoolInfo {
             share_reserves,
@@ -52,3 +55,41 @@ impl FromPyObject<'_> for PyPoolInfo {
         Ok(PyPoolInfo::new(pool_info))
     }
 }
+
+// Helper function to overwrite a single PoolInfo field, named as in the solidity struct.
+pub fn update_pool_info_field(pool_info: &mut PoolInfo, name: &str, value: &PyAny) -> PyResult<()> {
+    let to_u256 = |value: &PyAny| {
+        u256_from_py(value)
+            .map_err(|e| PyErr::new::<PyValueError, _>(format!("Invalid U256 for {}: {}", name, e)))
+    };
+    match name {
+        "shareReserves" => pool_info.share_reserves = to_u256(value)?,
+        "shareAdjustment" => {
+            pool_info.share_adjustment = i256_from_py(value).map_err(|e| {
+                PyErr::new::<PyValueError, _>(format!("Invalid I256 for {}: {}", name, e))
+            })?
+        }
+        "zombieBaseProceeds" => pool_info.zombie_base_proceeds = to_u256(value)?,
+        "zombieShareReserves" => pool_info.zombie_share_reserves = to_u256(value)?,
+        "bondReserves" => pool_info.bond_reserves = to_u256(value)?,
+        "lpTotalSupply" => pool_info.lp_total_supply = to_u256(value)?,
+        "vaultSharePrice" => pool_info.vault_share_price = to_u256(value)?,
+        "longsOutstanding" => pool_info.longs_outstanding = to_u256(value)?,
+        "longAverageMaturityTime" => pool_info.long_average_maturity_time = to_u256(value)?,
+        "shortsOutstanding" => pool_info.shorts_outstanding = to_u256(value)?,
+        "shortAverageMaturityTime" => pool_info.short_average_maturity_time = to_u256(value)?,
+        "withdrawalSharesReadyToWithdraw" => {
+            pool_info.withdrawal_shares_ready_to_withdraw = to_u256(value)?
+        }
+        "withdrawalSharesProceeds" => pool_info.withdrawal_shares_proceeds = to_u256(value)?,
+        "lpSharePrice" => pool_info.lp_share_price = to_u256(value)?,
+        "longExposure" => pool_info.long_exposure = to_u256(value)?,
+        _ => {
+            return Err(PyErr::new::<PyValueError, _>(format!(
+                "Unknown PoolInfo field: {}",
+                name
+            )))
+        }
+    }
+    Ok(())
+}
@@ -0,0 +1,150 @@
+use ethers::core::types::{I256, U256};
+use eyre::{eyre, Result};
+use fixed_point::FixedPoint;
+use fixed_point_macros::fixed;
+use hyperdrive_math::State;
+
+use crate::quote::{quote_open_long, quote_open_short};
+
+// The trade sizes that can be swept by price_impact_curve. Long sizes are in
+// base and short sizes are in bonds.
+#[derive(Clone, Copy, PartialEq)]
+pub enum TradeSide {
+    Long,
+    Short,
+}
+
+impl TradeSide {
+    pub fn from_name(name: &str) -> Result<Self> {
+        match name {
+            "long" => Ok(TradeSide::Long),
+            "short" => Ok(TradeSide::Short),
+            _ => Err(eyre!("Unknown trade side: {}", name)),
+        }
+    }
+}
+
+// A point on the curve: the trade size, the trade output and the spot rate
+// after the trade.
+#[derive(Clone, Copy)]
+struct CurvePoint {
+    size: FixedPoint,
+    output: FixedPoint,
+    spot_rate_after: FixedPoint,
+}
+
+// An interval that has not been split yet, along with its evaluated midpoint
+// and how far the midpoint is from the chord between the endpoints.
+struct Candidate {
+    left: CurvePoint,
+    right: CurvePoint,
+    midpoint: CurvePoint,
+    error: FixedPoint,
+}
+
+fn evaluate(state: &State, side: TradeSide, size: FixedPoint) -> Result<CurvePoint> {
+    let quote = match side {
+        TradeSide::Long => quote_open_long(state, size)?,
+        TradeSide::Short => {
+            quote_open_short(state, size, FixedPoint::from(state.info.vault_share_price))?
+        }
+    };
+    Ok(CurvePoint {
+        size,
+        output: quote.amount,
+        spot_rate_after: quote.spot_rate_after,
+    })
+}
+
+fn max_trade_size(state: &State, side: TradeSide) -> FixedPoint {
+    let budget = FixedPoint::from(U256::MAX);
+    match side {
+        TradeSide::Long => state.calculate_max_long(budget, I256::zero(), None),
+        TradeSide::Short => state.calculate_max_short(
+            budget,
+            FixedPoint::from(state.info.vault_share_price),
+            I256::zero(),
+            None,
+            None,
+        ),
+    }
+}
+
+fn split(
+    state: &State,
+    side: TradeSide,
+    left: CurvePoint,
+    right: CurvePoint,
+) -> Result<Option<Candidate>> {
+    // Intervals that can't be split any further are left as they are.
+    if right.size - left.size < fixed!(2) {
+        return Ok(None);
+    }
+    let midpoint = evaluate(state, side, (left.size + right.size).div_down(fixed!(2e18)))?;
+    let chord = (left.spot_rate_after + right.spot_rate_after).div_down(fixed!(2e18));
+    let error = if midpoint.spot_rate_after >= chord {
+        midpoint.spot_rate_after - chord
+    } else {
+        chord - midpoint.spot_rate_after
+    };
+    Ok(Some(Candidate {
+        left,
+        right,
+        midpoint,
+        error,
+    }))
+}
+
+// Samples the spot rate after opening a trade between min_size and max_size.
+//
+// Sampling starts from the endpoints and repeatedly splits the interval whose
+// midpoint is furthest from the straight line between its endpoints, so points
+// concentrate where the curve bends the most. It stops once max_points have
+// been taken or every interval is within the tolerance. The sizes are clamped
+// to the pool's minimum transaction amount and to the max trade for the side.
+pub fn calculate_price_impact_curve(
+    state: &State,
+    side: TradeSide,
+    min_size: FixedPoint,
+    max_size: FixedPoint,
+    max_points: usize,
+    tolerance: FixedPoint,
+) -> Result<(Vec<FixedPoint>, Vec<FixedPoint>, Vec<FixedPoint>)> {
+    if max_points < 2 {
+        return Err(eyre!("max_points must be at least 2, got {}", max_points));
+    }
+    let max_size = max_size.min(max_trade_size(state, side));
+    let min_size = min_size
+        .max(FixedPoint::from(state.config.minimum_transaction_amount))
+        .min(max_size);
+
+    let mut points = vec![evaluate(state, side, min_size)?];
+    if max_size > min_size {
+        points.push(evaluate(state, side, max_size)?);
+    }
+    let mut candidates = Vec::new();
+    if points.len() == 2 {
+        candidates.extend(split(state, side, points[0], points[1])?);
+    }
+    while points.len() < max_points {
+        let next = match candidates
+            .iter()
+            .enumerate()
+            .max_by_key(|(_, candidate)| candidate.error)
+        {
+            Some((index, candidate)) if candidate.error > tolerance => index,
+            _ => break,
+        };
+        let candidate = candidates.swap_remove(next);
+        points.push(candidate.midpoint);
+        candidates.extend(split(state, side, candidate.left, candidate.midpoint)?);
+        candidates.extend(split(state, side, candidate.midpoint, candidate.right)?);
+    }
+
+    points.sort_by_key(|point| point.size);
+    Ok((
+        points.iter().map(|point| point.size).collect(),
+        points.iter().map(|point| point.output).collect(),
+        points.iter().map(|point| point.spot_rate_after).collect(),
+    ))
+}
@@ -0,0 +1,204 @@
+use ethers::core::types::U256;
+use eyre::Result;
+use fixed_point::FixedPoint;
+use fixed_point_macros::fixed;
+use hyperdrive_math::State;
+
+use crate::fees::{
+    calculate_fees_close_long, calculate_fees_close_short, calculate_fees_open_long,
+    calculate_fees_open_short,
+};
+use crate::trade_simulator::{apply_close_long, apply_close_short};
+
+const SECONDS_PER_YEAR: u64 = 60 * 60 * 24 * 365;
+
+// Everything needed to quote a trade, computed from a single pass over the curve.
+// The fees are (curve fee, flat fee, governance fee) in the units used in fees.rs.
+pub struct TradeQuote {
+    pub amount: FixedPoint,
+    pub fees: (FixedPoint, FixedPoint, FixedPoint),
+    pub spot_price_after: FixedPoint,
+    pub spot_rate_after: FixedPoint,
+    pub realized_rate: FixedPoint,
+    pub price_impact: FixedPoint,
+}
+
+impl TradeQuote {
+    pub fn to_u256_vec(&self) -> Vec<U256> {
+        vec![
+            U256::from(self.amount),
+            U256::from(self.fees.0),
+            U256::from(self.fees.1),
+            U256::from(self.fees.2),
+            U256::from(self.spot_price_after),
+            U256::from(self.spot_rate_after),
+            U256::from(self.realized_rate),
+            U256::from(self.price_impact),
+        ]
+    }
+}
+
+// The annualized rate earned by buying a bond at the given price and holding it
+// for the given number of seconds. Prices at or above one have no positive rate
+// and return zero.
+fn annualized_rate(price: FixedPoint, term: U256) -> FixedPoint {
+    if price == fixed!(0) || price >= fixed!(1e18) || term.is_zero() {
+        return fixed!(0);
+    }
+    let annualized_time =
+        FixedPoint::from(term).div_down(FixedPoint::from(U256::from(SECONDS_PER_YEAR)));
+    (fixed!(1e18) - price).div_down(price.mul_down(annualized_time))
+}
+
+// The relative change in the spot price caused by the trade.
+fn price_impact(spot_price_before: FixedPoint, spot_price_after: FixedPoint) -> FixedPoint {
+    if spot_price_before == fixed!(0) {
+        return fixed!(0);
+    }
+    let change = if spot_price_after >= spot_price_before {
+        spot_price_after - spot_price_before
+    } else {
+        spot_price_before - spot_price_after
+    };
+    change.div_down(spot_price_before)
+}
+
+fn time_until(maturity_time: U256, current_time: U256) -> U256 {
+    maturity_time.saturating_sub(current_time)
+}
+
+// Opening a long buys bonds with base. The bonds are computed once and reused
+// for the fees, the spot price and rate after the trade and the realized rate.
+pub fn quote_open_long(state: &State, base_amount: FixedPoint) -> Result<TradeQuote> {
+    let spot_price = state.calculate_spot_price();
+    let bond_amount = state.calculate_open_long(base_amount)?;
+    let spot_price_after = state.calculate_spot_price_after_long(base_amount, Some(bond_amount))?;
+    let realized_price = if bond_amount > fixed!(0) {
+        base_amount.div_down(bond_amount)
+    } else {
+        fixed!(0)
+    };
+    Ok(TradeQuote {
+        amount: bond_amount,
+        fees: calculate_fees_open_long(state, base_amount),
+        spot_price_after,
+        spot_rate_after: state.calculate_spot_rate_after_long(base_amount, Some(bond_amount))?,
+        realized_rate: annualized_rate(realized_price, state.config.position_duration),
+        price_impact: price_impact(spot_price, spot_price_after),
+    })
+}
+
+// Opening a short sells bonds and deposits the difference between the face
+// value and the sale proceeds. The realized rate is the rate implied by the
+// sale price, which ignores any variable interest prepaid in the deposit.
+pub fn quote_open_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    open_vault_share_price: FixedPoint,
+) -> Result<TradeQuote> {
+    let spot_price = state.calculate_spot_price();
+    let deposit = state.calculate_open_short(bond_amount, open_vault_share_price)?;
+    let spot_price_after = state.calculate_spot_price_after_short(bond_amount, Some(deposit))?;
+    let realized_price = if bond_amount > deposit {
+        (bond_amount - deposit).div_down(bond_amount)
+    } else {
+        fixed!(0)
+    };
+    Ok(TradeQuote {
+        amount: deposit,
+        fees: calculate_fees_open_short(state, bond_amount, spot_price),
+        spot_price_after,
+        spot_rate_after: state.calculate_spot_rate_after_short(bond_amount, Some(deposit))?,
+        realized_rate: annualized_rate(realized_price, state.config.position_duration),
+        price_impact: price_impact(spot_price, spot_price_after),
+    })
+}
+
+// Closing a long sells the bonds back to the pool. The realized rate is the
+// rate implied by the sale price over the time left until maturity. Matured
+// positions are redeemed at face value and do not move the spot price.
+pub fn quote_close_long(
+    state: &State,
+    bond_amount: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> Result<TradeQuote> {
+    let spot_price = state.calculate_spot_price();
+    let shares_out = state.calculate_close_long(bond_amount, maturity_time, current_time);
+    let fees = calculate_fees_close_long(state, bond_amount, maturity_time, current_time);
+    let state_after = if maturity_time > current_time {
+        State::new(
+            state.config.clone(),
+            apply_close_long(state, bond_amount, maturity_time, current_time)?,
+        )
+    } else {
+        state.clone()
+    };
+    let spot_price_after = state_after.calculate_spot_price();
+    let realized_price = if bond_amount > fixed!(0) {
+        shares_out
+            .mul_down(FixedPoint::from(state.info.vault_share_price))
+            .div_down(bond_amount)
+    } else {
+        fixed!(0)
+    };
+    Ok(TradeQuote {
+        amount: shares_out,
+        fees,
+        spot_price_after,
+        spot_rate_after: state_after.calculate_spot_rate(),
+        realized_rate: annualized_rate(realized_price, time_until(maturity_time, current_time)),
+        price_impact: price_impact(spot_price, spot_price_after),
+    })
+}
+
+// Closing a short buys the bonds back from the pool. The realized rate is the
+// rate implied by the buy back price, which is the growth in the share reserves
+// plus the governance fee that leaves the pool.
+pub fn quote_close_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    open_vault_share_price: FixedPoint,
+    close_vault_share_price: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> Result<TradeQuote> {
+    let spot_price = state.calculate_spot_price();
+    let shares_out = state.calculate_close_short(
+        bond_amount,
+        open_vault_share_price,
+        close_vault_share_price,
+        maturity_time,
+        current_time,
+    );
+    let fees = calculate_fees_close_short(state, bond_amount, maturity_time, current_time);
+    if maturity_time <= current_time {
+        return Ok(TradeQuote {
+            amount: shares_out,
+            fees,
+            spot_price_after: spot_price,
+            spot_rate_after: state.calculate_spot_rate(),
+            realized_rate: fixed!(0),
+            price_impact: fixed!(0),
+        });
+    }
+    let info = apply_close_short(state, bond_amount, maturity_time, current_time)?;
+    let shares_in = FixedPoint::from(info.share_reserves - state.info.share_reserves) + fees.2;
+    let state_after = State::new(state.config.clone(), info);
+    let spot_price_after = state_after.calculate_spot_price();
+    let realized_price = if bond_amount > fixed!(0) {
+        shares_in
+            .mul_down(FixedPoint::from(state.info.vault_share_price))
+            .div_down(bond_amount)
+    } else {
+        fixed!(0)
+    };
+    Ok(TradeQuote {
+        amount: shares_out,
+        fees,
+        spot_price_after,
+        spot_rate_after: state_after.calculate_spot_rate(),
+        realized_rate: annualized_rate(realized_price, time_until(maturity_time, current_time)),
+        price_impact: price_impact(spot_price, spot_price_after),
+    })
+}
@@ -0,0 +1,441 @@
+use ethers::core::types::{I256, U256};
+use hyperdrive_math::State;
+
+// An approximate, f64 version of the trade math for screening large numbers of
+// candidate trades. It follows the same YieldSpace formulas as the exact math,
+// but in double precision, so results carry a relative error of roughly 1e-15
+// times the pool's reserves divided by the trade size. Every trade larger than a
+// millionth of the reserves is within 1e-9 of the exact result. Candidates near
+// a feasibility boundary should be confirmed with the exact math.
+//
+// Amounts are in the same 18 decimal fixed point units as the exact math, but as
+// floats. Trades that the exact math would reject come back as NaN.
+
+const ONE: f64 = 1e18;
+const SECONDS_PER_YEAR: f64 = 60.0 * 60.0 * 24.0 * 365.0;
+
+pub fn u256_to_f64(value: U256) -> f64 {
+    value.0.iter().rev().fold(0.0, |total, limb| {
+        total * 18446744073709551616.0 + *limb as f64
+    })
+}
+
+pub fn i256_to_f64(value: I256) -> f64 {
+    if value.is_negative() {
+        -u256_to_f64(value.unsigned_abs())
+    } else {
+        u256_to_f64(value.into_raw())
+    }
+}
+
+// Fixed point values are converted to real numbers so that the powers are taken
+// of the same values as in the exact math.
+fn real(value: U256) -> f64 {
+    u256_to_f64(value) / ONE
+}
+
+pub struct ScreeningState {
+    share_reserves: f64,
+    effective_share_reserves: f64,
+    bond_reserves: f64,
+    vault_share_price: f64,
+    initial_vault_share_price: f64,
+    time_stretch: f64,
+    k: f64,
+    spot_price: f64,
+    // Taken from the exact math since it only depends on the pool.
+    max_spot_price: f64,
+    curve_fee: f64,
+    flat_fee: f64,
+    governance_lp_fee: f64,
+    minimum_share_reserves: f64,
+    minimum_transaction_amount: f64,
+    long_exposure: f64,
+    position_duration: f64,
+}
+
+impl ScreeningState {
+    pub fn new(state: &State) -> Self {
+        let share_reserves = real(state.info.share_reserves);
+        let effective_share_reserves =
+            share_reserves - i256_to_f64(state.info.share_adjustment) / ONE;
+        let bond_reserves = real(state.info.bond_reserves);
+        let vault_share_price = real(state.info.vault_share_price);
+        let initial_vault_share_price = real(state.config.initial_vault_share_price);
+        let time_stretch = real(state.config.time_stretch);
+        let mut screening_state = ScreeningState {
+            share_reserves,
+            effective_share_reserves,
+            bond_reserves,
+            vault_share_price,
+            initial_vault_share_price,
+            time_stretch,
+            k: 0.0,
+            spot_price: 0.0,
+            max_spot_price: real(U256::from(state.calculate_max_spot_price())),
+            curve_fee: real(state.config.fees.curve),
+            flat_fee: real(state.config.fees.flat),
+            governance_lp_fee: real(state.config.fees.governance_lp),
+            minimum_share_reserves: real(state.config.minimum_share_reserves),
+            minimum_transaction_amount: real(state.config.minimum_transaction_amount),
+            long_exposure: real(state.info.long_exposure),
+            position_duration: u256_to_f64(state.config.position_duration),
+        };
+        screening_state.k = screening_state.calculate_k(effective_share_reserves, bond_reserves);
+        screening_state.spot_price =
+            screening_state.spot_price_at(effective_share_reserves, bond_reserves);
+        screening_state
+    }
+
+    fn calculate_k(&self, effective_share_reserves: f64, bond_reserves: f64) -> f64 {
+        let exponent = 1.0 - self.time_stretch;
+        (self.vault_share_price / self.initial_vault_share_price)
+            * (self.initial_vault_share_price * effective_share_reserves).powf(exponent)
+            + bond_reserves.powf(exponent)
+    }
+
+    fn spot_price_at(&self, effective_share_reserves: f64, bond_reserves: f64) -> f64 {
+        (self.initial_vault_share_price * effective_share_reserves / bond_reserves)
+            .powf(self.time_stretch)
+    }
+
+    fn spot_rate_from_price(&self, spot_price: f64) -> f64 {
+        (1.0 - spot_price) / (spot_price * self.position_duration / SECONDS_PER_YEAR)
+    }
+
+    // The effective share reserves that put the given bond reserves on the curve.
+    fn effective_share_reserves_given_bonds(&self, bond_reserves: f64) -> Option<f64> {
+        let exponent = 1.0 - self.time_stretch;
+        let inner = (self.k - bond_reserves.powf(exponent)) * self.initial_vault_share_price
+            / self.vault_share_price;
+        if inner < 0.0 {
+            return None;
+        }
+        Some(inner.powf(1.0 / exponent) / self.initial_vault_share_price)
+    }
+
+    fn bonds_out_given_shares_in(&self, shares_in: f64) -> Option<f64> {
+        let exponent = 1.0 - self.time_stretch;
+        let inner = self.k
+            - (self.vault_share_price / self.initial_vault_share_price)
+                * (self.initial_vault_share_price * (self.effective_share_reserves + shares_in))
+                    .powf(exponent);
+        if inner < 0.0 {
+            return None;
+        }
+        Some(self.bond_reserves - inner.powf(1.0 / exponent))
+    }
+
+    fn shares_out_given_bonds_in(&self, bonds_in: f64) -> Option<f64> {
+        let effective_share_reserves =
+            self.effective_share_reserves_given_bonds(self.bond_reserves + bonds_in)?;
+        Some(self.effective_share_reserves - effective_share_reserves)
+    }
+
+    fn shares_in_given_bonds_out(&self, bonds_out: f64) -> Option<f64> {
+        if bonds_out > self.bond_reserves {
+            return None;
+        }
+        let effective_share_reserves =
+            self.effective_share_reserves_given_bonds(self.bond_reserves - bonds_out)?;
+        Some(effective_share_reserves - self.effective_share_reserves)
+    }
+
+    fn normalized_time_remaining(&self, maturity_time: f64, current_time: f64) -> f64 {
+        if maturity_time <= current_time {
+            return 0.0;
+        }
+        ((maturity_time - current_time) / self.position_duration).min(1.0)
+    }
+
+    // The net long exposure after the checkpoint's exposure changes by the
+    // given number of bonds, as in solver.rs.
+    fn long_exposure_after(&self, checkpoint_exposure: f64, bond_delta: f64) -> f64 {
+        let before = checkpoint_exposure.max(0.0);
+        let after = (checkpoint_exposure + bond_delta).max(0.0);
+        (self.long_exposure + after - before).max(0.0)
+    }
+
+    fn is_solvent(&self, share_reserves: f64, long_exposure: f64) -> bool {
+        share_reserves * self.vault_share_price
+            >= long_exposure + self.minimum_share_reserves * self.vault_share_price
+    }
+
+    // Returns the bonds purchased and the effective share reserves and bond
+    // reserves after the trade.
+    fn open_long(&self, base_amount: f64) -> Option<(f64, f64, f64)> {
+        if !(base_amount >= self.minimum_transaction_amount) {
+            return None;
+        }
+        let shares_in = base_amount / self.vault_share_price;
+        let curve_fee = self.curve_fee * (1.0 / self.spot_price - 1.0) * base_amount;
+        let bond_amount = self.bonds_out_given_shares_in(shares_in)? - curve_fee;
+        if bond_amount < base_amount {
+            return None;
+        }
+        let governance_fee =
+            curve_fee * self.spot_price * self.governance_lp_fee / self.vault_share_price;
+        Some((
+            bond_amount,
+            self.effective_share_reserves + shares_in - governance_fee,
+            self.bond_reserves - bond_amount,
+        ))
+    }
+
+    // Returns the trader's deposit in base and the share reserves after the trade.
+    fn open_short(&self, bond_amount: f64, open_vault_share_price: f64) -> Option<(f64, f64)> {
+        if !(bond_amount >= self.minimum_transaction_amount) {
+            return None;
+        }
+        let principal = self.shares_out_given_bonds_in(bond_amount)?;
+        if principal * self.vault_share_price > bond_amount {
+            return None;
+        }
+        let open_vault_share_price = if open_vault_share_price == 0.0 {
+            self.vault_share_price
+        } else {
+            open_vault_share_price
+        };
+        let curve_fee =
+            self.curve_fee * (1.0 - self.spot_price) * bond_amount / self.vault_share_price;
+        let governance_fee = curve_fee * self.governance_lp_fee;
+        let deposit = bond_amount * self.vault_share_price / open_vault_share_price
+            + bond_amount * self.flat_fee
+            - self.vault_share_price * (principal - curve_fee);
+        Some((
+            deposit.max(0.0),
+            self.share_reserves - principal + curve_fee - governance_fee,
+        ))
+    }
+
+    fn close_long(&self, bond_amount: f64, maturity_time: f64, current_time: f64) -> Option<f64> {
+        let time_remaining = self.normalized_time_remaining(maturity_time, current_time);
+        let curve_bonds = bond_amount * time_remaining;
+        let flat_bonds = bond_amount - curve_bonds;
+        let curve_shares = if curve_bonds > 0.0 {
+            self.shares_out_given_bonds_in(curve_bonds)?
+        } else {
+            0.0
+        };
+        let curve_fee =
+            self.curve_fee * (1.0 - self.spot_price) * curve_bonds / self.vault_share_price;
+        let flat_fee = flat_bonds * self.flat_fee / self.vault_share_price;
+        Some((flat_bonds / self.vault_share_price + curve_shares - curve_fee - flat_fee).max(0.0))
+    }
+
+    fn close_short(
+        &self,
+        bond_amount: f64,
+        open_vault_share_price: f64,
+        close_vault_share_price: f64,
+        maturity_time: f64,
+        current_time: f64,
+    ) -> Option<f64> {
+        let time_remaining = self.normalized_time_remaining(maturity_time, current_time);
+        let curve_bonds = bond_amount * time_remaining;
+        let flat_bonds = bond_amount - curve_bonds;
+        let curve_shares = if curve_bonds > 0.0 {
+            self.shares_in_given_bonds_out(curve_bonds)?
+        } else {
+            0.0
+        };
+        let curve_fee =
+            self.curve_fee * (1.0 - self.spot_price) * curve_bonds / self.vault_share_price;
+        let flat_fee = flat_bonds * self.flat_fee / self.vault_share_price;
+        let shares_in = flat_bonds / self.vault_share_price + curve_shares + curve_fee + flat_fee;
+        let bond_factor = bond_amount * close_vault_share_price
+            / (open_vault_share_price * self.vault_share_price)
+            + bond_amount * self.flat_fee / self.vault_share_price;
+        Some((bond_factor - shares_in).max(0.0))
+    }
+
+    // Finds the largest feasible amount in [lower, upper] by bisection. Unlike
+    // the exact solver, this always runs to the precision of an f64.
+    fn solve_max(lower: f64, upper: f64, is_feasible: impl Fn(f64) -> bool) -> f64 {
+        if !(upper >= lower) || !is_feasible(lower) {
+            return 0.0;
+        }
+        if is_feasible(upper) {
+            return upper;
+        }
+        let (mut lo, mut hi) = (lower, upper);
+        while hi - lo > lo * 1e-12 {
+            let mid = lo + (hi - lo) / 2.0;
+            if mid <= lo || mid >= hi {
+                break;
+            }
+            if is_feasible(mid) {
+                lo = mid;
+            } else {
+                hi = mid;
+            }
+        }
+        lo
+    }
+
+    fn max_long(&self, budget: f64, checkpoint_exposure: f64) -> f64 {
+        // A long can buy at most every bond in the pool.
+        let capacity = match self.effective_share_reserves_given_bonds(0.0) {
+            Some(effective_share_reserves) => {
+                (effective_share_reserves - self.effective_share_reserves) * self.vault_share_price
+            }
+            None => 0.0,
+        };
+        Self::solve_max(
+            self.minimum_transaction_amount,
+            budget.min(capacity),
+            |base_amount| match self.open_long(base_amount) {
+                Some((bond_amount, effective_share_reserves, bond_reserves)) => {
+                    let share_reserves = self.share_reserves + effective_share_reserves
+                        - self.effective_share_reserves;
+                    self.spot_price_at(effective_share_reserves, bond_reserves)
+                        <= self.max_spot_price
+                        && self.is_solvent(
+                            share_reserves,
+                            self.long_exposure_after(checkpoint_exposure, bond_amount),
+                        )
+                }
+                None => false,
+            },
+        )
+    }
+
+    fn max_short(&self, budget: f64, open_vault_share_price: f64, checkpoint_exposure: f64) -> f64 {
+        // A short can sell at most the bonds that empty the share reserves.
+        let capacity = (self.k.powf(1.0 / (1.0 - self.time_stretch)) - self.bond_reserves).max(0.0);
+        Self::solve_max(
+            self.minimum_transaction_amount,
+            capacity,
+            |bond_amount| match self.open_short(bond_amount, open_vault_share_price) {
+                Some((deposit, share_reserves)) => {
+                    deposit <= budget
+                        && self.is_solvent(
+                            share_reserves,
+                            self.long_exposure_after(checkpoint_exposure, -bond_amount),
+                        )
+                }
+                None => false,
+            },
+        )
+    }
+}
+
+// The screening functions take and return amounts in 18 decimal fixed point
+// units and return NaN for rejected trades.
+
+fn scaled(value: Option<f64>) -> f64 {
+    value.map_or(f64::NAN, |value| value * ONE)
+}
+
+pub fn screen_open_long(state: &ScreeningState, base_amounts: &[f64]) -> Vec<f64> {
+    base_amounts
+        .iter()
+        .map(|base_amount| {
+            scaled(
+                state
+                    .open_long(base_amount / ONE)
+                    .map(|(bonds, _, _)| bonds),
+            )
+        })
+        .collect()
+}
+
+pub fn screen_open_short(
+    state: &ScreeningState,
+    bond_amounts: &[f64],
+    open_vault_share_price: f64,
+) -> Vec<f64> {
+    bond_amounts
+        .iter()
+        .map(|bond_amount| {
+            scaled(
+                state
+                    .open_short(bond_amount / ONE, open_vault_share_price / ONE)
+                    .map(|(deposit, _)| deposit),
+            )
+        })
+        .collect()
+}
+
+pub fn screen_close_long(
+    state: &ScreeningState,
+    bond_amounts: &[f64],
+    maturity_time: f64,
+    current_time: f64,
+) -> Vec<f64> {
+    bond_amounts
+        .iter()
+        .map(|bond_amount| scaled(state.close_long(bond_amount / ONE, maturity_time, current_time)))
+        .collect()
+}
+
+pub fn screen_close_short(
+    state: &ScreeningState,
+    bond_amounts: &[f64],
+    open_vault_share_price: f64,
+    close_vault_share_price: f64,
+    maturity_time: f64,
+    current_time: f64,
+) -> Vec<f64> {
+    bond_amounts
+        .iter()
+        .map(|bond_amount| {
+            scaled(state.close_short(
+                bond_amount / ONE,
+                open_vault_share_price / ONE,
+                close_vault_share_price / ONE,
+                maturity_time,
+                current_time,
+            ))
+        })
+        .collect()
+}
+
+// Returns the spot price and the spot rate after opening each long.
+pub fn screen_spot_after_long(
+    state: &ScreeningState,
+    base_amounts: &[f64],
+) -> (Vec<f64>, Vec<f64>) {
+    base_amounts
+        .iter()
+        .map(|base_amount| match state.open_long(base_amount / ONE) {
+            Some((_, effective_share_reserves, bond_reserves)) => {
+                let spot_price = state.spot_price_at(effective_share_reserves, bond_reserves);
+                (
+                    spot_price * ONE,
+                    state.spot_rate_from_price(spot_price) * ONE,
+                )
+            }
+            None => (f64::NAN, f64::NAN),
+        })
+        .unzip()
+}
+
+pub fn screen_max_long(
+    state: &ScreeningState,
+    budgets: &[f64],
+    checkpoint_exposure: f64,
+) -> Vec<f64> {
+    budgets
+        .iter()
+        .map(|budget| state.max_long(budget / ONE, checkpoint_exposure / ONE) * ONE)
+        .collect()
+}
+
+pub fn screen_max_short(
+    state: &ScreeningState,
+    budgets: &[f64],
+    open_vault_share_price: f64,
+    checkpoint_exposure: f64,
+) -> Vec<f64> {
+    budgets
+        .iter()
+        .map(|budget| {
+            state.max_short(
+                budget / ONE,
+                open_vault_share_price / ONE,
+                checkpoint_exposure / ONE,
+            ) * ONE
+        })
+        .collect()
+}
@@ -0,0 +1,44 @@
+use ethers::core::abi::{AbiDecode, AbiEncode};
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use hyperdrive_math::State;
+use hyperdrive_wrappers::wrappers::ihyperdrive::{PoolConfig, PoolInfo};
+
+// A state is encoded as the ABI encoding of its pool config followed by the
+// ABI encoding of its pool info. Both structs only hold static types, so every
+// field, including each of the fees, takes exactly one 32-byte big-endian word
+// and the encoding has a fixed width.
+
+fn pool_config_size() -> usize {
+    PoolConfig::default().encode().len()
+}
+
+fn pool_info_size() -> usize {
+    PoolInfo::default().encode().len()
+}
+
+pub fn encode_state(state: &State) -> Vec<u8> {
+    let mut data = state.config.clone().encode();
+    data.extend(state.info.clone().encode());
+    data
+}
+
+pub fn decode_state(data: &[u8]) -> PyResult<State> {
+    let config_size = pool_config_size();
+    let expected_size = config_size + pool_info_size();
+    if data.len() != expected_size {
+        return Err(PyErr::new::<PyValueError, _>(format!(
+            "Expected {} bytes for an encoded HyperdriveState, got {}",
+            expected_size,
+            data.len()
+        )));
+    }
+    let pool_config = PoolConfig::decode(&data[..config_size]).map_err(|err| {
+        PyErr::new::<PyValueError, _>(format!("Failed to decode the pool config: {}", err))
+    })?;
+    let pool_info = PoolInfo::decode(&data[config_size..]).map_err(|err| {
+        PyErr::new::<PyValueError, _>(format!("Failed to decode the pool info: {}", err))
+    })?;
+    Ok(State::new(pool_config, pool_info))
+}
@@ -0,0 +1,409 @@
+use std::time::Instant;
+
+use ethers::core::types::{I256, U256};
+use eyre::Result;
+use fixed_point::FixedPoint;
+use fixed_point_macros::fixed;
+use hyperdrive_math::State;
+use hyperdrive_wrappers::wrappers::ihyperdrive::PoolInfo;
+
+use crate::errors::catch_math_panic;
+use crate::solver_cache::{cached_max_long, cached_max_short};
+use crate::trade_simulator::{apply_open_long_with_proceeds, apply_validated_open_short};
+
+// Solvers for the largest long or short that a pool can take. Unlike the
+// solvers in hyperdrive-math, they can be started from a previous solution.
+// Between blocks the answer barely moves, so a narrow bracket around the last
+// solution needs far fewer iterations than a search over the whole range.
+// Without a previous solution, the search starts from the hyperdrive-math
+// solution instead.
+//
+// A trade size is feasible if calculate_open_long or calculate_open_short
+// accepts it, it fits in the budget, a long keeps the spot price at or below
+// the max spot price, and calculate_solvency accepts the pool after the trade.
+// Trades are applied as if opened at the caller's current time, which sets the
+// checkpoint they mature from.
+// Feasibility is monotone in the trade size, so the solvers bisect a bracket
+// whose lower end is feasible and whose upper end is not.
+//
+// Since the lower end of the bracket is always feasible, a solve that runs out
+// of evaluations or time can stop at any point and return it as a safe, if
+// slightly small, answer.
+
+pub const DEFAULT_MAX_ITERATIONS: usize = 128;
+
+// The bracket is refined until it is narrower than 1e-9 of the solution.
+fn relative_tolerance() -> FixedPoint {
+    fixed!(1e9)
+}
+
+// The initial width of a bracket around a starting point, relative to it.
+fn warm_start_width() -> FixedPoint {
+    fixed!(1e15)
+}
+
+#[derive(Clone, Copy)]
+pub struct MaxTradeSolution {
+    pub amount: FixedPoint,
+    // The number of times the feasibility of a trade size was checked.
+    pub iterations: usize,
+    // False if the solve ran out of iterations or time before the bracket was
+    // narrow enough.
+    pub converged: bool,
+}
+
+// Bounds the work a solve can do. The limits are checked before every step of
+// the search, so a solve overruns its deadline by at most a few evaluations.
+#[derive(Clone, Copy)]
+pub struct SolveLimits {
+    pub max_iterations: usize,
+    pub deadline: Option<Instant>,
+}
+
+impl SolveLimits {
+    pub fn iterations(max_iterations: usize) -> Self {
+        SolveLimits {
+            max_iterations,
+            deadline: None,
+        }
+    }
+}
+
+struct Search<F> {
+    is_feasible: F,
+    iterations: usize,
+    limits: SolveLimits,
+}
+
+impl<F: FnMut(FixedPoint) -> bool> Search<F> {
+    fn is_exhausted(&self) -> bool {
+        self.iterations >= self.limits.max_iterations
+            || self
+                .limits
+                .deadline
+                .map_or(false, |deadline| Instant::now() >= deadline)
+    }
+
+    fn check(&mut self, amount: FixedPoint) -> bool {
+        self.iterations += 1;
+        (self.is_feasible)(amount)
+    }
+
+    fn solution(&self, amount: FixedPoint, converged: bool) -> MaxTradeSolution {
+        MaxTradeSolution {
+            amount,
+            iterations: self.iterations,
+            converged,
+        }
+    }
+}
+
+// Adds without overflowing, since the brackets of a short aren't bounded.
+fn saturating_add(a: FixedPoint, b: FixedPoint) -> FixedPoint {
+    FixedPoint::from(U256::from(a).saturating_add(U256::from(b)))
+}
+
+// Finds the largest feasible amount in [lower, upper], starting from the guess.
+// Without a guess, the cold start is called for one. A cold start that is
+// feasible is returned as it is, so that a solve without a previous solution
+// gives the hyperdrive-math answer.
+fn solve_max(
+    lower: FixedPoint,
+    upper: FixedPoint,
+    guess: Option<FixedPoint>,
+    cold_start: impl FnOnce() -> FixedPoint,
+    limits: SolveLimits,
+    is_feasible: impl FnMut(FixedPoint) -> bool,
+) -> MaxTradeSolution {
+    let mut search = Search {
+        is_feasible,
+        iterations: 0,
+        limits,
+    };
+    if upper < lower || !search.check(lower) {
+        return search.solution(fixed!(0), true);
+    }
+    if search.is_exhausted() {
+        return search.solution(lower, false);
+    }
+    let is_cold = guess.is_none();
+    let guess = guess.unwrap_or_else(cold_start).max(lower).min(upper);
+
+    // Build a bracket whose lower end is feasible and whose upper end is not
+    // by walking outwards from the guess with a doubling step.
+    let mut step = guess.mul_down(warm_start_width()).max(fixed!(1));
+    let (mut lo, mut hi) = if search.check(guess) {
+        if is_cold {
+            return search.solution(guess, true);
+        }
+        let mut lo = guess;
+        loop {
+            if lo == upper {
+                return search.solution(upper, true);
+            }
+            if search.is_exhausted() {
+                return search.solution(lo, false);
+            }
+            let hi = if upper - lo > step { lo + step } else { upper };
+            if !search.check(hi) {
+                break (lo, hi);
+            }
+            lo = hi;
+            step = saturating_add(step, step);
+        }
+    } else {
+        let mut hi = guess;
+        loop {
+            let lo = if hi - lower > step { hi - step } else { lower };
+            if lo == lower {
+                break (lower, hi);
+            }
+            if search.is_exhausted() {
+                return search.solution(lower, false);
+            }
+            if search.check(lo) {
+                break (lo, hi);
+            }
+            hi = lo;
+            step = saturating_add(step, step);
+        }
+    };
+
+    while hi - lo > lo.mul_down(relative_tolerance()).max(fixed!(1)) {
+        if search.is_exhausted() {
+            return search.solution(lo, false);
+        }
+        let mid = lo + (hi - lo).div_down(fixed!(2e18));
+        if search.check(mid) {
+            lo = mid;
+        } else {
+            hi = mid;
+        }
+    }
+    search.solution(lo, true)
+}
+
+// The pool's long exposure after the checkpoint's net exposure changes by the
+// given number of bonds. Only net longs in a checkpoint count as exposure.
+fn long_exposure_after(state: &State, checkpoint_exposure: I256, bond_delta: I256) -> U256 {
+    let before = checkpoint_exposure.max(I256::zero());
+    let after = (checkpoint_exposure + bond_delta).max(I256::zero());
+    let long_exposure = I256::from_raw(state.info.long_exposure) + after - before;
+    long_exposure.max(I256::zero()).into_raw()
+}
+
+// The pool's solvency after a trade, in shares. calculate_solvency panics if
+// the share reserves can't cover the long exposure and the minimum share
+// reserves, which is returned as an error.
+fn solvency_after(state: &State, mut info: PoolInfo, long_exposure: U256) -> Result<FixedPoint> {
+    info.long_exposure = long_exposure;
+    let state_after = State::new(state.config.clone(), info);
+    catch_math_panic(|| state_after.calculate_solvency())
+}
+
+fn is_solvent_after(state: &State, info: PoolInfo, long_exposure: U256) -> bool {
+    solvency_after(state, info, long_exposure).is_ok()
+}
+
+fn is_long_feasible(
+    state: &State,
+    max_spot_price: FixedPoint,
+    checkpoint_exposure: I256,
+    current_time: U256,
+    base_amount: FixedPoint,
+) -> bool {
+    let is_feasible = catch_math_panic(|| {
+        let bond_amount = match state.calculate_open_long(base_amount) {
+            Ok(bond_amount) => bond_amount,
+            Err(_) => return false,
+        };
+        match state.calculate_spot_price_after_long(base_amount, Some(bond_amount)) {
+            Ok(spot_price) if spot_price <= max_spot_price => (),
+            _ => return false,
+        };
+        let info =
+            match apply_open_long_with_proceeds(state, base_amount, bond_amount, current_time) {
+                Ok(info) => info,
+                Err(_) => return false,
+            };
+        let long_exposure = long_exposure_after(
+            state,
+            checkpoint_exposure,
+            I256::from_raw(U256::from(bond_amount)),
+        );
+        is_solvent_after(state, info, long_exposure)
+    });
+    is_feasible.unwrap_or(false)
+}
+
+fn is_short_feasible(
+    state: &State,
+    budget: FixedPoint,
+    open_vault_share_price: FixedPoint,
+    checkpoint_exposure: I256,
+    current_time: U256,
+    bond_amount: FixedPoint,
+) -> bool {
+    let is_feasible = catch_math_panic(|| {
+        match state.calculate_open_short(bond_amount, open_vault_share_price) {
+            Ok(deposit) if deposit <= budget => (),
+            _ => return false,
+        };
+        let info = match apply_validated_open_short(state, bond_amount, current_time) {
+            Ok(info) => info,
+            Err(_) => return false,
+        };
+        let long_exposure = long_exposure_after(
+            state,
+            checkpoint_exposure,
+            -I256::from_raw(U256::from(bond_amount)),
+        );
+        is_solvent_after(state, info, long_exposure)
+    });
+    is_feasible.unwrap_or(false)
+}
+
+// The residual of a max trade is how far it is from the constraint that limits
+// it, in base: the smaller of the budget left over and the solvency left after
+// the trade. Whichever constraint binds is close to zero at the max trade, and
+// the other one is not. The solvency only depends on the reserves and the long
+// exposure, not on when the trade matures, so trades are applied as if opened
+// at time zero. Trade sizes that aren't feasible have a residual of U256::MAX.
+fn max_trade_residual(
+    state: &State,
+    budget: FixedPoint,
+    cost: FixedPoint,
+    solvency: Result<FixedPoint>,
+) -> FixedPoint {
+    match solvency {
+        Ok(solvency) if cost <= budget => {
+            let solvency = solvency.mul_down(FixedPoint::from(state.info.vault_share_price));
+            (budget - cost).min(solvency)
+        }
+        _ => FixedPoint::from(U256::MAX),
+    }
+}
+
+pub fn max_long_residual(
+    state: &State,
+    budget: FixedPoint,
+    checkpoint_exposure: I256,
+    base_amount: FixedPoint,
+) -> FixedPoint {
+    if base_amount == fixed!(0) {
+        return max_trade_residual(state, budget, fixed!(0), state_solvency(state));
+    }
+    catch_math_panic(|| -> Result<FixedPoint> {
+        let bond_amount = state.calculate_open_long(base_amount)?;
+        let info = apply_open_long_with_proceeds(state, base_amount, bond_amount, U256::zero())?;
+        let long_exposure = long_exposure_after(
+            state,
+            checkpoint_exposure,
+            I256::from_raw(U256::from(bond_amount)),
+        );
+        let solvency = solvency_after(state, info, long_exposure);
+        Ok(max_trade_residual(state, budget, base_amount, solvency))
+    })
+    .and_then(|residual| residual)
+    .unwrap_or(FixedPoint::from(U256::MAX))
+}
+
+pub fn max_short_residual(
+    state: &State,
+    budget: FixedPoint,
+    open_vault_share_price: FixedPoint,
+    checkpoint_exposure: I256,
+    bond_amount: FixedPoint,
+) -> FixedPoint {
+    if bond_amount == fixed!(0) {
+        return max_trade_residual(state, budget, fixed!(0), state_solvency(state));
+    }
+    catch_math_panic(|| -> Result<FixedPoint> {
+        let deposit = state.calculate_open_short(bond_amount, open_vault_share_price)?;
+        let info = apply_validated_open_short(state, bond_amount, U256::zero())?;
+        let long_exposure = long_exposure_after(
+            state,
+            checkpoint_exposure,
+            -I256::from_raw(U256::from(bond_amount)),
+        );
+        let solvency = solvency_after(state, info, long_exposure);
+        Ok(max_trade_residual(state, budget, deposit, solvency))
+    })
+    .and_then(|residual| residual)
+    .unwrap_or(FixedPoint::from(U256::MAX))
+}
+
+// The pool's solvency before any trade, in shares.
+fn state_solvency(state: &State) -> Result<FixedPoint> {
+    catch_math_panic(|| state.calculate_solvency())
+}
+
+// Solves for the max long in base, optionally starting from a guess such as
+// the previous block's max long.
+pub fn solve_max_long(
+    state: &State,
+    budget: FixedPoint,
+    checkpoint_exposure: I256,
+    current_time: U256,
+    guess: Option<FixedPoint>,
+    limits: SolveLimits,
+) -> MaxTradeSolution {
+    let max_spot_price = state.calculate_max_spot_price();
+    solve_max(
+        FixedPoint::from(state.config.minimum_transaction_amount),
+        budget,
+        guess,
+        || cached_max_long(state, budget, checkpoint_exposure, None),
+        limits,
+        |base_amount| {
+            is_long_feasible(
+                state,
+                max_spot_price,
+                checkpoint_exposure,
+                current_time,
+                base_amount,
+            )
+        },
+    )
+}
+
+// Solves for the max short in bonds, optionally starting from a guess such as
+// the previous block's max short. The conservative price is only used by the
+// cold start.
+pub fn solve_max_short(
+    state: &State,
+    budget: FixedPoint,
+    open_vault_share_price: FixedPoint,
+    checkpoint_exposure: I256,
+    current_time: U256,
+    guess: Option<FixedPoint>,
+    conservative_price: Option<FixedPoint>,
+    limits: SolveLimits,
+) -> MaxTradeSolution {
+    solve_max(
+        FixedPoint::from(state.config.minimum_transaction_amount),
+        FixedPoint::from(U256::MAX),
+        guess,
+        || {
+            cached_max_short(
+                state,
+                budget,
+                open_vault_share_price,
+                checkpoint_exposure,
+                conservative_price,
+                None,
+            )
+        },
+        limits,
+        |bond_amount| {
+            is_short_feasible(
+                state,
+                budget,
+                open_vault_share_price,
+                checkpoint_exposure,
+                current_time,
+                bond_amount,
+            )
+        },
+    )
+}
@@ -0,0 +1,239 @@
+use std::collections::{BTreeMap, HashMap};
+use std::sync::Mutex;
+
+use ethers::core::types::{I256, U256};
+use eyre::Result;
+use fixed_point::FixedPoint;
+use hyperdrive_math::State;
+
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+
+use crate::serialization::encode_state;
+
+// An opt-in, process wide LRU cache for the results of the iterative solvers.
+// Strategies that run in the same process often solve the same pool with the
+// same arguments within a block, so repeated solves become lookups.
+//
+// Entries are keyed on the encoded pool state together with the solver and its
+// arguments. The key holds every pool config and pool info word, including
+// the ones the solvers don't read, so a hit is always for the same state and a
+// hash collision can't return another pool's result. Any config fields that
+// later versions of the contracts add, such as the circuit breaker delta, are
+// covered as well. The cache is disabled until it is given a size.
+
+#[derive(Clone, Copy, PartialEq, Eq, Hash)]
+pub enum SolverKind {
+    MaxLong,
+    MaxShort,
+    TargetedLong,
+}
+
+#[derive(Clone, PartialEq, Eq, Hash)]
+struct CacheKey {
+    state: Vec<u8>,
+    kind: SolverKind,
+    args: Vec<U256>,
+}
+
+struct SolverCache {
+    max_size: usize,
+    // Each entry stores its result and the tick it was last used at.
+    entries: HashMap<CacheKey, (FixedPoint, u64)>,
+    // The keys ordered from least to most recently used.
+    recency: BTreeMap<u64, CacheKey>,
+    tick: u64,
+    hits: u64,
+    misses: u64,
+}
+
+impl SolverCache {
+    fn new(max_size: usize) -> Self {
+        SolverCache {
+            max_size,
+            entries: HashMap::new(),
+            recency: BTreeMap::new(),
+            tick: 0,
+            hits: 0,
+            misses: 0,
+        }
+    }
+
+    fn get(&mut self, key: &CacheKey) -> Option<FixedPoint> {
+        self.tick += 1;
+        match self.entries.get_mut(key) {
+            Some((value, last_used)) => {
+                self.recency.remove(last_used);
+                *last_used = self.tick;
+                self.recency.insert(self.tick, key.clone());
+                self.hits += 1;
+                Some(*value)
+            }
+            None => {
+                self.misses += 1;
+                None
+            }
+        }
+    }
+
+    fn insert(&mut self, key: CacheKey, value: FixedPoint) {
+        self.tick += 1;
+        if let Some((_, last_used)) = self.entries.insert(key.clone(), (value, self.tick)) {
+            self.recency.remove(&last_used);
+        }
+        self.recency.insert(self.tick, key);
+        self.evict();
+    }
+
+    fn evict(&mut self) {
+        while self.entries.len() > self.max_size {
+            match self.recency.pop_first() {
+                Some((_, key)) => {
+                    self.entries.remove(&key);
+                }
+                None => break,
+            }
+        }
+    }
+}
+
+// None while the cache is disabled.
+static SOLVER_CACHE: Mutex<Option<SolverCache>> = Mutex::new(None);
+
+fn lock_cache() -> std::sync::MutexGuard<'static, Option<SolverCache>> {
+    // A panic while the lock is held can't leave the cache half updated in a
+    // way that matters, so a poisoned lock is recovered.
+    SOLVER_CACHE
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
+}
+
+// Helpers to encode solver arguments as cache key words.
+pub fn i256_key(value: I256) -> U256 {
+    value.into_raw()
+}
+
+pub fn optional_key<T: Into<U256>>(value: Option<T>) -> [U256; 2] {
+    match value {
+        Some(value) => [U256::one(), value.into()],
+        None => [U256::zero(), U256::zero()],
+    }
+}
+
+// Returns the cached result for the solver and arguments, or runs the solver
+// and caches its result. The lock isn't held while solving, so concurrent
+// solves of the same key may both run; errors are never cached.
+pub fn cached_solve(
+    state: &State,
+    kind: SolverKind,
+    args: Vec<U256>,
+    solve: impl FnOnce() -> Result<FixedPoint>,
+) -> Result<FixedPoint> {
+    if lock_cache().is_none() {
+        return solve();
+    }
+    let key = CacheKey {
+        state: encode_state(state),
+        kind,
+        args,
+    };
+    if let Some(value) = lock_cache().as_mut().and_then(|cache| cache.get(&key)) {
+        return Ok(value);
+    }
+    let value = solve()?;
+    if let Some(cache) = lock_cache().as_mut() {
+        cache.insert(key, value);
+    }
+    Ok(value)
+}
+
+pub fn cached_max_long(
+    state: &State,
+    budget: FixedPoint,
+    checkpoint_exposure: I256,
+    maybe_max_iterations: Option<usize>,
+) -> FixedPoint {
+    let mut args = vec![U256::from(budget), i256_key(checkpoint_exposure)];
+    args.extend(optional_key(maybe_max_iterations));
+    let result = cached_solve(state, SolverKind::MaxLong, args, || {
+        Ok(state.calculate_max_long(budget, checkpoint_exposure, maybe_max_iterations))
+    });
+    // The solver is infallible, so neither is the cached solve.
+    result.unwrap()
+}
+
+pub fn cached_max_short(
+    state: &State,
+    budget: FixedPoint,
+    open_vault_share_price: FixedPoint,
+    checkpoint_exposure: I256,
+    maybe_conservative_price: Option<FixedPoint>,
+    maybe_max_iterations: Option<usize>,
+) -> FixedPoint {
+    let mut args = vec![
+        U256::from(budget),
+        U256::from(open_vault_share_price),
+        i256_key(checkpoint_exposure),
+    ];
+    args.extend(optional_key(maybe_conservative_price));
+    args.extend(optional_key(maybe_max_iterations));
+    let result = cached_solve(state, SolverKind::MaxShort, args, || {
+        Ok(state.calculate_max_short(
+            budget,
+            open_vault_share_price,
+            checkpoint_exposure,
+            maybe_conservative_price,
+            maybe_max_iterations,
+        ))
+    });
+    result.unwrap()
+}
+
+/// Set the maximum number of solver results to cache.
+///
+/// The cache is disabled by default. A size of zero disables it and drops any
+/// cached results. Shrinking the cache evicts the least recently used results.
+#[pyfunction]
+pub fn set_solver_cache_size(max_size: usize) {
+    let mut cache = lock_cache();
+    if max_size == 0 {
+        *cache = None;
+        return;
+    }
+    match cache.as_mut() {
+        Some(cache) => {
+            cache.max_size = max_size;
+            cache.evict();
+        }
+        None => *cache = Some(SolverCache::new(max_size)),
+    }
+}
+
+/// Drop every cached solver result and reset the hit and miss counts.
+#[pyfunction]
+pub fn clear_solver_cache() {
+    if let Some(cache) = lock_cache().as_mut() {
+        *cache = SolverCache::new(cache.max_size);
+    }
+}
+
+/// Get the solver cache statistics as a dict with the hits, misses, current
+/// size and max size of the cache.
+#[pyfunction]
+pub fn solver_cache_stats(py: Python<'_>) -> PyResult<PyObject> {
+    let (hits, misses, size, max_size) = match lock_cache().as_ref() {
+        Some(cache) => (
+            cache.hits,
+            cache.misses,
+            cache.entries.len(),
+            cache.max_size,
+        ),
+        None => (0, 0, 0, 0),
+    };
+    let stats = PyDict::new(py);
+    stats.set_item("hits", hits)?;
+    stats.set_item("misses", misses)?;
+    stats.set_item("size", size)?;
+    stats.set_item("max_size", max_size)?;
+    Ok(stats.into_py(py))
+}
@@ -0,0 +1,74 @@
+use std::time::{Duration, Instant};
+
+use fixed_point::FixedPoint;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+use crate::price_impact::TradeSide;
+use crate::solver::{SolveLimits, DEFAULT_MAX_ITERATIONS};
+use crate::u256_from_py;
+
+// The result of a max long or max short solve, kept so that the next solve can
+// be warm started from it. Only the convergence diagnostics are exposed to
+// python.
+#[pyclass(module = "hyperdrivepy", name = "SolverState", frozen)]
+pub struct SolverState {
+    pub side: TradeSide,
+    pub solution: FixedPoint,
+    pub iterations: usize,
+    pub converged: bool,
+}
+
+#[pymethods]
+impl SolverState {
+    /// The number of trade sizes the solve evaluated.
+    #[getter]
+    pub fn iterations(&self) -> usize {
+        self.iterations
+    }
+
+    /// False if the solve ran out of evaluations or time before the bracket was narrow enough.
+    #[getter]
+    pub fn converged(&self) -> bool {
+        self.converged
+    }
+}
+
+// Helper function to read a warm start, which is either a previous solution or
+// the solver state returned by a previous solve.
+pub fn warm_start_from_py(
+    initial_guess: Option<&PyAny>,
+    side: TradeSide,
+) -> PyResult<Option<FixedPoint>> {
+    let initial_guess = match initial_guess {
+        Some(initial_guess) => initial_guess,
+        None => return Ok(None),
+    };
+    if let Ok(solver_state) = initial_guess.extract::<PyRef<SolverState>>() {
+        if solver_state.side != side {
+            return Err(PyErr::new::<PyValueError, _>(
+                "The solver state is from a solve for the other side of the market",
+            ));
+        }
+        return Ok(Some(solver_state.solution));
+    }
+    let guess = FixedPoint::from(u256_from_py(initial_guess).map_err(|_| {
+        PyErr::new::<PyValueError, _>("Failed to convert initial_guess string to U256")
+    })?);
+    Ok(Some(guess))
+}
+
+// Helper function to build the limits of an anytime solve. The deadline is
+// measured from when this is called.
+pub fn anytime_limits(
+    maybe_time_budget_ns: Option<u64>,
+    maybe_max_evaluations: Option<usize>,
+) -> SolveLimits {
+    SolveLimits {
+        max_iterations: maybe_max_evaluations.unwrap_or(DEFAULT_MAX_ITERATIONS),
+        // A deadline too far out to represent is no deadline at all.
+        deadline: maybe_time_budget_ns.and_then(|time_budget_ns| {
+            Instant::now().checked_add(Duration::from_nanos(time_budget_ns))
+        }),
+    }
+}
@@ -0,0 +1,338 @@
+use ethers::core::types::{I256, U256};
+use eyre::{eyre, Result};
+use fixed_point::FixedPoint;
+use fixed_point_macros::fixed;
+use hyperdrive_math::{State, YieldSpace};
+use hyperdrive_wrappers::wrappers::ihyperdrive::PoolInfo;
+
+// These helpers apply a trade to a copy of the pool info the way the Hyperdrive
+// contract does, so trade sequences can be simulated without a chain.
+//
+// Checkpoint-level exposure is not tracked by PoolInfo, so opening or closing a
+// position assumes its checkpoint holds no offsetting positions, i.e. long
+// exposure moves one-for-one with longs outstanding. The LP share price and the
+// withdrawal pool are left unchanged.
+
+// The fraction of the position duration left before maturity, clamped to [0, 1].
+fn time_remaining(state: &State, maturity_time: U256, current_time: U256) -> FixedPoint {
+    if maturity_time <= current_time {
+        return fixed!(0);
+    }
+    FixedPoint::from(maturity_time - current_time)
+        .div_down(FixedPoint::from(state.config.position_duration))
+        .min(fixed!(1e18))
+}
+
+// The maturity time of a position opened at the given time.
+fn maturity_time(state: &State, current_time: U256) -> U256 {
+    state.to_checkpoint(current_time) + state.config.position_duration
+}
+
+// Mirrors the contract's updateWeightedAverage for the average maturity times.
+// Maturity times are stored scaled by 1e18.
+//
+// Both branches round down. When adding, the result is then clamped between
+// the old average and the delta, as the contract does, so rounding can't move
+// the average outside of them. A zero delta weight leaves the average as is.
+fn update_weighted_average(
+    average: U256,
+    total_weight: U256,
+    maturity_time: U256,
+    delta_weight: U256,
+    is_adding: bool,
+) -> U256 {
+    if delta_weight.is_zero() {
+        return average;
+    }
+    let average = FixedPoint::from(average);
+    let total_weight = FixedPoint::from(total_weight);
+    let delta = FixedPoint::from(maturity_time * U256::exp10(18));
+    let delta_weight = FixedPoint::from(delta_weight);
+    if is_adding {
+        let updated_average = (total_weight.mul_down(average) + delta_weight.mul_down(delta))
+            .div_down(total_weight + delta_weight);
+        U256::from(
+            updated_average
+                .max(delta.min(average))
+                .min(delta.max(average)),
+        )
+    } else {
+        // The contract reverts when more weight is removed than there is, and
+        // the simulation saturates at zero instead.
+        if total_weight <= delta_weight {
+            return U256::zero();
+        }
+        let weighted_total = total_weight.mul_down(average);
+        let weighted_delta = delta_weight.mul_down(delta);
+        if weighted_total <= weighted_delta {
+            return U256::zero();
+        }
+        U256::from((weighted_total - weighted_delta).div_down(total_weight - delta_weight))
+    }
+}
+
+fn checked_sub(value: U256, delta: U256, name: &str) -> Result<U256> {
+    value
+        .checked_sub(delta)
+        .ok_or_else(|| eyre!("{} would underflow: {} < {}", name, value, delta))
+}
+
+fn governance_lp_fee(state: &State) -> FixedPoint {
+    FixedPoint::from(state.config.fees.governance_lp)
+}
+
+pub fn apply_open_long(
+    state: &State,
+    base_amount: FixedPoint,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    let bond_proceeds = state.calculate_open_long(base_amount)?;
+    apply_open_long_with_proceeds(state, base_amount, bond_proceeds, current_time)
+}
+
+// Applies an open long whose bond proceeds have already been calculated.
+pub fn apply_open_long_with_proceeds(
+    state: &State,
+    base_amount: FixedPoint,
+    bond_proceeds: FixedPoint,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    let vault_share_price = FixedPoint::from(state.info.vault_share_price);
+    let spot_price = state.calculate_spot_price();
+
+    // The governance fee is paid in bonds and taken out of the shares that
+    // enter the pool, so it is kept out of the bond reserves delta.
+    let governance_fee_bonds = state.open_long_governance_fee(base_amount);
+    let governance_fee_shares = governance_fee_bonds
+        .mul_down(spot_price)
+        .div_down(vault_share_price);
+    let share_reserves_delta = base_amount.div_down(vault_share_price) - governance_fee_shares;
+    let bond_reserves_delta = bond_proceeds + governance_fee_bonds;
+
+    let mut info = state.info.clone();
+    info.share_reserves += U256::from(share_reserves_delta);
+    info.bond_reserves = checked_sub(
+        info.bond_reserves,
+        U256::from(bond_reserves_delta),
+        "bondReserves",
+    )?;
+    info.long_average_maturity_time = update_weighted_average(
+        info.long_average_maturity_time,
+        info.longs_outstanding,
+        maturity_time(state, current_time),
+        U256::from(bond_proceeds),
+        true,
+    );
+    info.longs_outstanding += U256::from(bond_proceeds);
+    info.long_exposure += U256::from(bond_proceeds);
+    Ok(info)
+}
+
+pub fn apply_close_long(
+    state: &State,
+    bond_amount: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    if maturity_time <= current_time {
+        return Err(eyre!(
+            "apply_close_long only supports positions that have not matured"
+        ));
+    }
+    let vault_share_price = FixedPoint::from(state.info.vault_share_price);
+    let time_remaining = time_remaining(state, maturity_time, current_time);
+
+    // The curve part of the trade moves the effective share reserves. The flat
+    // part is paid out of the share reserves and offset in the share
+    // adjustment so that it does not move the spot price.
+    let bond_reserves_delta = bond_amount.mul_down(time_remaining);
+    let share_curve_delta = state.calculate_shares_out_given_bonds_in_down(bond_reserves_delta);
+    let curve_fee = state.close_long_curve_fee(bond_amount, maturity_time, current_time);
+    let flat_fee = state.close_long_flat_fee(bond_amount, maturity_time, current_time);
+    let governance_curve_fee = curve_fee.mul_down(governance_lp_fee(state));
+    let governance_flat_fee = flat_fee.mul_down(governance_lp_fee(state));
+    let flat_shares = (bond_amount - bond_reserves_delta).div_down(vault_share_price);
+
+    let share_reserves_delta = share_curve_delta - (curve_fee - governance_curve_fee);
+    let shares_out = share_reserves_delta + flat_shares - (flat_fee - governance_flat_fee);
+
+    let mut info = state.info.clone();
+    info.share_reserves =
+        checked_sub(info.share_reserves, U256::from(shares_out), "shareReserves")?;
+    info.share_adjustment -= I256::from_raw(U256::from(shares_out - share_reserves_delta));
+    info.bond_reserves += U256::from(bond_reserves_delta);
+    info.long_average_maturity_time = update_weighted_average(
+        info.long_average_maturity_time,
+        info.longs_outstanding,
+        maturity_time,
+        U256::from(bond_amount),
+        false,
+    );
+    info.longs_outstanding = checked_sub(
+        info.longs_outstanding,
+        U256::from(bond_amount),
+        "longsOutstanding",
+    )?;
+    info.long_exposure = info.long_exposure.saturating_sub(U256::from(bond_amount));
+    Ok(info)
+}
+
+pub fn apply_open_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    // Run the full open short calculation so that trades the contract would
+    // reject are rejected here as well.
+    state.calculate_open_short(bond_amount, FixedPoint::from(state.info.vault_share_price))?;
+    apply_validated_open_short(state, bond_amount, current_time)
+}
+
+// Applies an open short that has already been checked with calculate_open_short.
+pub fn apply_validated_open_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    let vault_share_price = FixedPoint::from(state.info.vault_share_price);
+    let spot_price = state.calculate_spot_price();
+
+    // The curve fee stays in the pool, except for the portion that is paid to
+    // governance.
+    let share_curve_delta = state.calculate_shares_out_given_bonds_in_down(bond_amount);
+    let curve_fee_shares = state
+        .open_short_curve_fee(bond_amount, spot_price)
+        .div_down(vault_share_price);
+    let governance_fee_shares = state
+        .open_short_governance_fee(bond_amount, spot_price)
+        .div_down(vault_share_price);
+    let share_reserves_delta = share_curve_delta - (curve_fee_shares - governance_fee_shares);
+
+    let mut info = state.info.clone();
+    info.share_reserves = checked_sub(
+        info.share_reserves,
+        U256::from(share_reserves_delta),
+        "shareReserves",
+    )?;
+    info.bond_reserves += U256::from(bond_amount);
+    info.short_average_maturity_time = update_weighted_average(
+        info.short_average_maturity_time,
+        info.shorts_outstanding,
+        maturity_time(state, current_time),
+        U256::from(bond_amount),
+        true,
+    );
+    info.shorts_outstanding += U256::from(bond_amount);
+    Ok(info)
+}
+
+pub fn apply_close_short(
+    state: &State,
+    bond_amount: FixedPoint,
+    maturity_time: U256,
+    current_time: U256,
+) -> Result<PoolInfo> {
+    if maturity_time <= current_time {
+        return Err(eyre!(
+            "apply_close_short only supports positions that have not matured"
+        ));
+    }
+    let vault_share_price = FixedPoint::from(state.info.vault_share_price);
+    let time_remaining = time_remaining(state, maturity_time, current_time);
+
+    // Closing a short buys back bonds on the curve for the time remaining and
+    // pays the flat part into the share reserves, offset in the share
+    // adjustment so that it does not move the spot price.
+    let bond_reserves_delta = bond_amount.mul_down(time_remaining);
+    let share_curve_delta =
+        state.calculate_shares_in_given_bonds_out_up_safe(bond_reserves_delta)?;
+    let curve_fee = state.close_short_curve_fee(bond_amount, maturity_time, current_time);
+    let flat_fee = state.close_short_flat_fee(bond_amount, maturity_time, current_time);
+    let governance_curve_fee = curve_fee.mul_down(governance_lp_fee(state));
+    let governance_flat_fee = flat_fee.mul_down(governance_lp_fee(state));
+    let flat_shares = (bond_amount - bond_reserves_delta).div_down(vault_share_price);
+
+    let share_reserves_delta = share_curve_delta + (curve_fee - governance_curve_fee);
+    let shares_in = share_reserves_delta + flat_shares + (flat_fee - governance_flat_fee);
+
+    let mut info = state.info.clone();
+    info.share_reserves += U256::from(shares_in);
+    info.share_adjustment += I256::from_raw(U256::from(shares_in - share_reserves_delta));
+    info.bond_reserves = checked_sub(
+        info.bond_reserves,
+        U256::from(bond_reserves_delta),
+        "bondReserves",
+    )?;
+    info.short_average_maturity_time = update_weighted_average(
+        info.short_average_maturity_time,
+        info.shorts_outstanding,
+        maturity_time,
+        U256::from(bond_amount),
+        false,
+    );
+    info.shorts_outstanding = checked_sub(
+        info.shorts_outstanding,
+        U256::from(bond_amount),
+        "shortsOutstanding",
+    )?;
+    Ok(info)
+}
+
+pub fn apply_add_liquidity(
+    state: &State,
+    contribution: FixedPoint,
+    current_time: U256,
+    min_lp_share_price: FixedPoint,
+    min_apr: FixedPoint,
+    max_apr: FixedPoint,
+    as_base: bool,
+) -> Result<PoolInfo> {
+    let lp_shares = state.calculate_add_liquidity(
+        current_time,
+        contribution,
+        min_lp_share_price,
+        min_apr,
+        max_apr,
+        as_base,
+    )?;
+    let share_contribution = if as_base {
+        contribution.div_down(FixedPoint::from(state.info.vault_share_price))
+    } else {
+        contribution
+    };
+
+    // Adding liquidity scales the share adjustment and the bond reserves with
+    // the share reserves so that the spot price is unchanged.
+    let share_reserves = FixedPoint::from(state.info.share_reserves);
+    let updated_share_reserves = share_reserves + share_contribution;
+    let share_adjustment = state.info.share_adjustment;
+    let updated_share_adjustment = if share_adjustment >= I256::zero() {
+        I256::from_raw(U256::from(
+            FixedPoint::from(share_adjustment.into_raw())
+                .mul_div_down(updated_share_reserves, share_reserves),
+        ))
+    } else {
+        -I256::from_raw(U256::from(
+            FixedPoint::from(share_adjustment.unsigned_abs())
+                .mul_div_up(updated_share_reserves, share_reserves),
+        ))
+    };
+    let effective_share_reserves = I256::from_raw(U256::from(share_reserves)) - share_adjustment;
+    let updated_effective_share_reserves =
+        I256::from_raw(U256::from(updated_share_reserves)) - updated_share_adjustment;
+    if effective_share_reserves <= I256::zero() || updated_effective_share_reserves <= I256::zero()
+    {
+        return Err(eyre!("effective share reserves must be positive"));
+    }
+    let updated_bond_reserves = FixedPoint::from(state.info.bond_reserves).mul_div_down(
+        FixedPoint::from(updated_effective_share_reserves.into_raw()),
+        FixedPoint::from(effective_share_reserves.into_raw()),
+    );
+
+    let mut info = state.info.clone();
+    info.share_reserves = U256::from(updated_share_reserves);
+    info.share_adjustment = updated_share_adjustment;
+    info.bond_reserves = U256::from(updated_bond_reserves);
+    info.lp_total_supply += U256::from(lp_shares);
+    Ok(info)
+}
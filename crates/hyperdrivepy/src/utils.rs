@@ -1,46 +1,81 @@
 use ethers::core::types::{Address, H256, I256, U256};
+use fixed_point::FixedPoint;
 use hyperdrive_wrappers::wrappers::ihyperdrive::Fees;
-use pyo3::exceptions::PyValueError;
+use pyo3::exceptions::{PyTypeError, PyValueError};
+use pyo3::ffi;
 use pyo3::prelude::*;
+use pyo3::types::{PyBool, PyBytes, PyLong, PyTuple};
+
+// Helper function to get a struct field from a Python object.
+// Dataclasses are read by attribute name, while tuples, such as the structs returned by
+// contract calls, are read by the field's position in the solidity struct.
+pub fn get_struct_field<'a>(ob: &'a PyAny, attr: &str, index: usize) -> PyResult<&'a PyAny> {
+    match ob.downcast::<PyTuple>() {
+        Ok(tuple) => tuple.get_item(index),
+        Err(_) => ob.getattr(attr),
+    }
+}
 
 // Helper function to extract U256 values from Python object attributes
-pub fn extract_u256_from_attr(ob: &PyAny, attr: &str) -> PyResult<U256> {
-    let value_str: String = ob.getattr(attr)?.extract()?;
-    U256::from_dec_str(&value_str)
+pub fn extract_u256_from_attr(ob: &PyAny, attr: &str, index: usize) -> PyResult<U256> {
+    let value = get_struct_field(ob, attr, index)?;
+    u256_from_py(value)
         .map_err(|e| PyErr::new::<PyValueError, _>(format!("Invalid U256 for {}: {}", attr, e)))
 }
 
 // Helper function to extract I256 values from Python object attributes
-pub fn extract_i256_from_attr(ob: &PyAny, attr: &str) -> PyResult<I256> {
-    let value_str: String = ob.getattr(attr)?.extract()?;
-    I256::from_dec_str(&value_str)
+pub fn extract_i256_from_attr(ob: &PyAny, attr: &str, index: usize) -> PyResult<I256> {
+    let value = get_struct_field(ob, attr, index)?;
+    i256_from_py(value)
         .map_err(|e| PyErr::new::<PyValueError, _>(format!("Invalid I256 for {}: {}", attr, e)))
 }
 
 // Helper function to extract Ethereum Address values from Python object attributes
-pub fn extract_address_from_attr(ob: &PyAny, attr: &str) -> PyResult<Address> {
-    let address_str: String = ob.getattr(attr)?.extract()?;
+pub fn extract_address_from_attr(ob: &PyAny, attr: &str, index: usize) -> PyResult<Address> {
+    let value = get_struct_field(ob, attr, index)?;
+    if let Ok(address_bytes) = value.downcast::<PyBytes>() {
+        let address_bytes = address_bytes.as_bytes();
+        if address_bytes.len() != 20 {
+            return Err(PyErr::new::<PyValueError, _>(format!(
+                "Invalid Ethereum address for {}: expected 20 bytes, got {}",
+                attr,
+                address_bytes.len()
+            )));
+        }
+        return Ok(Address::from_slice(address_bytes));
+    }
+    let address_str: &str = value.extract()?;
     address_str.parse::<Address>().map_err(|e| {
         PyErr::new::<PyValueError, _>(format!("Invalid Ethereum address for {}: {}", attr, e))
     })
 }
 
 // Helper function to extract bytes32 values from Python object attributes
-pub fn extract_bytes32_from_attr(ob: &PyAny, attr: &str) -> PyResult<[u8; 32]> {
-    let bytes32_str: String = ob.getattr(attr)?.extract()?;
+pub fn extract_bytes32_from_attr(ob: &PyAny, attr: &str, index: usize) -> PyResult<[u8; 32]> {
+    let value = get_struct_field(ob, attr, index)?;
+    if let Ok(bytes32) = value.downcast::<PyBytes>() {
+        return bytes32.as_bytes().try_into().map_err(|_| {
+            PyErr::new::<PyValueError, _>(format!(
+                "Invalid bytes32 for {}: expected 32 bytes, got {}",
+                attr,
+                bytes32.as_bytes().len()
+            ))
+        });
+    }
+    let bytes32_str: &str = value.extract()?;
     let bytes32_h256: H256 = bytes32_str.parse::<H256>().map_err(|e| {
         PyErr::new::<PyValueError, _>(format!("Invalid bytes32 for {}: {}", attr, e))
     })?;
     Ok(bytes32_h256.into())
 }
 
-pub fn extract_fees_from_attr(ob: &PyAny, attr: &str) -> PyResult<Fees> {
-    let fees_obj = ob.getattr(attr)?;
+pub fn extract_fees_from_attr(ob: &PyAny, attr: &str, index: usize) -> PyResult<Fees> {
+    let fees_obj = get_struct_field(ob, attr, index)?;
 
-    let curve = extract_u256_from_attr(&fees_obj, "curve")?;
-    let flat = extract_u256_from_attr(&fees_obj, "flat")?;
-    let governance_lp = extract_u256_from_attr(&fees_obj, "governanceLP")?;
-    let governance_zombie = extract_u256_from_attr(&fees_obj, "governanceZombie")?;
+    let curve = extract_u256_from_attr(fees_obj, "curve", 0)?;
+    let flat = extract_u256_from_attr(fees_obj, "flat", 1)?;
+    let governance_lp = extract_u256_from_attr(fees_obj, "governanceLP", 2)?;
+    let governance_zombie = extract_u256_from_attr(fees_obj, "governanceZombie", 3)?;
 
     Ok(Fees {
         curve,
@@ -49,3 +84,169 @@ pub fn extract_fees_from_attr(ob: &PyAny, attr: &str) -> PyResult<Fees> {
         governance_zombie,
     })
 }
+
+// Helper function to split a python int into the four 64-bit limbs of its low
+// 256 bits, least significant first, and the bits above them, value >> 256.
+// Negative ints give the limbs of their two's complement representation.
+//
+// The module is built against the stable ABI, which doesn't include the byte
+// array conversions (_PyLong_AsByteArray and _PyLong_FromByteArray), so the
+// limbs are read with the C API's number protocol. Nothing is called through
+// the interpreter.
+fn py_long_to_limbs(value: &PyLong) -> PyResult<([u64; 4], &PyAny)> {
+    let py = value.py();
+    let shift = 64u32.to_object(py);
+    let mut limbs = [0u64; 4];
+    let mut rest: &PyAny = value;
+    for limb in limbs.iter_mut() {
+        unsafe {
+            *limb = ffi::PyLong_AsUnsignedLongLongMask(rest.as_ptr());
+            if *limb == u64::MAX && !ffi::PyErr_Occurred().is_null() {
+                return Err(PyErr::fetch(py));
+            }
+            rest = py.from_owned_ptr_or_err(ffi::PyNumber_Rshift(rest.as_ptr(), shift.as_ptr()))?;
+        }
+    }
+    Ok((limbs, rest))
+}
+
+// Helper function to reject bools, which are python ints but are never meant
+// as amounts.
+fn reject_bool(ob: &PyAny) -> PyResult<()> {
+    if ob.is_instance_of::<PyBool>() {
+        return Err(PyErr::new::<PyTypeError, _>(
+            "Expected an int or a decimal string, got a bool",
+        ));
+    }
+    Ok(())
+}
+
+// Helper function to convert a python int or decimal string into a U256.
+// Python ints are converted natively, which avoids formatting and parsing
+// decimal strings. Ints that fit in a u64 take a single C API call.
+pub fn u256_from_py(ob: &PyAny) -> PyResult<U256> {
+    reject_bool(ob)?;
+    if let Ok(value) = ob.downcast::<PyLong>() {
+        if let Ok(small) = value.extract::<u64>() {
+            return Ok(U256::from(small));
+        }
+        let (limbs, rest) = py_long_to_limbs(value)?;
+        if !matches!(rest.extract::<i64>(), Ok(0)) {
+            return Err(PyErr::new::<PyValueError, _>(
+                "The int is negative or doesn't fit in 256 bits",
+            ));
+        }
+        return Ok(U256(limbs));
+    }
+    let value_str: &str = ob.extract()?;
+    U256::from_dec_str(value_str).map_err(|e| PyErr::new::<PyValueError, _>(e.to_string()))
+}
+
+// Helper function to convert a python int or decimal string into an I256.
+// Negative python ints are converted through their two's complement representation.
+pub fn i256_from_py(ob: &PyAny) -> PyResult<I256> {
+    reject_bool(ob)?;
+    if let Ok(value) = ob.downcast::<PyLong>() {
+        if let Ok(small) = value.extract::<i64>() {
+            return Ok(I256::from(small));
+        }
+        let (limbs, rest) = py_long_to_limbs(value)?;
+        let value = I256::from_raw(U256(limbs));
+        // The bits above the low 256 must all match the sign bit.
+        let expected_rest = if value.is_negative() { -1 } else { 0 };
+        if rest.extract::<i64>().ok() != Some(expected_rest) {
+            return Err(PyErr::new::<PyValueError, _>(
+                "The int doesn't fit in a signed 256-bit integer",
+            ));
+        }
+        return Ok(value);
+    }
+    let value_str: &str = ob.extract()?;
+    I256::from_dec_str(value_str).map_err(|e| PyErr::new::<PyValueError, _>(e.to_string()))
+}
+
+// Helper function to convert a U256 into a python int. Values that fit in a
+// u64 take a single C API call, and larger values are assembled from their
+// limbs with the number protocol.
+pub fn u256_to_py_int(py: Python<'_>, value: U256) -> PyResult<PyObject> {
+    if value <= U256::from(u64::MAX) {
+        return Ok(value.as_u64().into_py(py));
+    }
+    let shift = 64u32.to_object(py);
+    let mut result: PyObject = value.0[3].into_py(py);
+    for limb in value.0[..3].iter().rev() {
+        let limb = limb.to_object(py);
+        unsafe {
+            let shifted: PyObject = PyObject::from_owned_ptr_or_err(
+                py,
+                ffi::PyNumber_Lshift(result.as_ptr(), shift.as_ptr()),
+            )?;
+            result = PyObject::from_owned_ptr_or_err(
+                py,
+                ffi::PyNumber_Or(shifted.as_ptr(), limb.as_ptr()),
+            )?;
+        }
+    }
+    Ok(result)
+}
+
+// Helper function to convert a python sequence of ints or decimal strings into FixedPoint values.
+// A bytes buffer, such as a batch returned with as_buffer, is read as 32-byte little-endian words.
+pub fn fixed_point_vec_from_py(ob: &PyAny, name: &str) -> PyResult<Vec<FixedPoint>> {
+    if let Ok(buffer) = ob.downcast::<PyBytes>() {
+        return u256_vec_from_buffer(buffer.as_bytes(), name)
+            .map(|values| values.into_iter().map(FixedPoint::from).collect());
+    }
+    let items: Vec<&PyAny> = ob.extract()?;
+    items
+        .into_iter()
+        .enumerate()
+        .map(|(index, item)| {
+            let value = u256_from_py(item).map_err(|_| {
+                PyErr::new::<PyValueError, _>(format!(
+                    "Failed to convert {}[{}] to U256",
+                    name, index
+                ))
+            })?;
+            Ok(FixedPoint::from(value))
+        })
+        .collect()
+}
+
+// Helper function to read a buffer of 32-byte little-endian words into U256 values.
+pub fn u256_vec_from_buffer(buffer: &[u8], name: &str) -> PyResult<Vec<U256>> {
+    if buffer.len() % 32 != 0 {
+        return Err(PyErr::new::<PyValueError, _>(format!(
+            "Failed to convert {}: buffer length {} is not a multiple of 32",
+            name,
+            buffer.len()
+        )));
+    }
+    Ok(buffer
+        .chunks_exact(32)
+        .map(U256::from_little_endian)
+        .collect())
+}
+
+// Helper function to write U256 values into a bytes buffer of 32-byte little-endian words.
+// This is the layout of a (rows, 4) uint64 numpy array and of Arrow's decimal256 and
+// fixed_size_binary(32) arrays, so either can view the buffer without copying it.
+pub fn u256_buffer_to_py(py: Python<'_>, values: &[U256]) -> PyResult<PyObject> {
+    let buffer = PyBytes::new_with(py, values.len() * 32, |bytes| {
+        for (value, word) in values.iter().zip(bytes.chunks_exact_mut(32)) {
+            value.to_little_endian(word);
+        }
+        Ok(())
+    })?;
+    Ok(buffer.into_py(py))
+}
+
+// Helper function to pack a validity mask into an Arrow validity bitmap, where bit i % 8
+// of byte i / 8 is set if element i is valid.
+pub fn validity_bitmap_to_py(py: Python<'_>, mask: &[bool]) -> PyObject {
+    let mut bitmap = vec![0u8; (mask.len() + 7) / 8];
+    for (index, _) in mask.iter().enumerate().filter(|(_, valid)| **valid) {
+        bitmap[index / 8] |= 1 << (index % 8);
+    }
+    PyBytes::new(py, &bitmap).into_py(py)
+}
@@ -0,0 +1,338 @@
+"""Per-call latency benchmarks for the hyperdrivepy bindings.
+
+Every `HyperdriveState` method that wraps the rust math and every function in `hyperdrive_utils` is timed. The cost of a
+method is broken down into stages:
+
+- extraction: building the rust state from the pool config and pool info dataclasses.
+- pool_config_handle: building a `PoolConfigHandle`, which converts the pool config into its rust representation the
+  way extraction does. It approximates the part of extraction spent on the pool config.
+- serialize_pool_info: the part of extraction spent converting the pool info, with an already converted config.
+- math: calling the method on a prebuilt state with python int arguments and results. The pool structs are not
+  converted again, so this only includes extracting the method's own arguments.
+- stringification: the extra cost of decimal string arguments and results over python ints.
+- python_overhead: whatever remains of the module-level call, i.e. the python wrapper layer.
+
+The module_call and python_overhead stages are only reported for methods with a module-level function in
+`hyperdrive_state`.
+
+Run it with `python system_tests/benchmark.py --output results.json`. Pass `--baseline` with an earlier results file to
+fail when any stage regresses by more than `--max-regression`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from hyperdrivepy import hyperdrive_state, hyperdrive_utils
+from hyperdrivepy.hyperdrive_state import HyperdriveState
+from hyperdrivepy.pool_config_handle import PoolConfigHandle
+from hyperdrivepy.pypechain_types import PoolConfig, PoolInfo
+from hyperdrivepy.utils import rust_module
+from pool_data import POOL_CONFIG, POOL_INFO
+
+# The timed lambdas are called before the loop variables they capture change.
+# pylint: disable=cell-var-from-loop
+
+
+class _Native(int):
+    """An int argument, such as an iteration count, that stays an int in the string benchmark."""
+
+
+_CURRENT_TIME = 9 * 10**17
+_MATURITY_TIME = _CURRENT_TIME + 10
+
+# Positional arguments for every HyperdriveState method that wraps the rust math.
+# The module-level functions in hyperdrive_state take the same arguments after the pool config and pool info.
+STATE_BENCHMARK_ARGS: dict[str, tuple] = {
+    "calculate_max_spot_price": (),
+    "calculate_spot_price_after_long": (500 * 10**18, None),
+    "calculate_spot_price_after_short": (50 * 10**18, None),
+    "calculate_solvency": (),
+    "calculate_spot_rate_after_long": (500 * 10**18, None),
+    "calculate_spot_rate": (),
+    "calculate_spot_price": (),
+    "calculate_open_long": (500 * 10**18,),
+    "calculate_close_long": (500 * 10**18, _MATURITY_TIME, _CURRENT_TIME),
+    "calculate_open_short": (50 * 10**18, 9 * 10**17),
+    "calculate_close_short": (50 * 10**18, 8 * 10**17, 9 * 10**17, _MATURITY_TIME, _CURRENT_TIME),
+    "calculate_open_long_batch": ([amount * 10**18 for amount in (10, 100, 500)],),
+    "calculate_close_long_batch": ([amount * 10**18 for amount in (10, 500)], _MATURITY_TIME, _CURRENT_TIME),
+    "calculate_open_short_batch": ([amount * 10**18 for amount in (10, 50)], None),
+    "calculate_close_short_batch": (
+        [amount * 10**18 for amount in (10, 50)],
+        8 * 10**17,
+        9 * 10**17,
+        _MATURITY_TIME,
+        _CURRENT_TIME,
+    ),
+    "calculate_fees_open_long": (500 * 10**18,),
+    "calculate_fees_close_long": (500 * 10**18, _MATURITY_TIME, _CURRENT_TIME),
+    "calculate_fees_open_short": (50 * 10**18, None),
+    "calculate_fees_close_short": (50 * 10**18, _MATURITY_TIME, _CURRENT_TIME),
+    "quote_open_long": (500 * 10**18,),
+    "quote_open_short": (50 * 10**18, None),
+    "quote_close_long": (500 * 10**18, _MATURITY_TIME, _CURRENT_TIME),
+    "quote_close_short": (50 * 10**18, 8 * 10**17, 9 * 10**17, _MATURITY_TIME, _CURRENT_TIME),
+    "price_impact_curve": ("long", 10**18, 10_000 * 10**18, _Native(16)),
+    "calculate_add_liquidity": (1_000 * 10**18, _CURRENT_TIME),
+    "calculate_add_liquidity_batch": ([amount * 10**18 for amount in (10, 1_000)], _CURRENT_TIME),
+    "estimate_remove_liquidity": (1_000 * 10**18, _CURRENT_TIME),
+    "estimate_remove_liquidity_batch": ([amount * 10**18 for amount in (10, 1_000)], _CURRENT_TIME),
+    "estimate_redeem_withdrawal_shares": (1_000 * 10**18, _CURRENT_TIME),
+    "estimate_redeem_withdrawal_shares_batch": ([amount * 10**18 for amount in (10, 1_000)], _CURRENT_TIME),
+    "to_checkpoint": (_CURRENT_TIME,),
+    "calculate_targeted_long": (10**18, 10**15, 10_000, _Native(20), 10**10),
+    "calculate_max_long": (10**18, 10_000, _Native(20)),
+    "calculate_max_short": (10 * 10**18, 10**18, 0, None, _Native(20)),
+    "calculate_targeted_long_with_budget_with_diagnostics": (10**18, 10**15, 10_000, _Native(20), 10**10),
+    "calculate_max_long_with_diagnostics": (10**18, 10_000, _Native(20)),
+    "calculate_max_short_with_diagnostics": (10 * 10**18, 10**18, 0, None, _Native(20)),
+    "calculate_max_long_many": ([10**18, 10 * 10**18, 100 * 10**18], 10_000),
+    "calculate_max_short_many": ([10**18, 10 * 10**18, 100 * 10**18], 10**18, 0),
+    "calculate_max_long_warm": (10**18, 10_000, _CURRENT_TIME),
+    "calculate_max_short_warm": (10 * 10**18, 10**18, 0, _CURRENT_TIME),
+    "calculate_max_long_anytime": (10**18, 10_000, _CURRENT_TIME),
+    "calculate_max_short_anytime": (10 * 10**18, 10**18, 0, _CURRENT_TIME),
+    "screen_open_long": ([amount * 1e18 for amount in (10, 100, 500)],),
+    "screen_open_short": ([amount * 1e18 for amount in (5, 50, 100)], None),
+    "screen_close_long": ([amount * 1e18 for amount in (10, 100, 500)], _MATURITY_TIME, _CURRENT_TIME),
+    "screen_close_short": (
+        [amount * 1e18 for amount in (5, 50, 100)],
+        8 * 10**17,
+        9 * 10**17,
+        _MATURITY_TIME,
+        _CURRENT_TIME,
+    ),
+    "screen_spot_after_long": ([amount * 1e18 for amount in (10, 100, 500)],),
+    "screen_max_long": ([amount * 1e18 for amount in (1, 10, 100)], 10_000),
+    "screen_max_short": ([amount * 1e18 for amount in (1, 10, 100)], 10**18, 0),
+    "confirm_exact": ("open_long", [10 * 10**18, 100 * 10**18, 500 * 10**18], [True, False, True]),
+    "calculate_bonds_out_given_shares_in_down": (1_000 * 10**18,),
+    "calculate_shares_in_given_bonds_out_up": (1_000 * 10**18,),
+    "calculate_shares_in_given_bonds_out_down": (1_000 * 10**18,),
+    "calculate_shares_out_given_bonds_in_down": (1_000 * 10**18,),
+    "calculate_present_value": (1_000,),
+    "calculate_idle_share_reserves_in_base": (),
+}
+
+# Keyword-only arguments for the HyperdriveState methods that need them.
+STATE_BENCHMARK_KWARGS: dict[str, dict[str, Any]] = {
+    "calculate_max_long_warm": {"initial_guess": 10**18},
+    "calculate_max_short_warm": {"initial_guess": 10 * 10**18},
+    "calculate_max_long_anytime": {"maybe_time_budget_ns": _Native(2_000_000)},
+    "calculate_max_short_anytime": {"maybe_time_budget_ns": _Native(2_000_000)},
+}
+
+# Arguments for every function in hyperdrive_utils.
+UTILS_BENCHMARK_ARGS: dict[str, tuple] = {
+    "calculate_time_stretch": (5 * 10**16, 60 * 60 * 24 * 365),
+    "calculate_effective_share_reserves": (1_000_000 * 10**18, 0),
+    "calculate_initial_bond_reserves": (1_000_000 * 10**18, 10**18, 5 * 10**16, 60 * 60 * 24 * 365, 10**17),
+}
+
+
+@dataclass
+class BenchmarkSettings:
+    """How many calls to time for each measurement."""
+
+    iterations: int = 1_000
+    repeats: int = 5
+
+
+def _to_strings(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, _Native):
+        return int(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_to_strings(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _to_strings(item) for key, item in value.items()}
+    return value
+
+
+def _time_call(call: Callable[[], Any], settings: BenchmarkSettings) -> float:
+    """Return the best per-call time in nanoseconds over the configured repeats."""
+    best = float("inf")
+    for _ in range(settings.repeats):
+        start = time.perf_counter_ns()
+        for _ in range(settings.iterations):
+            call()
+        best = min(best, (time.perf_counter_ns() - start) / settings.iterations)
+    return best
+
+
+def _time_state_stages(config: PoolConfig, info: PoolInfo, settings: BenchmarkSettings) -> dict[str, float]:
+    """Time building a state from the pool structs, broken down into stages."""
+    config_handle = PoolConfigHandle(config)
+    return {
+        "extraction": _time_call(lambda: HyperdriveState(config, info), settings),
+        "pool_config_handle": _time_call(lambda: PoolConfigHandle(config), settings),
+        "serialize_pool_info": _time_call(lambda: HyperdriveState(config_handle, info), settings),
+    }
+
+
+def benchmark_state_functions(settings: BenchmarkSettings) -> dict[str, dict[str, float]]:
+    """Time every HyperdriveState method, broken down into stages.
+
+    Arguments
+    ---------
+    settings: BenchmarkSettings
+        How many calls to time for each measurement.
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        A mapping from each method name to its per-call stage timings in nanoseconds.
+    """
+    config, info = POOL_CONFIG, POOL_INFO
+    # Building the state doesn't depend on the method, so its stages are timed once.
+    state_stages = _time_state_stages(config, info, settings)
+    str_state = HyperdriveState(config, info)
+    int_state = HyperdriveState(config, info, native_ints=True)
+    results: dict[str, dict[str, float]] = {}
+    for name, int_args in STATE_BENCHMARK_ARGS.items():
+        int_kwargs = STATE_BENCHMARK_KWARGS.get(name, {})
+        str_args, str_kwargs = _to_strings(int_args), _to_strings(int_kwargs)
+        str_call = _time_call(lambda: getattr(str_state, name)(*str_args, **str_kwargs), settings)
+        int_call = _time_call(lambda: getattr(int_state, name)(*int_args, **int_kwargs), settings)
+        results[name] = {
+            **state_stages,
+            "math": int_call,
+            "stringification": max(0.0, str_call - int_call),
+        }
+        if hasattr(hyperdrive_state, name):
+            module_call = _time_call(lambda: getattr(hyperdrive_state, name)(config, info, *str_args), settings)
+            results[name]["module_call"] = module_call
+            results[name]["python_overhead"] = max(0.0, module_call - state_stages["extraction"] - str_call)
+    return results
+
+
+def benchmark_utils_functions(settings: BenchmarkSettings) -> dict[str, dict[str, float]]:
+    """Time every function in hyperdrive_utils against the rust function it wraps.
+
+    Arguments
+    ---------
+    settings: BenchmarkSettings
+        How many calls to time for each measurement.
+
+    Returns
+    -------
+    dict[str, dict[str, float]]
+        A mapping from each function name to its per-call stage timings in nanoseconds.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for name, int_args in UTILS_BENCHMARK_ARGS.items():
+        str_args = _to_strings(int_args)
+        module_function = getattr(hyperdrive_utils, name)
+        rust_function = getattr(rust_module, name)
+        module_call = _time_call(lambda: module_function(*str_args), settings)
+        rust_call = _time_call(lambda: rust_function(*str_args), settings)
+        results[name] = {
+            "module_call": module_call,
+            "math": rust_call,
+            "python_overhead": max(0.0, module_call - rust_call),
+        }
+    return results
+
+
+def run_benchmarks(settings: BenchmarkSettings | None = None) -> dict[str, Any]:
+    """Run the full benchmark suite.
+
+    Arguments
+    ---------
+    settings: BenchmarkSettings, optional
+        How many calls to time for each measurement.
+
+    Returns
+    -------
+    dict[str, Any]
+        JSON-serializable results, with per-call stage timings in nanoseconds under "results".
+    """
+    if settings is None:
+        settings = BenchmarkSettings()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": settings.iterations,
+        "repeats": settings.repeats,
+        "unit": "ns",
+        "results": {**benchmark_state_functions(settings), **benchmark_utils_functions(settings)},
+    }
+
+
+def find_regressions(
+    results: dict[str, Any], baseline: dict[str, Any], max_regression: float, min_time_ns: float = 100.0
+) -> list[str]:
+    """Compare benchmark results against a baseline.
+
+    Arguments
+    ---------
+    results: dict[str, Any]
+        Output of `run_benchmarks`.
+    baseline: dict[str, Any]
+        Output of an earlier `run_benchmarks`.
+    max_regression: float
+        The largest allowed ratio between a current and a baseline timing.
+    min_time_ns: float, optional
+        Stages that took less than this in the baseline are too noisy to compare and are skipped.
+
+    Returns
+    -------
+    list[str]
+        A description of every stage that regressed by more than `max_regression`.
+    """
+    regressions = []
+    for name, stages in results["results"].items():
+        baseline_stages = baseline["results"].get(name, {})
+        for stage, time_ns in stages.items():
+            baseline_ns = baseline_stages.get(stage)
+            if baseline_ns is None or baseline_ns < min_time_ns:
+                continue
+            if time_ns > baseline_ns * max_regression:
+                regressions.append(
+                    f"{name}.{stage}: {time_ns:.0f}ns vs baseline {baseline_ns:.0f}ns "
+                    f"({time_ns / baseline_ns:.2f}x > {max_regression:.2f}x)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--baseline", help="A previous JSON results file to check for regressions against.")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="Allowed slowdown ratio per stage.")
+    parser.add_argument("--iterations", type=int, default=BenchmarkSettings.iterations)
+    parser.add_argument("--repeats", type=int, default=BenchmarkSettings.repeats)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(BenchmarkSettings(iterations=args.iterations, repeats=args.repeats))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Tests for the hyperdrivepy benchmark suite."""
+
+import inspect
+
+import benchmark
+from hyperdrivepy import HyperdriveState, hyperdrive_state, hyperdrive_utils
+
+
+def _public_functions(module) -> set[str]:
+    return {
+        name
+        for name, value in inspect.getmembers(module, inspect.isfunction)
+        if not name.startswith("_") and value.__module__ == module.__name__
+    }
+
+
+def test_benchmarks_cover_every_binding():
+    """Test that every wrapped function has benchmark arguments."""
+    # The methods defined in hyperdrive_state itself build and update states, the rest wrap the rust math.
+    state_methods = {
+        name
+        for name, value in inspect.getmembers(HyperdriveState, inspect.isfunction)
+        if not name.startswith("_") and value.__module__ != hyperdrive_state.__name__
+    }
+    assert state_methods == set(benchmark.STATE_BENCHMARK_ARGS)
+    assert _public_functions(hyperdrive_state) <= state_methods
+    assert set(benchmark.STATE_BENCHMARK_KWARGS) <= state_methods
+    assert _public_functions(hyperdrive_utils) == set(benchmark.UTILS_BENCHMARK_ARGS)
+
+
+def test_run_benchmarks():
+    """Test that a short benchmark run reports every stage for every function."""
+    results = benchmark.run_benchmarks(benchmark.BenchmarkSettings(iterations=1, repeats=1))
+    assert set(results["results"]) == set(benchmark.STATE_BENCHMARK_ARGS) | set(benchmark.UTILS_BENCHMARK_ARGS)
+    # screen_open_long has no module-level function, so it is only timed on a prebuilt state.
+    assert set(results["results"]["screen_open_long"]) == {
+        "extraction",
+        "pool_config_handle",
+        "serialize_pool_info",
+        "math",
+        "stringification",
+    }
+    assert set(results["results"]["calculate_spot_price"]) == {
+        "module_call",
+        "extraction",
+        "pool_config_handle",
+        "serialize_pool_info",
+        "math",
+        "stringification",
+        "python_overhead",
+    }
+
+
+def test_find_regressions():
+    """Test that only stages slower than the allowed ratio are reported."""
+    baseline = {"results": {"calculate_spot_price": {"math": 1_000.0, "extraction": 50.0}}}
+    results = {"results": {"calculate_spot_price": {"math": 1_300.0, "extraction": 500.0}}}
+    assert len(benchmark.find_regressions(results, baseline, max_regression=1.5)) == 0
+    regressions = benchmark.find_regressions(results, baseline, max_regression=1.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("calculate_spot_price.math")
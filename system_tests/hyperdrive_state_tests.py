@@ -0,0 +1,556 @@
+"""Tests for the HyperdriveState methods"""
+
+import math
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import astuple, replace
+
+import hyperdrivepy
+import pytest
+from hyperdrivepy.pypechain_types import Fees
+from pool_data import POOL_CONFIG, POOL_INFO
+
+
+def test_hyperdrive_state_matches_module_functions():
+    """Test that a reused HyperdriveState gives the same results as the module-level functions."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    assert state.calculate_spot_price() == hyperdrivepy.calculate_spot_price(POOL_CONFIG, POOL_INFO)
+    assert state.calculate_spot_rate() == hyperdrivepy.calculate_spot_rate(POOL_CONFIG, POOL_INFO)
+    base_amount = str(500 * 10**18)
+    assert state.calculate_open_long(base_amount) == hyperdrivepy.calculate_open_long(
+        POOL_CONFIG, POOL_INFO, base_amount
+    )
+    short_amount = str(50 * 10**18)
+    assert state.calculate_open_short(short_amount) == hyperdrivepy.calculate_open_short(
+        POOL_CONFIG, POOL_INFO, short_amount
+    )
+
+
+def test_hyperdrive_state_native_ints():
+    """Test that a HyperdriveState built with native_ints accepts and returns python ints."""
+    str_state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    int_state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    spot_price = int_state.calculate_spot_price()
+    assert isinstance(spot_price, int), "Expected spot price to be an int."
+    assert spot_price == int(str_state.calculate_spot_price())
+    base_amount = 500 * 10**18
+    long_amount = int_state.calculate_open_long(base_amount)
+    assert isinstance(long_amount, int), "Expected long amount to be an int."
+    assert long_amount == int(str_state.calculate_open_long(str(base_amount)))
+    max_long = int_state.calculate_max_long(10**18, -10_000, 20)
+    assert max_long == int(str_state.calculate_max_long(str(10**18), str(-10_000), 20))
+    # Ints wider than 64 bits are converted limb by limb.
+    checkpoint_exposure = -(2**70) - 1
+    max_long = int_state.calculate_max_long(2**70 + 1, checkpoint_exposure, 20)
+    assert max_long == int(str_state.calculate_max_long(str(2**70 + 1), str(checkpoint_exposure), 20))
+    for budget in (True, -1, 2**256):
+        with pytest.raises(ValueError, match="Failed to convert budget string to U256"):
+            int_state.calculate_max_long(budget, 0, 20)
+    with pytest.raises(ValueError, match="Failed to convert checkpoint_exposure string to I256"):
+        int_state.calculate_max_long(10**18, 2**255, 20)
+
+
+def test_calculate_open_long_batch():
+    """Test that calculate_open_long_batch matches calculate_open_long for each amount."""
+    base_amounts = [str(amount * 10**18) for amount in (10, 100, 500)]
+    long_amounts = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO).calculate_open_long_batch(base_amounts)
+    assert long_amounts == [
+        hyperdrivepy.calculate_open_long(POOL_CONFIG, POOL_INFO, base_amount) for base_amount in base_amounts
+    ]
+
+
+def test_calculate_open_short_batch():
+    """Test that calculate_open_short_batch matches calculate_open_short for each amount."""
+    short_amounts = [str(amount * 10**18) for amount in (10, 50)]
+    base_required = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO).calculate_open_short_batch(short_amounts)
+    assert base_required == [
+        hyperdrivepy.calculate_open_short(POOL_CONFIG, POOL_INFO, short_amount) for short_amount in short_amounts
+    ]
+
+
+def test_calculate_close_long_batch():
+    """Test that calculate_close_long_batch matches calculate_close_long for each amount."""
+    bond_amounts = [str(amount * 10**18) for amount in (10, 500)]
+    maturity_time = str(9 * 10**17 + 10)
+    current_time = str(9 * 10**17)
+    shares_returned = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO).calculate_close_long_batch(
+        bond_amounts, maturity_time, current_time
+    )
+    assert shares_returned == [
+        hyperdrivepy.calculate_close_long(POOL_CONFIG, POOL_INFO, bond_amount, maturity_time, current_time)
+        for bond_amount in bond_amounts
+    ]
+
+
+def test_calculate_close_short_batch():
+    """Test that calculate_close_short_batch matches calculate_close_short for each amount."""
+    bond_amounts = [str(amount * 10**18) for amount in (10, 50)]
+    args = (str(8 * 10**17), str(9 * 10**17), str(9 * 10**17 + 10), str(9 * 10**17))
+    shares_received = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO).calculate_close_short_batch(
+        bond_amounts, *args
+    )
+    assert shares_received == [
+        hyperdrivepy.calculate_close_short(POOL_CONFIG, POOL_INFO, bond_amount, *args) for bond_amount in bond_amounts
+    ]
+
+
+def test_hyperdrive_state_shared_across_threads():
+    """Test that one HyperdriveState can be used concurrently from a thread pool."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    budgets = [str(amount * 10**18) for amount in (1, 10, 100, 1_000)]
+    expected = [state.calculate_max_long(budget, "0", 20) for budget in budgets]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda budget: state.calculate_max_long(budget, "0", 20), budgets))
+    assert results == expected
+
+
+def test_hyperdrive_state_accepts_struct_tuples():
+    """Test that pool structs can be passed as the tuples returned by contract calls."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    tuple_state = hyperdrivepy.HyperdriveState(astuple(POOL_CONFIG), astuple(POOL_INFO))
+    assert tuple_state.calculate_spot_price() == state.calculate_spot_price()
+    assert tuple_state.calculate_max_long(str(10**21), "0", None) == state.calculate_max_long(str(10**21), "0", None)
+
+
+def test_hyperdrive_state_with_info():
+    """Test that with_info and update_info match a state rebuilt from the updated pool info."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    share_reserves = 2_000_000 * 10**18
+    rebuilt_state = hyperdrivepy.HyperdriveState(POOL_CONFIG, replace(POOL_INFO, shareReserves=share_reserves))
+    updated_state = state.with_info(shareReserves=share_reserves)
+    assert updated_state.calculate_spot_price() == rebuilt_state.calculate_spot_price()
+    assert state.calculate_spot_price() != updated_state.calculate_spot_price()
+    state.update_info(shareReserves=str(share_reserves))
+    assert state.calculate_spot_price() == rebuilt_state.calculate_spot_price()
+    with pytest.raises(ValueError, match="Unknown PoolInfo field: shares"):
+        state.with_info(shares=1)
+
+
+def test_apply_open_and_close_long():
+    """Test that applying an open long moves the reserves and that closing it undoes most of the move."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    base_amount = 10_000 * 10**18
+    bond_amount = state.calculate_open_long(base_amount)
+    after_open = state.apply_open_long(base_amount, current_time)
+    assert after_open.calculate_spot_price() > state.calculate_spot_price()
+    maturity_time = current_time - current_time % POOL_CONFIG.checkpointDuration + POOL_CONFIG.positionDuration
+    after_close = after_open.apply_close_long(bond_amount, maturity_time, current_time)
+    assert after_close.calculate_spot_price() < after_open.calculate_spot_price()
+
+
+def test_apply_open_long_average_maturity_rounding():
+    """Test that the average maturity time is clamped like the contract's updateWeightedAverage."""
+    current_time = 9 * 10**17
+    maturity_time = current_time - current_time % POOL_CONFIG.checkpointDuration + POOL_CONFIG.positionDuration
+    # Rounding down alone would leave the average a wei below both the old average and the new maturity time.
+    average_maturity_time = maturity_time * 10**18 - 1
+    pool_info = replace(POOL_INFO, longsOutstanding=10**24 + 1, longAverageMaturityTime=average_maturity_time)
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, pool_info, native_ints=True)
+    info_bytes = state.apply_open_long(2 * 10**16, current_time).to_bytes()[-hyperdrivepy.POOL_INFO_SIZE :]
+    field = 8 * hyperdrivepy.WORD_SIZE  # longAverageMaturityTime
+    assert int.from_bytes(info_bytes[field : field + hyperdrivepy.WORD_SIZE], "big") == average_maturity_time
+
+
+def test_apply_open_short_and_add_liquidity():
+    """Test that applying an open short lowers the spot price and adding liquidity keeps it fixed."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    after_short = state.apply_open_short(10_000 * 10**18, current_time)
+    assert after_short.calculate_spot_price() < state.calculate_spot_price()
+    after_add = state.apply_add_liquidity(100_000 * 10**18, current_time)
+    assert after_add.calculate_spot_price() == pytest.approx(state.calculate_spot_price(), rel=1e-12)
+
+
+def test_calculate_add_liquidity_batch():
+    """Test that calculate_add_liquidity_batch matches calculate_add_liquidity for each contribution."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    current_time = str(9 * 10**17)
+    contributions = [str(amount * 10**18) for amount in (10, 1_000)]
+    lp_shares = state.calculate_add_liquidity_batch(contributions, current_time)
+    assert lp_shares == [state.calculate_add_liquidity(contribution, current_time) for contribution in contributions]
+    assert all(int(shares) > 0 for shares in lp_shares)
+
+
+def test_estimate_remove_liquidity_and_redeem_withdrawal_shares():
+    """Test removing liquidity from an idle pool and redeeming withdrawal shares."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    lp_shares = 1_000 * 10**18
+    base_proceeds, withdrawal_shares = state.estimate_remove_liquidity(lp_shares, current_time)
+    # The test pool has no open positions, so the estimate is exact. The contract redeems all of the shares for
+    # their share of the present value, which is the share reserves less the minimum share reserves.
+    present_value = int(POOL_INFO.shareReserves) - int(POOL_CONFIG.minimumShareReserves)
+    assert base_proceeds == lp_shares * present_value // int(POOL_INFO.lpTotalSupply)
+    assert withdrawal_shares == 0
+    assert state.estimate_remove_liquidity_batch([lp_shares], current_time) == [(base_proceeds, withdrawal_shares)]
+    redeemed = state.estimate_redeem_withdrawal_shares(lp_shares, current_time)
+    assert redeemed == (base_proceeds, lp_shares)
+    assert state.estimate_redeem_withdrawal_shares_batch([lp_shares], current_time) == [redeemed]
+    # Redeeming every LP share pays out all of the idle, which is the present value of a pool without positions.
+    lp_total_supply = int(POOL_INFO.lpTotalSupply)
+    assert state.estimate_remove_liquidity(lp_total_supply, current_time) == (present_value, 0)
+    # Other withdrawal shares waiting to be redeemed share in the distribution. Each withdrawal share is still paid
+    # the LP share price, so the estimates don't change as long as the LP total supply covers all of the shares.
+    other_withdrawal_shares = 10_000 * 10**18
+    assert state.estimate_redeem_withdrawal_shares(lp_shares, current_time, other_withdrawal_shares) == redeemed
+    assert state.estimate_redeem_withdrawal_shares(lp_shares, current_time, lp_total_supply - lp_shares) == redeemed
+    assert state.estimate_remove_liquidity(lp_shares, current_time, lp_total_supply - lp_shares) == (
+        base_proceeds,
+        0,
+    )
+    with pytest.raises(hyperdrivepy.HyperdriveError):
+        state.estimate_redeem_withdrawal_shares(lp_shares, current_time, lp_total_supply)
+    # The batches return one buffer per element of the results.
+    lp_share_amounts = [lp_shares, 2 * lp_shares]
+    results = state.estimate_remove_liquidity_batch(lp_share_amounts, current_time, other_withdrawal_shares)
+    buffers = state.estimate_remove_liquidity_batch(
+        lp_share_amounts, current_time, other_withdrawal_shares, as_buffer=True
+    )
+    assert [hyperdrivepy.buffer_to_ints(buffer) for buffer in buffers] == [list(column) for column in zip(*results)]
+    buffers, validity = state.estimate_redeem_withdrawal_shares_batch(
+        [lp_shares, lp_total_supply + 1], current_time, with_mask=True, as_buffer=True
+    )
+    assert hyperdrivepy.buffer_to_ints(buffers[1]) == [lp_shares, 0]
+    assert validity == bytes([0b01])
+
+
+def test_calculate_fees():
+    """Test the fee breakdowns against a pool that charges fees."""
+    fees = Fees(curve=10**16, flat=10**15, governanceLP=10**17, governanceZombie=0)
+    state = hyperdrivepy.HyperdriveState(replace(POOL_CONFIG, fees=fees), POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    maturity_time = current_time + POOL_CONFIG.positionDuration // 2
+    open_long_fees = state.calculate_fees_open_long(500 * 10**18)
+    assert open_long_fees.curve > 0
+    assert open_long_fees.flat == 0
+    assert open_long_fees.governance == open_long_fees.curve // 10
+    close_long_fees = state.calculate_fees_close_long(500 * 10**18, maturity_time, current_time)
+    assert close_long_fees.curve > 0 and close_long_fees.flat > 0
+    open_short_fees = state.calculate_fees_open_short(50 * 10**18)
+    assert open_short_fees.curve > 0 and open_short_fees.flat == 0
+    close_short_fees = state.calculate_fees_close_short(50 * 10**18, maturity_time, current_time)
+    assert close_short_fees.curve > 0 and close_short_fees.flat > 0
+
+
+def test_quotes_match_individual_calls():
+    """Test that the fused quotes agree with the individual calculations."""
+    fees = Fees(curve=10**16, flat=10**15, governanceLP=10**17, governanceZombie=0)
+    state = hyperdrivepy.HyperdriveState(replace(POOL_CONFIG, fees=fees), POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    maturity_time = current_time + POOL_CONFIG.positionDuration // 2
+    base_amount = 500 * 10**18
+    long_quote = state.quote_open_long(base_amount)
+    assert long_quote.amount == state.calculate_open_long(base_amount)
+    assert long_quote.fees == state.calculate_fees_open_long(base_amount)
+    assert long_quote.spot_price_after == state.calculate_spot_price_after_long(base_amount)
+    assert long_quote.spot_rate_after == state.calculate_spot_rate_after_long(base_amount)
+    assert long_quote.spot_price_after > state.calculate_spot_price()
+    assert long_quote.price_impact > 0
+    assert long_quote.realized_rate < state.calculate_spot_rate()
+    bond_amount = 50 * 10**18
+    short_quote = state.quote_open_short(bond_amount)
+    assert short_quote.amount == state.calculate_open_short(bond_amount, POOL_INFO.vaultSharePrice)
+    assert short_quote.spot_price_after == state.calculate_spot_price_after_short(bond_amount)
+    assert short_quote.spot_price_after < state.calculate_spot_price()
+    close_long_quote = state.quote_close_long(bond_amount, maturity_time, current_time)
+    assert close_long_quote.amount == state.calculate_close_long(bond_amount, maturity_time, current_time)
+    assert close_long_quote.fees == state.calculate_fees_close_long(bond_amount, maturity_time, current_time)
+    close_short_quote = state.quote_close_short(bond_amount, 10**18, 10**18, maturity_time, current_time)
+    assert close_short_quote.amount == state.calculate_close_short(
+        bond_amount, 10**18, 10**18, maturity_time, current_time
+    )
+    assert close_short_quote.spot_price_after > state.calculate_spot_price()
+
+
+@pytest.mark.parametrize("side", ["long", "short"])
+def test_price_impact_curve(side):
+    """Test that the price impact curve is sorted, bounded and matches the quotes."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    max_size = 10**9 * 10**18
+    sizes, outputs, spot_rates = state.price_impact_curve(side, 10**18, max_size, max_points=16)
+    assert len(sizes) == len(outputs) == len(spot_rates) == 16
+    assert sizes == sorted(sizes)
+    assert sizes[0] == 10**18
+    if side == "long":
+        assert sizes[-1] <= state.calculate_max_long(max_size, 0, None)
+        assert spot_rates == sorted(spot_rates, reverse=True)
+        assert outputs[1] == state.quote_open_long(sizes[1]).amount
+    else:
+        assert sizes[-1] <= state.calculate_max_short(max_size, POOL_INFO.vaultSharePrice, 0, None, None)
+        assert spot_rates == sorted(spot_rates)
+        assert outputs[1] == state.quote_open_short(sizes[1]).amount
+    with pytest.raises(ValueError, match="Unknown trade side"):
+        state.price_impact_curve("sideways", 10**18, max_size)
+
+
+def test_calculate_max_long_warm():
+    """Test that a warm started max long agrees with a cold start."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    budget = 10**9 * 10**18
+    current_time = 9 * 10**17
+    cold_max_long, solver_state = state.calculate_max_long_warm(budget, 0, current_time)
+    assert 0 < cold_max_long <= budget
+    state.calculate_open_long(cold_max_long)
+    warm_max_long, _ = state.calculate_max_long_warm(budget, 0, current_time, initial_guess=solver_state)
+    assert warm_max_long == pytest.approx(cold_max_long, rel=1e-8)
+    guessed_max_long, _ = state.calculate_max_long_warm(budget, 0, current_time, initial_guess=cold_max_long // 2)
+    assert guessed_max_long == pytest.approx(cold_max_long, rel=1e-8)
+    with pytest.raises(ValueError, match="other side"):
+        state.calculate_max_short_warm(budget, POOL_INFO.vaultSharePrice, 0, current_time, initial_guess=solver_state)
+
+
+def test_calculate_max_short_warm():
+    """Test that a warm started max short agrees with a cold start and respects the budget."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    budget = 10_000 * 10**18
+    current_time = 9 * 10**17
+    cold_max_short, solver_state = state.calculate_max_short_warm(budget, POOL_INFO.vaultSharePrice, 0, current_time)
+    assert cold_max_short > 0
+    assert state.calculate_open_short(cold_max_short, POOL_INFO.vaultSharePrice) <= budget
+    warm_max_short, _ = state.calculate_max_short_warm(
+        budget, POOL_INFO.vaultSharePrice, 0, current_time, initial_guess=solver_state
+    )
+    assert warm_max_short == pytest.approx(cold_max_short, rel=1e-8)
+
+
+@pytest.mark.parametrize("budget", [10**18, 10_000 * 10**18, 10**9 * 10**18])
+def test_cold_start_solvers_match_max_trades(budget):
+    """Test that cold started warm solvers agree with calculate_max_long and calculate_max_short."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    max_long, solver_state = state.calculate_max_long_warm(budget, 0, current_time)
+    assert solver_state.converged
+    assert max_long == state.calculate_max_long(budget, 0, None)
+    max_short, solver_state = state.calculate_max_short_warm(budget, POOL_INFO.vaultSharePrice, 0, current_time)
+    assert solver_state.converged
+    assert max_short == state.calculate_max_short(budget, POOL_INFO.vaultSharePrice, 0, None, None)
+
+
+def test_solver_cache():
+    """Test that repeated solves hit the solver cache and that the cache is bounded."""
+    hyperdrivepy.set_solver_cache_size(2)
+    try:
+        hyperdrivepy.clear_solver_cache()
+        state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+        max_long = state.calculate_max_long(str(10**22), "0", None)
+        assert hyperdrivepy.solver_cache_stats() == {"hits": 0, "misses": 1, "size": 1, "max_size": 2}
+        # A separately built state for the same pool shares the cached result.
+        assert hyperdrivepy.calculate_max_long(POOL_CONFIG, POOL_INFO, str(10**22), "0", None) == max_long
+        assert hyperdrivepy.solver_cache_stats()["hits"] == 1
+        # Every config field is part of the key, even ones the solver doesn't read.
+        other_config = replace(POOL_CONFIG, governance="0x1234567890abcdef1234567890abcdef12345678")
+        assert hyperdrivepy.calculate_max_long(other_config, POOL_INFO, str(10**22), "0", None) == max_long
+        assert hyperdrivepy.solver_cache_stats()["misses"] == 2
+        state.calculate_max_long(str(10**21), "0", None)
+        state.calculate_max_short(str(10**21), str(POOL_INFO.vaultSharePrice), "0", None, None)
+        assert hyperdrivepy.solver_cache_stats()["size"] == 2
+        hyperdrivepy.clear_solver_cache()
+        assert hyperdrivepy.solver_cache_stats() == {"hits": 0, "misses": 0, "size": 0, "max_size": 2}
+    finally:
+        hyperdrivepy.set_solver_cache_size(0)
+    assert hyperdrivepy.solver_cache_stats()["max_size"] == 0
+
+
+def test_solver_diagnostics():
+    """Test that the solver diagnostics agree with the plain solves."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    budget = 10**9 * 10**18
+    diagnostics = state.calculate_max_long_with_diagnostics(budget, 0, 20, with_trace=True)
+    assert diagnostics.value == state.calculate_max_long(budget, 0, 20)
+    assert diagnostics.iterations == len(diagnostics.trace)
+    assert 1 <= diagnostics.iterations <= 20
+    assert diagnostics.trace[-1] == diagnostics.value
+    assert diagnostics.iterations == 1 or diagnostics.trace[-2] != diagnostics.value
+    assert diagnostics.wall_time_ns > 0
+    untraced = state.calculate_max_long_with_diagnostics(budget, 0, 20)
+    assert untraced.trace is None
+    assert (untraced.value, untraced.iterations, untraced.residual) == (
+        diagnostics.value,
+        diagnostics.iterations,
+        diagnostics.residual,
+    )
+    diagnostics = state.calculate_max_short_with_diagnostics(
+        budget, POOL_INFO.vaultSharePrice, 0, None, 20, with_trace=True
+    )
+    assert diagnostics.value == state.calculate_max_short(budget, POOL_INFO.vaultSharePrice, 0, None, 20)
+    assert diagnostics.trace[-1] == diagnostics.value
+    # The residual is at most the budget left over after the short.
+    deposit = state.calculate_open_short(diagnostics.value, POOL_INFO.vaultSharePrice)
+    assert diagnostics.residual <= budget - deposit
+    # A budget limited long spends the whole budget.
+    assert state.calculate_max_long_with_diagnostics(10**18, 0, 20).residual == 0
+    # A single iteration can't converge from scratch.
+    assert state.calculate_max_short_with_diagnostics(budget, POOL_INFO.vaultSharePrice, 0, None, 1).hit_max_iterations
+    diagnostics = state.calculate_targeted_long_with_budget_with_diagnostics(budget, 10**16, 0)
+    assert diagnostics.value == state.calculate_targeted_long(budget, 10**16, 0, None, None)
+    assert diagnostics.iterations is None or 1 <= diagnostics.iterations <= 64
+    _, solver_state = state.calculate_max_long_warm(budget, 0, 9 * 10**17)
+    assert solver_state.converged
+    assert solver_state.iterations > 0
+
+
+def test_anytime_solvers():
+    """Test that the anytime solvers return a feasible size when stopped early."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    budget = 10**9 * 10**18
+    current_time = 9 * 10**17
+    max_long = state.calculate_max_long(budget, 0, None)
+    early_max_long, solver_state = state.calculate_max_long_anytime(
+        budget, 0, current_time, maybe_max_evaluations=4, initial_guess=max_long // 4
+    )
+    assert not solver_state.converged
+    assert solver_state.iterations <= 4
+    assert max_long // 4 <= early_max_long <= max_long
+    # The best size so far passes the exact open long and solvency checks.
+    state.apply_open_long(early_max_long, current_time).calculate_solvency()
+    full_max_long, solver_state = state.calculate_max_long_anytime(budget, 0, current_time, maybe_time_budget_ns=10**12)
+    assert solver_state.converged
+    assert full_max_long == pytest.approx(max_long, rel=1e-8)
+    max_short = state.calculate_max_short(budget, POOL_INFO.vaultSharePrice, 0, None, None)
+    # A deadline that has already passed still returns a feasible size.
+    early_max_short, solver_state = state.calculate_max_short_anytime(
+        budget, POOL_INFO.vaultSharePrice, 0, current_time, maybe_time_budget_ns=0
+    )
+    assert not solver_state.converged
+    assert early_max_short <= max_short
+
+
+def test_calculate_max_trades_many():
+    """Test that the budget ladder max trades agree with the one budget solves."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    budgets = [10**24, 10**18, 10**30, 10**20, 10**18]
+    max_longs = state.calculate_max_long_many(budgets, 0)
+    assert max_longs == [state.calculate_max_long(budget, 0, None) for budget in budgets]
+    # Budgets above the pool limited max long, up to the largest U256, all get the pool limited max long.
+    pool_max_long = state.calculate_max_long(POOL_INFO.bondReserves, 0, None)
+    assert pool_max_long < POOL_INFO.bondReserves
+    assert state.calculate_max_long_many([pool_max_long + 1, 2 * pool_max_long, 2**256 - 1], 0) == [pool_max_long] * 3
+    # Solving against the bond reserves gives the same max long as the budget itself on both sides of the pool limit.
+    pool_limit_budgets = [pool_max_long // 2, pool_max_long - 1, pool_max_long, pool_max_long + 1, 2 * pool_max_long]
+    assert state.calculate_max_long_many(pool_limit_budgets, 0) == [
+        state.calculate_max_long(budget, 0, None) for budget in pool_limit_budgets
+    ]
+    max_shorts = state.calculate_max_short_many(budgets, POOL_INFO.vaultSharePrice, 0)
+    assert max_shorts == [
+        state.calculate_max_short(budget, POOL_INFO.vaultSharePrice, 0, None, None) for budget in budgets
+    ]
+    for budget in budgets:
+        assert state.calculate_max_short_many([budget], POOL_INFO.vaultSharePrice, 0, None, 20) == [
+            state.calculate_max_short(budget, POOL_INFO.vaultSharePrice, 0, None, 20)
+        ]
+    assert state.calculate_max_short_many([], POOL_INFO.vaultSharePrice, 0) == []
+
+
+def test_typed_errors():
+    """Test that rejected trades raise typed exceptions instead of panicking."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    too_small = POOL_CONFIG.minimumTransactionAmount - 1
+    with pytest.raises(hyperdrivepy.HyperdriveError) as error:
+        state.calculate_open_long(too_small)
+    assert isinstance(error.value, ValueError)
+    with pytest.raises(hyperdrivepy.HyperdriveError):
+        state.calculate_open_short(too_small)
+    with pytest.raises(hyperdrivepy.HyperdriveError):
+        state.calculate_spot_price_after_long(too_small)
+    assert issubclass(hyperdrivepy.InsufficientLiquidity, hyperdrivepy.HyperdriveError)
+    assert issubclass(hyperdrivepy.MinimumTransactionAmount, hyperdrivepy.HyperdriveError)
+
+
+def test_batch_validity_mask():
+    """Test that batches with a validity mask don't raise for failed elements."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    too_small = POOL_CONFIG.minimumTransactionAmount - 1
+    base_amounts = [10 * 10**18, too_small, 500 * 10**18]
+    with pytest.raises(hyperdrivepy.HyperdriveError, match=r"base_amounts\[1\]"):
+        state.calculate_open_long_batch(base_amounts)
+    long_amounts, mask = state.calculate_open_long_batch(base_amounts, with_mask=True)
+    assert mask == [True, False, True]
+    assert long_amounts == [state.calculate_open_long(base_amounts[0]), 0, state.calculate_open_long(base_amounts[2])]
+    _, mask = state.calculate_open_short_batch([too_small, 10 * 10**18], with_mask=True)
+    assert mask == [False, True]
+    lp_total_supply = POOL_INFO.lpTotalSupply
+    results, mask = state.estimate_remove_liquidity_batch([10**18, lp_total_supply + 1], 9 * 10**17, with_mask=True)
+    assert mask == [True, False]
+    assert results[1] == (0, 0)
+    # The close math panics on infeasible amounts, which the mask reports instead of aborting the batch.
+    maturity_time, current_time = 9 * 10**17 + 10, 9 * 10**17
+    bond_amounts = [10 * 10**18, 10**40]
+    with pytest.raises(hyperdrivepy.HyperdriveError, match=r"bond_amounts\[1\]"):
+        state.calculate_close_long_batch(bond_amounts, maturity_time, current_time)
+    shares_returned, mask = state.calculate_close_long_batch(bond_amounts, maturity_time, current_time, with_mask=True)
+    assert mask == [True, False]
+    assert shares_returned == [state.calculate_close_long(bond_amounts[0], maturity_time, current_time), 0]
+    args = (8 * 10**17, 9 * 10**17, maturity_time, current_time)
+    _, mask = state.calculate_close_short_batch(bond_amounts, *args, with_mask=True)
+    assert mask == [True, False]
+
+
+def test_screening():
+    """Test that the float screening matches the exact math and that survivors can be confirmed."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    current_time = 9 * 10**17
+    maturity_time = current_time + 10
+    base_amounts = [10 * 10**18, 100 * 10**18, 500 * 10**18]
+    screened = state.screen_open_long(base_amounts)
+    for base_amount, bond_amount in zip(base_amounts, screened):
+        assert bond_amount == pytest.approx(state.calculate_open_long(base_amount), rel=1e-9)
+    spot_prices, spot_rates = state.screen_spot_after_long(base_amounts)
+    assert spot_prices[0] == pytest.approx(state.calculate_spot_price_after_long(base_amounts[0]), rel=1e-9)
+    assert spot_rates[0] == pytest.approx(state.calculate_spot_rate_after_long(base_amounts[0]), rel=1e-9)
+    short_deposits = state.screen_open_short([10 * 10**18])
+    assert short_deposits[0] == pytest.approx(state.calculate_open_short(10 * 10**18), rel=1e-9)
+    close_shares = state.screen_close_long([100 * 10**18], maturity_time, current_time)
+    assert close_shares[0] == pytest.approx(
+        state.calculate_close_long(100 * 10**18, maturity_time, current_time), rel=1e-9
+    )
+    assert math.isnan(state.screen_open_long([POOL_CONFIG.minimumTransactionAmount - 1])[0])
+    survivors = [not math.isnan(bond_amount) and bond_amount > 200 * 10**18 for bond_amount in screened]
+    confirmed = state.confirm_exact("open_long", base_amounts, survivors)
+    assert confirmed == [
+        state.calculate_open_long(base_amount) if survived else None
+        for base_amount, survived in zip(base_amounts, survivors)
+    ]
+    with pytest.raises(ValueError, match="Unknown trade"):
+        state.confirm_exact("open_lp", base_amounts, survivors)
+
+
+def test_batch_buffers():
+    """Test that batches returned as buffers hold the same values as the batch lists."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    too_small = POOL_CONFIG.minimumTransactionAmount - 1
+    base_amounts = [10 * 10**18, too_small, 500 * 10**18]
+    buffer, validity = state.calculate_open_long_batch(base_amounts, with_mask=True, as_buffer=True)
+    long_amounts, mask = state.calculate_open_long_batch(base_amounts, with_mask=True)
+    assert isinstance(buffer, bytes)
+    assert len(buffer) == 32 * len(base_amounts)
+    assert hyperdrivepy.buffer_to_ints(buffer) == long_amounts
+    assert validity == bytes([0b101])
+    assert [bool(validity[0] >> index & 1) for index in range(len(mask))] == mask
+    budgets = hyperdrivepy.ints_to_buffer([10**18, 10 * 10**18])
+    assert hyperdrivepy.buffer_to_ints(
+        state.calculate_max_long_many(budgets, 0, as_buffer=True)
+    ) == state.calculate_max_long_many([10**18, 10 * 10**18], 0)
+    with pytest.raises(ValueError, match="not a multiple of 32"):
+        state.calculate_open_long_batch(buffer[:-1])
+
+
+def test_hyperdrive_state_serialization():
+    """Test that states round trip through their binary encoding and through pickle."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO, native_ints=True)
+    data = state.to_bytes()
+    assert len(data) == 32 * 32
+    assert hyperdrivepy.HyperdriveState.from_bytes(data).to_bytes() == data
+    decoded = hyperdrivepy.HyperdriveState.from_bytes(data, native_ints=True)
+    assert decoded.calculate_spot_price() == state.calculate_spot_price()
+    unpickled = pickle.loads(pickle.dumps(state))
+    assert unpickled.to_bytes() == data
+    assert unpickled.calculate_max_long(10**21, 0, 20) == state.calculate_max_long(10**21, 0, 20)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(_spot_price, state).result() == state.calculate_spot_price()
+    with pytest.raises(ValueError, match="Expected 1024 bytes"):
+        hyperdrivepy.HyperdriveState.from_bytes(data[:-1])
+
+
+def _spot_price(state):
+    return state.calculate_spot_price()
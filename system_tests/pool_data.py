@@ -0,0 +1,39 @@
+"""Pool fixtures shared by the system tests."""
+
+from hyperdrivepy.pypechain_types import Fees, PoolConfig, PoolInfo
+
+POOL_CONFIG = PoolConfig(
+    baseToken="0x1234567890abcdef1234567890abcdef12345678",
+    vaultSharesToken="0x1234567890abcdef1234567890abcdef12345678",
+    linkerFactory="0x1234567890abcdef1234567890abcdef12345678",
+    linkerCodeHash=bytes(32),
+    initialVaultSharePrice=1 * 10**18,  # 1e18
+    minimumShareReserves=1 * 10**17,  # 0.1e18
+    minimumTransactionAmount=1 * 10**16,  # 0.001e18
+    positionDuration=60 * 60 * 24 * 365,  # 1 year
+    checkpointDuration=86_400,
+    timeStretch=1 * 10**17,  # 0.1e18
+    governance="0xabcdef1234567890abcdef1234567890abcdef12",
+    feeCollector="0xfedcba0987654321fedcba0987654321fedcba09",
+    sweepCollector="0xfedcba0987654321fedcba0987654321fedcba09",
+    fees=Fees(curve=0, flat=0, governanceLP=0, governanceZombie=0),
+)
+
+
+POOL_INFO = PoolInfo(
+    shareReserves=1_000_000 * 10**18,
+    shareAdjustment=0,
+    zombieBaseProceeds=0,
+    zombieShareReserves=0,
+    bondReserves=2_000_000 * 10**18,
+    lpTotalSupply=3_000_000 * 10**18,
+    vaultSharePrice=1 * 10**18,
+    longsOutstanding=0,
+    longAverageMaturityTime=0,
+    shortsOutstanding=0,
+    shortAverageMaturityTime=0,
+    withdrawalSharesReadyToWithdraw=0,
+    withdrawalSharesProceeds=0,
+    lpSharePrice=1 * 10**18,
+    longExposure=0,
+)
@@ -1,44 +1,10 @@
 """Tests for hyperdrive_math.rs wrappers"""
 
+from dataclasses import fields, replace
+
 import hyperdrivepy
 import pytest
-from hyperdrivepy.pypechain_types import Fees, PoolConfig, PoolInfo
-
-POOL_CONFIG = PoolConfig(
-    baseToken="0x1234567890abcdef1234567890abcdef12345678",
-    vaultSharesToken="0x1234567890abcdef1234567890abcdef12345678",
-    linkerFactory="0x1234567890abcdef1234567890abcdef12345678",
-    linkerCodeHash=bytes(32),
-    initialVaultSharePrice=1 * 10**18,  # 1e18
-    minimumShareReserves=1 * 10**17,  # 0.1e18
-    minimumTransactionAmount=1 * 10**16,  # 0.001e18
-    positionDuration=60 * 60 * 24 * 365,  # 1 year
-    checkpointDuration=86_400,
-    timeStretch=1 * 10**17,  # 0.1e18
-    governance="0xabcdef1234567890abcdef1234567890abcdef12",
-    feeCollector="0xfedcba0987654321fedcba0987654321fedcba09",
-    sweepCollector="0xfedcba0987654321fedcba0987654321fedcba09",
-    fees=Fees(curve=0, flat=0, governanceLP=0, governanceZombie=0),
-)
-
-
-POOL_INFO = PoolInfo(
-    shareReserves=1_000_000 * 10**18,
-    shareAdjustment=0,
-    zombieBaseProceeds=0,
-    zombieShareReserves=0,
-    bondReserves=2_000_000 * 10**18,
-    lpTotalSupply=3_000_000 * 10**18,
-    vaultSharePrice=1 * 10**18,
-    longsOutstanding=0,
-    longAverageMaturityTime=0,
-    shortsOutstanding=0,
-    shortAverageMaturityTime=0,
-    withdrawalSharesReadyToWithdraw=0,
-    withdrawalSharesProceeds=0,
-    lpSharePrice=1 * 10**18,
-    longExposure=0,
-)
+from pool_data import POOL_CONFIG, POOL_INFO
 
 
 def test_calculate_max_spot_price():
@@ -356,3 +322,142 @@ def test_calculate_idle_share_reserves_in_base():
     """Test calculate_idle_share_reserves_in_base."""
     idle_share_reserves = hyperdrivepy.calculate_idle_share_reserves_in_base(POOL_CONFIG, POOL_INFO)
     assert int(idle_share_reserves) > 0
+
+
+def test_evaluate_pools():
+    """Test that evaluate_pools matches the per-pool calculations for every requested metric."""
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    results = hyperdrivepy.evaluate_pools(
+        [state, (POOL_CONFIG, POOL_INFO)], metrics=["spot_price", "spot_rate", "max_long"], budget=str(10**21)
+    )
+    assert set(results) == {"spot_price", "spot_rate", "max_long"}
+    assert results["spot_price"] == [state.calculate_spot_price()] * 2
+    assert results["spot_rate"] == [state.calculate_spot_rate()] * 2
+    assert results["max_long"] == [state.calculate_max_long(str(10**21), "0", None)] * 2
+    buffers = hyperdrivepy.evaluate_pools(
+        [state, (POOL_CONFIG, POOL_INFO)], metrics=["spot_price", "max_long"], budget=str(10**21), as_buffer=True
+    )
+    assert {name: hyperdrivepy.buffer_to_ints(buffer) for name, buffer in buffers.items()} == {
+        name: [int(value) for value in results[name]] for name in ("spot_price", "max_long")
+    }
+
+
+def test_evaluate_pools_unknown_metric():
+    """Test that evaluate_pools rejects metrics it does not know about."""
+    with pytest.raises(ValueError, match="Unknown pool metric: apy"):
+        hyperdrivepy.evaluate_pools([(POOL_CONFIG, POOL_INFO)], metrics=["apy"])
+
+
+def test_replay_pool_history():
+    """Test that replaying a columnar pool history matches the per-snapshot calculations."""
+    pool_infos = [POOL_INFO, replace(POOL_INFO, shareReserves=2_000_000 * 10**18, shareAdjustment=-(10**20))]
+    columns = {field.name: [getattr(pool_info, field.name) for pool_info in pool_infos] for field in fields(POOL_INFO)}
+    columns["bondReserves"] = [str(value) for value in columns["bondReserves"]]
+    block_timestamps = [9 * 10**17, 9 * 10**17 + 12]
+    results = hyperdrivepy.replay_pool_history(
+        hyperdrivepy.PoolConfigHandle(POOL_CONFIG),
+        columns,
+        metrics=["spot_rate", "solvency", "present_value"],
+        block_timestamps=block_timestamps,
+        native_ints=True,
+    )
+    for row, pool_info in enumerate(pool_infos):
+        state = hyperdrivepy.HyperdriveState(POOL_CONFIG, pool_info, native_ints=True)
+        assert results["spot_rate"][row] == state.calculate_spot_rate()
+        assert results["solvency"][row] == state.calculate_solvency()
+        assert results["present_value"][row] == state.calculate_present_value(block_timestamps[row])
+    buffers = hyperdrivepy.replay_pool_history(
+        POOL_CONFIG, columns, metrics=["spot_rate", "present_value"], block_timestamps=block_timestamps, as_buffer=True
+    )
+    assert hyperdrivepy.buffer_to_ints(buffers["spot_rate"]) == results["spot_rate"]
+    assert hyperdrivepy.buffer_to_ints(buffers["present_value"]) == results["present_value"]
+    with pytest.raises(ValueError, match="requires block_timestamps"):
+        hyperdrivepy.replay_pool_history(POOL_CONFIG, columns, metrics=["present_value"])
+    with pytest.raises(ValueError, match="Missing PoolInfo column: longExposure"):
+        hyperdrivepy.replay_pool_history(
+            POOL_CONFIG, {name: column for name, column in columns.items() if name != "longExposure"}
+        )
+
+
+def test_replay_pool_history_arrow_columns():
+    """Test that Arrow decimal256 columns are read from their buffers and that replays skip the solver cache."""
+    pytest.importorskip("pyarrow")
+    pool_infos = [POOL_INFO, replace(POOL_INFO, shareReserves=2_000_000 * 10**18, shareAdjustment=-(10**20))]
+    columns = {
+        field.name: hyperdrivepy.buffer_to_arrow(
+            hyperdrivepy.ints_to_buffer(
+                [getattr(pool_info, field.name) for pool_info in pool_infos], signed=field.name == "shareAdjustment"
+            )
+        )
+        for field in fields(POOL_INFO)
+    }
+    hyperdrivepy.set_solver_cache_size(16)
+    try:
+        results = hyperdrivepy.replay_pool_history(
+            POOL_CONFIG, columns, metrics=["spot_rate", "max_long"], budget=10**22, native_ints=True
+        )
+        assert hyperdrivepy.solver_cache_stats()["size"] == 0
+    finally:
+        hyperdrivepy.set_solver_cache_size(0)
+    for row, pool_info in enumerate(pool_infos):
+        state = hyperdrivepy.HyperdriveState(POOL_CONFIG, pool_info, native_ints=True)
+        assert results["spot_rate"][row] == state.calculate_spot_rate()
+        assert results["max_long"][row] == state.calculate_max_long(10**22, 0, None)
+
+
+def test_pool_config_handle():
+    """Test that a PoolConfigHandle can stand in for the pool config."""
+    handle = hyperdrivepy.PoolConfigHandle(POOL_CONFIG)
+    state = hyperdrivepy.HyperdriveState(POOL_CONFIG, POOL_INFO)
+    handle_state = hyperdrivepy.HyperdriveState(handle, POOL_INFO)
+    assert handle_state.calculate_spot_price() == state.calculate_spot_price()
+    assert hyperdrivepy.calculate_spot_rate(handle, POOL_INFO) == state.calculate_spot_rate()
+    address = "0x1234567890abcdef1234567890abcdef12345678"
+    assert hyperdrivepy.get_pool_config_handle(address, POOL_CONFIG) is hyperdrivepy.get_pool_config_handle(
+        address.upper().replace("0X", "0x"), POOL_CONFIG
+    )
+
+
+def test_snapshot_store(tmp_path):
+    """Test that snapshots can be appended, looked up by block and scanned after reopening the store."""
+    path = tmp_path / "snapshots.bin"
+    pool_infos = [replace(POOL_INFO, shareReserves=(1_000_000 + block) * 10**18) for block in range(5)]
+    with hyperdrivepy.SnapshotStore(path, POOL_CONFIG) as store:
+        for block, pool_info in zip(range(100, 150, 10), pool_infos):
+            store.append(block, pool_info)
+        with pytest.raises(ValueError, match="increasing block order"):
+            store.append(140, POOL_INFO)
+    with hyperdrivepy.SnapshotStore(path, native_ints=True, readonly=True) as store:
+        assert len(store) == 5
+        assert (store.first_block_number, store.last_block_number) == (100, 140)
+        expected = hyperdrivepy.HyperdriveState(POOL_CONFIG, pool_infos[2], native_ints=True)
+        assert store.state_at(120).to_bytes() == expected.to_bytes()
+        assert store.state_at(125).to_bytes() == expected.to_bytes()
+        with pytest.raises(KeyError):
+            store.state_at(99)
+        scanned = list(store.scan(110, 130))
+        assert [block for block, _ in scanned] == [110, 120]
+        assert (
+            scanned[0][1].calculate_spot_price()
+            == hyperdrivepy.HyperdriveState(POOL_CONFIG, pool_infos[1], native_ints=True).calculate_spot_price()
+        )
+        records = store.records(110, 130)
+        assert len(records) == 2 * hyperdrivepy.RECORD_SIZE
+        assert int.from_bytes(records[32:64], "big") == pool_infos[1].shareReserves
+        records.release()
+
+
+def test_snapshot_store_grows_under_readers(tmp_path):
+    """Test that appending to a store doesn't invalidate views and scans taken before it grew."""
+    path = tmp_path / "snapshots.bin"
+    with hyperdrivepy.SnapshotStore(path, POOL_CONFIG) as store:
+        store.append(100, POOL_INFO)
+        records = store.records()
+        scan = store.scan()
+        assert next(scan)[0] == 100
+        store.append(110, POOL_INFO)
+        assert store.state_at(110).to_bytes() == store.state_at(100).to_bytes()
+        assert int.from_bytes(records[:32], "big") == 100
+        assert not list(scan)
+        assert [block for block, _ in store.scan()] == [100, 110]
+        records.release()